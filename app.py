@@ -1,21 +1,148 @@
+import io
 import os
-from flask import Flask, render_template, request, url_for
+import time
+import uuid
+import threading
+from flask import Flask, Request, Response, g, jsonify, render_template, request, url_for
 from flask_cors import CORS, cross_origin
-from victimDetector.pipeline.prediction import PredictionPipeline
+from werkzeug.exceptions import RequestEntityTooLarge
+from victimDetector import logger, reset_log_context, set_log_context
+from victimDetector.config.configuration import ConfigurationManager
+from victimDetector.pipeline.job_queue import JobManager, JobQueueFull
+from victimDetector.utils.common import decode_base64_to_image, decode_image_bytes, encode_image_to_base64_string
+from victimDetector.utils.metrics import REQUEST_SECONDS, record_prediction, registry
+from victimDetector.utils.result_cache import ResultCache
+from victimDetector.utils.uploads import UploadRejected, UploadStore
+
+upload_store = UploadStore(ConfigurationManager().get_upload_config())
+
+
+class UploadRequest(Request):
+    # Stream multipart file parts straight into a hashing temp file in the
+    # upload folder instead of werkzeug's default spooled temp file
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Still images are decoded straight from memory, never written to disk
+        if self.endpoint == 'predictImagesRoute':
+            return io.BytesIO()
+        return upload_store.open_stream()
+
 
 app = Flask(__name__)
+app.request_class = UploadRequest
+# Rejects oversized uploads from the Content-Length header before reading the body
+app.config['MAX_CONTENT_LENGTH'] = upload_store.max_bytes + 1024 * 1024
 CORS(app)
 
-# Use absolute paths for safety
-BASE_DIR = os.getcwd()
-UPLOAD_FOLDER = os.path.join(BASE_DIR, 'static', 'uploads')
-PREDICTION_FOLDER = os.path.join(BASE_DIR, 'static', 'predictions')
+# Folders from config.yaml (uploads / prediction), created by the ConfigurationManager
+UPLOAD_FOLDER = os.path.abspath(upload_store.config.root_dir)
+PREDICTION_FOLDER = os.path.abspath(upload_store.config.prediction_dir)
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
-# Create folders
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(PREDICTION_FOLDER, exist_ok=True)
+# Created lazily: worker processes re-import this module on spawn and
+# must not start a pool of their own
+job_manager = None
+
+
+def get_job_manager() -> JobManager:
+    global job_manager
+    if job_manager is None:
+        job_manager = JobManager(ConfigurationManager().get_job_queue_config())
+    return job_manager
+
+
+def get_prediction_config():
+    # Built once and reused until params.yaml / config.yaml change; the model
+    # itself is cached in model_registry
+    return ConfigurationManager().get_prediction_config()
+
+
+# Live sources run in this process, started on their first viewer
+live_streams = None
+
+
+def get_live_streams():
+    global live_streams
+    if live_streams is None:
+        from victimDetector.pipeline.live_stream import LiveStreamManager
+        live_streams = LiveStreamManager(
+            ConfigurationManager().get_live_stream_config(), get_prediction_config()
+        )
+    return live_streams
+
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+    # Every record logged while handling the request carries its id
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16]
+    g.log_token = set_log_context(request_id=g.request_id)
+
+
+@app.teardown_request
+def clear_log_context(exc):
+    if 'log_token' in g:
+        reset_log_context(g.log_token)
+
+
+@app.after_request
+def record_request(response):
+    # Streaming responses (MJPEG, SSE) are timed until they start, not until they end
+    if 'request_start' in g:
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - g.request_start,
+            method=request.method,
+            endpoint=request.url_rule.rule if request.url_rule else 'unmatched',
+            status=response.status_code
+        )
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+
+def save_upload():
+    """Store the uploaded video under its content hash and return (file_path, error)."""
+    try:
+        if 'video' not in request.files:
+            return None, "No video file provided"
+
+        video_file = request.files['video']
+        if video_file.filename == '':
+            video_file.stream.discard()
+            return None, "No selected file"
+
+        file_path = upload_store.finalize(video_file.stream, video_file.filename)
+    except RequestEntityTooLarge:
+        return None, f"Upload exceeds the {upload_store.config.params_max_size_mb} MB limit"
+    except UploadRejected as e:
+        return None, str(e)
+
+    logger.debug(f"Video saved to {file_path}")
+    upload_store.maybe_collect_garbage(protect=get_job_manager().active_inputs())
+    return str(file_path), None
+
+
+def prediction_url(job, key):
+    """URL of one of the job's output files, or None if it wasn't produced."""
+    if not job['result'] or key not in job['result']:
+        return None
+    return url_for('static', filename='predictions/' + job['result'][key])
+
+
+def job_to_json(job):
+    return {
+        "job_id": job['id'],
+        "status": job['status'],
+        "frames_done": job['frames_done'],
+        "frames_total": job['frames_total'],
+        "progress": job['progress'],
+        "eta_seconds": job['eta_seconds'],
+        "result_url": prediction_url(job, 'video'),
+        "tracks_url": prediction_url(job, 'tracks'),
+        "detections_url": prediction_url(job, 'detections'),
+        "error": job['error'],
+    }
+
 
 @app.route("/", methods=['GET'])
 @cross_origin()
@@ -26,37 +153,204 @@ def home():
 @cross_origin()
 def predictRoute():
     try:
-        if 'video' not in request.files:
-            return render_template('index.html', error="No video file provided")
-            
-        video_file = request.files['video']
-        if video_file.filename == '':
-            return render_template('index.html', error="No selected file")
-
         # 1. Save Video
-        filename = video_file.filename
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        video_file.save(file_path)
-        print(f"DEBUG: Video saved to {file_path}")
-
-        # 2. Run Pipeline
-        obj = PredictionPipeline(file_path)
-        output_filename = obj.predict()
-        print(f"DEBUG: Pipeline returned filename: {output_filename}")
-        
-        if output_filename == "Error":
-             return render_template('index.html', error="Prediction Failed: Check terminal logs")
-
-        # 3. Generate URL
-        # result_video_url will be something like /static/predictions/video.mp4
-        result_video_url = url_for('static', filename='predictions/' + output_filename)
-        print(f"DEBUG: Generated URL: {result_video_url}")
-
-        return render_template('result.html', video_path=result_video_url)
+        file_path, error = save_upload()
+        if error:
+            return render_template('index.html', error=error)
+
+        # 2. Queue the job; result.html polls its status until the video is ready
+        job_id = get_job_manager().submit(file_path)
+        logger.debug(f"Queued job {job_id}")
+
+        return render_template(
+            'result.html',
+            job_id=job_id,
+            status_url=url_for('jobStatusRoute', job_id=job_id)
+        )
+
+    except JobQueueFull as e:
+        return render_template('index.html', error=str(e))
 
     except Exception as e:
-        print(f"CRITICAL ERROR: {e}")
+        logger.exception(f"Request failed: {e}")
         return render_template('index.html', error=str(e))
 
+@app.route("/jobs", methods=['POST'])
+@cross_origin()
+def submitJobRoute():
+    file_path, error = save_upload()
+    if error:
+        return jsonify({"error": error}), 400
+
+    # render=0 skips drawing/encoding and only produces detections
+    render = request.form.get('render')
+    if render is not None:
+        render = render.lower() not in ('0', 'false', 'no')
+
+    try:
+        job_id = get_job_manager().submit(file_path, render=render)
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
+
+    return jsonify({
+        "job_id": job_id,
+        "status_url": url_for('jobStatusRoute', job_id=job_id)
+    }), 202
+
+@app.route("/jobs/<job_id>", methods=['GET'])
+@cross_origin()
+def jobStatusRoute(job_id):
+    job = get_job_manager().status(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id"}), 404
+    return jsonify(job_to_json(job))
+
+@app.route("/jobs/<job_id>/detections", methods=['GET'])
+@cross_origin()
+def jobDetectionsRoute(job_id):
+    from victimDetector.utils.detections import detections_to_json, load_detections
+
+    job = get_job_manager().status(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id"}), 404
+    if job['status'] != 'done' or 'detections' not in job['result']:
+        return jsonify({"error": "No detections available for this job"}), 404
+
+    path = os.path.join(PREDICTION_FOLDER, job['result']['detections'])
+    return jsonify({"job_id": job_id, **detections_to_json(load_detections(path))})
+
+def read_images():
+    """
+    Decode the request's images in memory and return (images, filenames, annotate).
+
+    Accepts multipart 'images' (or 'image') files, or JSON
+    {"images": [<base64>, ...], "annotate": true}.
+    """
+    if request.is_json:
+        body = request.get_json()
+        encoded = body.get('images') or ([body['image']] if 'image' in body else [])
+        images = [decode_base64_to_image(item) for item in encoded]
+        return images, [None] * len(images), bool(body.get('annotate', False))
+
+    files = request.files.getlist('images') + request.files.getlist('image')
+    images = [decode_image_bytes(f.read()) for f in files]
+    annotate = request.form.get('annotate', '0').lower() not in ('0', 'false', 'no')
+    return images, [f.filename for f in files], annotate
+
+
+@app.route("/predict/images", methods=['POST'])
+@cross_origin()
+def predictImagesRoute():
+    from victimDetector.pipeline.prediction import ImagePredictionPipeline
+
+    config = get_prediction_config()
+    # Images are held in memory, so requests get a much lower cap than video uploads
+    request.max_content_length = int(config.params_images_max_request_mb * 1024 * 1024)
+    try:
+        images, filenames, annotate = read_images()
+    except RequestEntityTooLarge:
+        return jsonify({"error": f"Request exceeds the {config.params_images_max_request_mb} MB limit"}), 413
+    except (ValueError, TypeError, AttributeError) as e:
+        return jsonify({"error": f"Invalid image: {e}"}), 400
+
+    if not images:
+        return jsonify({"error": "No images provided"}), 400
+    if len(images) > config.params_images_max_count:
+        return jsonify({"error": f"At most {config.params_images_max_count} images per request"}), 400
+
+    try:
+        pipeline = ImagePredictionPipeline(config)
+        results = pipeline.predict(images, annotate=annotate)
+    except Exception as e:
+        logger.exception(f"Request failed: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    record_prediction(pipeline.stats, pipeline='images')
+    for filename, result in zip(filenames, results):
+        result['filename'] = filename
+        if annotate:
+            result['annotated'] = encode_image_to_base64_string(
+                result['annotated'], quality=config.params_images_jpeg_quality
+            )
+    return jsonify({"images": results, "stats": pipeline.stats})
+
+def open_live_stream(name):
+    """Return (stream, error_response) for a configured live source."""
+    from victimDetector.pipeline.live_stream import LiveStreamLimit
+
+    try:
+        return get_live_streams().get(name), None
+    except KeyError:
+        return None, (jsonify({"error": "Unknown live source"}), 404)
+    except LiveStreamLimit as e:
+        return None, (jsonify({"error": str(e)}), 503)
+    except ValueError as e:
+        return None, (jsonify({"error": str(e)}), 502)
+
+@app.route("/streams", methods=['GET'])
+@cross_origin()
+def streamsRoute():
+    return jsonify(get_live_streams().status())
+
+@app.route("/streams/<name>/mjpeg", methods=['GET'])
+@cross_origin()
+def streamMjpegRoute(name):
+    stream, error = open_live_stream(name)
+    if error:
+        return error
+    return Response(stream.mjpeg(), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@app.route("/streams/<name>/events", methods=['GET'])
+@cross_origin()
+def streamEventsRoute(name):
+    stream, error = open_live_stream(name)
+    if error:
+        return error
+    return Response(
+        stream.events(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route("/streams/<name>", methods=['DELETE'])
+@cross_origin()
+def stopStreamRoute(name):
+    if not get_live_streams().stop(name):
+        return jsonify({"error": "Stream is not running"}), 404
+    return jsonify({"stopped": name})
+
+@app.route("/cache/stats", methods=['GET'])
+@cross_origin()
+def cacheStatsRoute():
+    config = get_prediction_config()
+    if not config.params_cache_enabled:
+        return jsonify({"enabled": False})
+    cache = ResultCache(config.cache_dir, config.params_cache_max_size_mb)
+    return jsonify({"enabled": True, **cache.stats()})
+
+@app.route("/metrics", methods=['GET'])
+def metricsRoute():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+def warm_up_web_model():
+    """Load the model for /predict/images; requests arriving meanwhile wait on the registry."""
+    from victimDetector.utils.model_registry import model_registry
+
+    config = get_prediction_config()
+    if os.path.exists(config.model_path):
+        model_registry.warm_up(config.model_path, imgsz=config.params_imgsz)
+
 if __name__ == "__main__":
-    app.run(host='0.0.0.0', port=8080, debug=True)
\ No newline at end of file
+    # Start the worker processes (each loads the model) before serving
+    get_job_manager().warm_up()
+    # The web process serves /predict/images itself with its own warm model;
+    # loading it (torch, weights) in the background lets the server listen at once
+    threading.Thread(target=warm_up_web_model, name="model-warm-up", daemon=True).start()
+    app.run(
+        host='0.0.0.0',
+        port=8080,
+        debug=os.environ.get('FLASK_DEBUG') == '1',
+        threaded=True,
+        # The reloader would start a second copy of the worker pool
+        use_reloader=False
+    )
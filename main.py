@@ -1,61 +1,25 @@
-
+import argparse
 from victimDetector import logger
-from victimDetector.pipeline.stage_01_data_ingestion import DataIngestionTrainingPipeline
-from victimDetector.pipeline.stage_02_prepare_base_model import PrepareBaseModelTrainingPipeline
-from victimDetector.pipeline.stage_03_model_training import ModelTrainingPipeline
-from victimDetector.pipeline.stage_04_model_evaluation import EvaluationPipeline
-
-
-
-STAGE_NAME = "Data Ingestion stage"
+from victimDetector.config.configuration import ConfigurationManager
+from victimDetector.pipeline.stage_runner import StageRunner
 
-try:
-    logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
-    data_ingestion = DataIngestionTrainingPipeline()
-    data_ingestion.main()
-    logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
-except Exception as e:
-    logger.exception(e)
-    raise e
 
 
-STAGE_NAME = "Prepare base model"
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the training pipeline, skipping stages whose inputs did not change")
+    parser.add_argument("stages", nargs="*", help="dvc.yaml stages to run with their upstream stages (default: params stage_runner.stages)")
+    parser.add_argument("--force", action="store_true", help="Run the stages even if they are up to date")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which stages would run")
+    return parser.parse_args()
 
-try: 
-   logger.info(f"*******************")
-   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
-   prepare_base_model = PrepareBaseModelTrainingPipeline()
-   prepare_base_model.main()
-   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
-except Exception as e:
-        logger.exception(e)
-        raise e
 
-STAGE_NAME = "Training"
 
-try: 
-   logger.info(f"*******************")
-   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
-   model_trainer = ModelTrainingPipeline()
-   model_trainer.main()
-   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
-except Exception as e:
+if __name__ == '__main__':
+    args = parse_args()
+    try:
+        config = ConfigurationManager()
+        runner = StageRunner(config=config.get_stage_runner_config())
+        runner.run(targets=args.stages, force=args.force, dry_run=args.dry_run)
+    except Exception as e:
         logger.exception(e)
         raise e
-
-
-
-STAGE_NAME = "Evaluation stage"
-
-try:
-   logger.info(f"*******************")
-   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
-   model_evalution = EvaluationPipeline()
-   model_evalution.main()
-   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
-
-except Exception as e:
-        logger.exception(e)
-        raise e
-
-
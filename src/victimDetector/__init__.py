@@ -1,6 +1,17 @@
 import os
 import sys
+import copy
+import json
+import queue
+import atexit
 import logging
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+import yaml
+
+from victimDetector.constants import PARAMS_FILE_PATH
 
 # 1. Define the format of the logs
 # [Timestamp] : [Log Level] : [Module Name] : [Message]
@@ -11,17 +22,236 @@ log_dir = "logs"
 log_filepath = os.path.join(log_dir, "running_logs.log")
 os.makedirs(log_dir, exist_ok=True)
 
-# 3. Configure the logging system
-logging.basicConfig(
-    level=logging.INFO,
-    format=logging_str,
-    handlers=[
-        # Save logs to a file
-        logging.FileHandler(log_filepath),
-        # Also print logs to the terminal (stdout)
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-# 4. Create the logger object
-logger = logging.getLogger("victimDetectorLogger")
\ No newline at end of file
+
+# -------------------- LOG CONTEXT --------------------
+
+# Fields (request_id, job_id, ...) attached to every record logged while set
+_log_context = contextvars.ContextVar("log_context", default={})
+
+
+def set_log_context(**fields) -> contextvars.Token:
+    """Add fields to the current log context; undo with reset_log_context(token)."""
+    return _log_context.set({**_log_context.get(), **fields})
+
+
+def reset_log_context(token: contextvars.Token):
+    _log_context.reset(token)
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach fields such as job_id to every record logged inside the block."""
+    token = set_log_context(**fields)
+    try:
+        yield
+    finally:
+        reset_log_context(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the active log context onto each record, in the thread that logs it."""
+
+    def filter(self, record):
+        for name, value in _log_context.get().items():
+            if not hasattr(record, name):
+                setattr(record, name, value)
+        return True
+
+
+LOGGER_NAME = "victimDetectorLogger"
+
+# Folder holding the victimDetector package, to name the package's records by module
+_SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _record_name(record) -> str:
+    """
+    Logger name of a record. The package logs through one shared logger, so
+    its records are named by their dotted module path instead
+    (victimDetector.utils.common), which unlike the file name is unambiguous.
+    """
+    if record.name == LOGGER_NAME:
+        path = os.path.relpath(os.path.splitext(record.pathname)[0], _SOURCE_ROOT)
+        if not path.startswith(".."):
+            return path.replace(os.sep, ".")
+    return record.name
+
+
+class ModuleLevelFilter(logging.Filter):
+    """
+    Minimum levels per logger name, applied to the name and its children
+    (e.g. 'ultralytics': WARNING, 'victimDetector.pipeline.prediction': DEBUG).
+    """
+
+    def __init__(self, default_level: int, module_levels: dict):
+        super().__init__()
+        self.default_level = default_level
+        self.module_levels = module_levels
+
+    def level_of(self, name: str) -> int:
+        while name:
+            if name in self.module_levels:
+                return self.module_levels[name]
+            name = name.rpartition(".")[0]
+        return self.default_level
+
+    def filter(self, record):
+        if not self.module_levels:
+            return record.levelno >= self.default_level
+        return record.levelno >= self.level_of(_record_name(record))
+
+
+# -------------------- FORMATTING --------------------
+
+# Attributes every LogRecord has; anything else came from extra= or the log context
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with log context and extra= fields as keys."""
+
+    def format(self, record):
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "module": record.module,
+            "message": record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRS:
+                data[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record):
+        # Resolve the message and traceback in the calling thread: args and
+        # exc_info may not survive the queue (or pickling to another process),
+        # but the extra= / context fields are kept for the JSON formatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.stack_info = None
+        return record
+
+
+# -------------------- SETUP --------------------
+
+def _read_settings() -> dict:
+    """The 'logging' section of params.yaml, with LOG_LEVEL overriding the level."""
+    settings = {}
+    if os.path.exists(PARAMS_FILE_PATH):
+        with open(PARAMS_FILE_PATH) as f:
+            settings = (yaml.safe_load(f) or {}).get("logging") or {}
+    if os.environ.get("LOG_LEVEL"):
+        settings["level"] = os.environ["LOG_LEVEL"]
+    return settings
+
+
+def _parse_level(value, setting: str, invalid: list) -> int:
+    """Numeric level of a name such as 'debug'; INFO (and a warning) for anything else."""
+    level = logging.getLevelName(str(value).upper())
+    if not isinstance(level, int):
+        # getLevelName returns "Level X" for unknown names
+        invalid.append(f"{setting}={value!r}")
+        return logging.INFO
+    return level
+
+
+def _queue_handler(log_queue, settings: dict) -> QueueHandler:
+    invalid = []
+    level = _parse_level(settings.get("level", "INFO"), "level", invalid)
+    module_levels = {
+        module: _parse_level(module_level, f"module_levels.{module}", invalid)
+        for module, module_level in (settings.get("module_levels") or {}).items()
+    }
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+    # Filtered records never reach the queue
+    handler.addFilter(ModuleLevelFilter(level, module_levels))
+
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(min([level, *module_levels.values()]))
+    if invalid:
+        logging.getLogger(LOGGER_NAME).warning(f"Unknown log levels, using INFO: {', '.join(invalid)}")
+    return handler
+
+
+def _setup_logging():
+    """
+    Route all records through a queue to a background listener thread.
+
+    Callers only enqueue the record; formatting, the rotating log file
+    (JSON lines) and stdout (text) are handled by the QueueListener, so
+    logging never blocks the request, pipeline or worker threads on I/O.
+    """
+    settings = _read_settings()
+    file_handler = RotatingFileHandler(
+        log_filepath,
+        maxBytes=int(settings.get("max_file_mb", 10) * 1024 * 1024),
+        backupCount=settings.get("backup_count", 5),
+    )
+    file_handler.setFormatter(
+        JsonFormatter() if settings.get("json", True) else logging.Formatter(logging_str)
+    )
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(logging_str))
+
+    handlers = [file_handler, stream_handler]
+    log_queue = queue.SimpleQueue()
+    _queue_handler(log_queue, settings)
+    listener = QueueListener(log_queue, *handlers)
+    listener.start()
+    return handlers, listener
+
+
+_handlers, _listener = _setup_logging()
+
+
+@atexit.register
+def _stop_listener():
+    # Flush what is still queued when the interpreter exits
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def listen_to(log_queue) -> QueueListener:
+    """
+    Write records sent by other processes (see forward_logs_to) to this
+    process's log file and stdout.
+
+    Returns:
+        QueueListener: Started listener; stop() it when the processes exit
+    """
+    listener = QueueListener(log_queue, *_handlers)
+    listener.start()
+    return listener
+
+
+def forward_logs_to(log_queue):
+    """
+    Send this process's records to a multiprocessing queue read by the
+    parent's listen_to(), instead of writing the shared log file from
+    several processes (which breaks rotation).
+    """
+    global _listener
+    _queue_handler(log_queue, _read_settings())
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# 3. Create the logger object
+logger = logging.getLogger(LOGGER_NAME)
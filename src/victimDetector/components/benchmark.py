@@ -0,0 +1,347 @@
+import os
+import sys
+import glob
+import time
+import resource
+import threading
+import tempfile
+import subprocess
+import cv2
+import numpy as np
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from victimDetector import logger
+from victimDetector.entity.config_entity import BenchmarkConfig, PredictionConfig
+from victimDetector.pipeline.prediction import ImagePredictionPipeline, PredictionPipeline
+from victimDetector.utils.common import create_video_writer, load_json, save_json
+from victimDetector.utils.model_registry import model_registry
+
+
+# Stages reported per frame / image, in pipeline order
+STAGES = ("decode", "preprocess", "inference", "postprocess", "encode")
+
+# Throughput metrics compared against the previous run
+THROUGHPUT_KEYS = ("fps", "images_per_second")
+
+# Latency metrics compared against the previous run (lower is better)
+LATENCY_KEYS = ("import_ms",)
+
+# Entry points whose cold import time is measured
+IMPORT_MODULES = ("app",)
+STAGE_MODULES_GLOB = "src/victimDetector/pipeline/stage_*.py"
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Parse the output of python -X importtime.
+
+    Returns:
+        list: (module, depth, cumulative_us) per imported module, where depth
+            0 is a module imported directly by the measured statement
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            # Header line
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, int(cumulative)))
+    return entries
+
+
+def _importtime(statement: str) -> Optional[List[Tuple[str, int, int]]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        logger.warning(f"Could not run '{statement}': {error[0]}")
+        return None
+    return parse_importtime(proc.stderr)
+
+
+def measure_import(module: str, repeats: int) -> Optional[dict]:
+    """
+    Cold import time of module in a fresh interpreter, best of repeats.
+
+    Modules the bare interpreter already imports at startup are not counted.
+
+    Returns:
+        dict: import_ms and the heaviest top-level packages it pulled in,
+            or None if the module cannot be imported here
+    """
+    baseline = {name for name, _, _ in _importtime("pass") or []}
+    root = module.split(".")[0]
+    best = None
+    for _ in range(repeats):
+        entries = _importtime(f"import {module}")
+        if entries is None:
+            return None
+        entries = [entry for entry in entries if entry[0] not in baseline]
+        # Depth 0 holds the module and its parent packages; all else is nested
+        total = sum(us for _, depth, us in entries if depth == 0)
+        if best is None or total < best[0]:
+            best = (total, entries)
+
+    total, entries = best
+    packages = {}
+    for name, _, us in entries:
+        if "." not in name and name not in (root, "victimDetector") and not name.startswith("_"):
+            packages[name] = max(packages.get(name, 0), us)
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:5]
+    return {
+        "import_ms": round(total / 1000, 1),
+        "heaviest_ms": {name: round(us / 1000, 1) for name, us in heaviest},
+    }
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # No /proc (macOS): fall back to the lifetime peak
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class PeakRSS:
+    """
+    Context manager sampling the process RSS in a background thread, so each
+    benchmark run gets its own peak instead of the lifetime maximum.
+    """
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self):
+        self.peak = current_rss()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+    @property
+    def peak_mb(self) -> float:
+        return round(self.peak / (1024 * 1024), 1)
+
+
+class Benchmark:
+    def __init__(self, config: BenchmarkConfig, prediction_config: PredictionConfig):
+        self.config = config
+        self.prediction_config = prediction_config
+
+    def synthetic_video(self, width: int, height: int) -> Path:
+        """
+        Generate (once) a clip of moving person-sized blobs on a textured
+        background at the given resolution.
+        """
+        frames = self.config.params_num_frames
+        path = Path(self.config.root_dir, "videos", f"synthetic_{width}x{height}_{frames}.mp4")
+        if path.exists():
+            return path
+        os.makedirs(path.parent, exist_ok=True)
+
+        rng = np.random.default_rng(0)
+        background = cv2.GaussianBlur(
+            rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (0, 0), sigmaX=8
+        )
+        blobs = rng.uniform(0, 1, (12, 4))
+        writer = create_video_writer(path, 25.0, (width, height))
+        try:
+            for i in range(frames):
+                frame = background.copy()
+                for x, y, vx, vy in blobs:
+                    cx = int(((x + vx * i / frames) % 1.0) * width)
+                    cy = int(((y + vy * i / frames) % 1.0) * height)
+                    w, h = max(4, width // 60), max(8, height // 25)
+                    cv2.rectangle(frame, (cx, cy), (cx + w, cy + h), (40, 60, 180), -1)
+                writer.write(frame)
+        finally:
+            writer.release()
+        logger.info(f"Generated synthetic benchmark video: {path}")
+        return path
+
+    def backends(self) -> dict:
+        """Backends from params whose model exists, name -> model path."""
+        available = {}
+        for backend in self.config.params_backends:
+            model_path = self.config.model_paths.get(backend)
+            if model_path is None:
+                raise ValueError(f"Unknown benchmark backend: {backend}")
+            if not os.path.exists(model_path):
+                logger.warning(f"Skipping {backend} benchmark, no model at {model_path}")
+                continue
+            available[backend] = model_path
+        return available
+
+    def prediction_config_for(self, backend: str, model_path: Path, batch_size: int,
+                              root_dir: Optional[Path] = None) -> PredictionConfig:
+        return replace(
+            self.prediction_config,
+            root_dir=Path(root_dir or Path(self.config.root_dir, "outputs")),
+            model_path=Path(model_path),
+            params_backend=backend,
+            params_batch_size=batch_size,
+            # Every run must actually run inference
+            params_cache_enabled=False,
+        )
+
+    @staticmethod
+    def per_item_ms(timings: dict, count: int) -> dict:
+        return {
+            f"{stage}_ms": round(timings.get(stage, 0.0) / count * 1000, 3) if count else 0.0
+            for stage in STAGES
+        }
+
+    def run_video(self, backend: str, model_path: Path, video: Path, batch_size: int) -> dict:
+        # The rendered video and detections are only written to be timed;
+        # a per-run folder on the same disk is removed with them
+        with tempfile.TemporaryDirectory(prefix=".run-", dir=self.config.root_dir) as output_dir:
+            config = self.prediction_config_for(backend, model_path, batch_size, root_dir=Path(output_dir))
+            pipeline = PredictionPipeline(str(video), config=config, render=self.config.params_render)
+            with PeakRSS() as rss:
+                output = pipeline.predict()
+        if output == "Error":
+            raise RuntimeError(f"Benchmark run failed: {backend} {video.name} batch {batch_size}")
+
+        stats = pipeline.stats
+        return {
+            "fps": stats["fps"],
+            "inference_fps": stats["inference_fps"],
+            "total_seconds": stats["total_seconds"],
+            **self.per_item_ms(pipeline.timings, stats["frames"]),
+            "peak_rss_mb": rss.peak_mb,
+        }
+
+    def run_images(self, backend: str, model_path: Path, batch_size: int) -> dict:
+        paths = sorted(
+            path
+            for ext in ("*.jpg", "*.jpeg", "*.png")
+            for path in glob.glob(os.path.join(self.config.images_dir, ext))
+        )
+        if not paths:
+            return {}
+
+        pipeline = ImagePredictionPipeline(self.prediction_config_for(backend, model_path, batch_size))
+        with PeakRSS() as rss:
+            start = time.perf_counter()
+            for i in range(0, len(paths), batch_size):
+                t0 = time.perf_counter()
+                images = [cv2.imread(path) for path in paths[i:i + batch_size]]
+                pipeline.add_time("decode", time.perf_counter() - t0)
+
+                results = pipeline.predict(images, annotate=True)
+
+                t0 = time.perf_counter()
+                for result in results:
+                    cv2.imencode(".jpg", result["annotated"])
+                pipeline.add_time("encode", time.perf_counter() - t0)
+            total = time.perf_counter() - start
+
+        return {
+            "images_per_second": round(len(paths) / total, 2) if total > 0 else 0.0,
+            "total_seconds": round(total, 3),
+            **self.per_item_ms(pipeline.timings, len(paths)),
+            "peak_rss_mb": rss.peak_mb,
+        }
+
+    def run_imports(self) -> Dict[str, dict]:
+        """
+        Startup cost of the app and of each stage_0x script: the time to
+        import them in a fresh interpreter (run from the project root).
+        """
+        stages = sorted(
+            "victimDetector.pipeline." + Path(path).stem for path in glob.glob(STAGE_MODULES_GLOB)
+        )
+        results = {}
+        for module in IMPORT_MODULES + tuple(stages):
+            metrics = measure_import(module, self.config.params_import_repeats)
+            if metrics is not None:
+                results[module] = metrics
+                logger.info(f"Benchmark import {module}: {metrics}")
+        return results
+
+    def run(self) -> dict:
+        """
+        Benchmark the import time of the entry points, then every available
+        backend on the demo images and the synthetic videos at each batch size.
+
+        Returns:
+            dict: {"imports": {module: metrics},
+                   "videos": {backend: {WxH: {batch_N: metrics}}},
+                   "images": {backend: {batch_N: metrics}}}
+        """
+        results = {"imports": self.run_imports(), "videos": {}, "images": {}}
+        videos = {f"{w}x{h}": self.synthetic_video(w, h) for w, h in self.config.params_resolutions}
+
+        for backend, model_path in self.backends().items():
+            # Load + first inference are not part of the measurements
+            model_registry.warm_up(model_path, imgsz=self.prediction_config.params_imgsz)
+
+            for batch_size in self.config.params_batch_sizes:
+                key = f"batch_{batch_size}"
+                metrics = self.run_images(backend, model_path, batch_size)
+                if metrics:
+                    results["images"].setdefault(backend, {})[key] = metrics
+                    logger.info(f"Benchmark images {backend} {key}: {metrics}")
+
+                for resolution, video in videos.items():
+                    metrics = self.run_video(backend, model_path, video, batch_size)
+                    results["videos"].setdefault(backend, {}).setdefault(resolution, {})[key] = metrics
+                    logger.info(f"Benchmark video {backend} {resolution} {key}: {metrics}")
+
+        return results
+
+    def check_regressions(self, previous: dict, current: dict, path: str = "") -> list:
+        """
+        Compare throughput and latency metrics against the previous results.
+
+        Returns:
+            list: Descriptions of throughput metrics that dropped, or latency
+                metrics that grew, by more than regression_tolerance
+        """
+        regressions = []
+        for key, value in current.items():
+            old = previous.get(key) if isinstance(previous, dict) else None
+            name = f"{path}/{key}" if path else key
+            if isinstance(value, dict):
+                regressions.extend(self.check_regressions(old or {}, value, name))
+            elif key in THROUGHPUT_KEYS + LATENCY_KEYS and isinstance(old, (int, float)) and old > 0:
+                change = (value - old) / old
+                if key in LATENCY_KEYS:
+                    regressed = change > self.config.params_regression_tolerance
+                else:
+                    regressed = change < -self.config.params_regression_tolerance
+                if regressed:
+                    regressions.append(f"{name}: {old} -> {value} ({change:+.1%})")
+        return regressions
+
+    def save_results(self, results: dict):
+        """
+        Write the metrics file, warning about throughput regressions against
+        the version it replaces.
+        """
+        metrics_path = Path(self.config.metrics_path)
+        if metrics_path.exists():
+            regressions = self.check_regressions(dict(load_json(metrics_path)), results)
+            for regression in regressions:
+                logger.warning(f"Benchmark regression {regression}")
+            if not regressions:
+                logger.info("No benchmark regressions against the previous run")
+        save_json(path=metrics_path, data=results)
@@ -0,0 +1,199 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+from victimDetector import logger
+from victimDetector.entity.config_entity import DataPreprocessingConfig
+from victimDetector.utils.common import load_json, save_json
+
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Written into the cache folder; Training only uses a cache built for its imgsz
+MANIFEST_NAME = "preprocess.json"
+
+# Padding colour YOLO itself uses when letterboxing
+PAD_COLOR = (114, 114, 114)
+
+
+def letterbox_geometry(width: int, height: int, imgsz: int, letterbox: bool) -> Tuple[int, int, int, int, int, int]:
+    """
+    Size of the resized image and the canvas it is placed on.
+
+    Returns:
+        tuple: new_w, new_h, canvas_w, canvas_h, pad_left, pad_top
+    """
+    ratio = imgsz / max(width, height)
+    new_w, new_h = max(1, round(width * ratio)), max(1, round(height * ratio))
+    if not letterbox:
+        return new_w, new_h, new_w, new_h, 0, 0
+    return new_w, new_h, imgsz, imgsz, (imgsz - new_w) // 2, (imgsz - new_h) // 2
+
+
+def rescale_label_line(line: str, geometry: Tuple[int, int, int, int, int, int]) -> str:
+    """
+    Map one YOLO label line (normalized to the original image) onto the
+    letterboxed canvas: 'cls cx cy w h' boxes or 'cls x1 y1 x2 y2 ...' polygons.
+    """
+    new_w, new_h, canvas_w, canvas_h, left, top = geometry
+    cls, *values = line.split()
+    values = [float(v) for v in values]
+    sx, sy = new_w / canvas_w, new_h / canvas_h
+    ox, oy = left / canvas_w, top / canvas_h
+    if len(values) == 4:
+        cx, cy, w, h = values
+        values = [cx * sx + ox, cy * sy + oy, w * sx, h * sy]
+    else:
+        values = [v * sx + ox if i % 2 == 0 else v * sy + oy for i, v in enumerate(values)]
+    return " ".join([cls] + [f"{v:.6f}" for v in values])
+
+
+def preprocess_image(
+    src_image: str,
+    src_label: Optional[str],
+    dst_image: str,
+    dst_label: str,
+    imgsz: int,
+    letterbox: bool,
+    jpeg_quality: int
+) -> bool:
+    """
+    Resize one image (and rescale its labels) into the cache. Runs in a
+    worker process.
+
+    Returns:
+        bool: False if the image could not be read
+    """
+    import cv2
+
+    image = cv2.imread(src_image)
+    if image is None:
+        return False
+    height, width = image.shape[:2]
+    geometry = letterbox_geometry(width, height, imgsz, letterbox)
+    new_w, new_h, canvas_w, canvas_h, left, top = geometry
+
+    interpolation = cv2.INTER_AREA if new_w < width else cv2.INTER_LINEAR
+    resized = cv2.resize(image, (new_w, new_h), interpolation=interpolation)
+    if (canvas_w, canvas_h) != (new_w, new_h):
+        resized = cv2.copyMakeBorder(
+            resized, top, canvas_h - new_h - top, left, canvas_w - new_w - left,
+            cv2.BORDER_CONSTANT, value=PAD_COLOR
+        )
+
+    os.makedirs(os.path.dirname(dst_image), exist_ok=True)
+    os.makedirs(os.path.dirname(dst_label), exist_ok=True)
+    # Written under a temp name so an interrupted run never leaves a
+    # truncated image that looks up to date
+    tmp_image = dst_image + ".tmp.jpg"
+    cv2.imwrite(tmp_image, resized, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+    os.replace(tmp_image, dst_image)
+
+    lines = []
+    if src_label is not None:
+        with open(src_label) as f:
+            lines = [rescale_label_line(line, geometry) for line in f if line.strip()]
+    with open(dst_label, "w") as f:
+        f.write("\n".join(lines) + ("\n" if lines else ""))
+    return True
+
+
+class DataPreprocessing:
+    """
+    Pre-resize the dataset to the training imgsz once, instead of YOLO
+    decoding and downsizing the full-resolution aerial images every epoch.
+
+    The cache mirrors the dataset layout (<split>/images, <split>/labels)
+    with letterboxed JPEGs and rescaled labels, so Training can point YOLO at
+    it directly. Reruns only process images newer than their cached copy;
+    changing imgsz, letterbox or jpeg_quality rebuilds everything.
+    """
+
+    def __init__(self, config: DataPreprocessingConfig):
+        self.config = config
+
+    @property
+    def settings(self) -> dict:
+        return {
+            "imgsz": self.config.params_imgsz,
+            "letterbox": self.config.params_letterbox,
+            "jpeg_quality": self.config.params_jpeg_quality,
+        }
+
+    def tasks(self) -> List[tuple]:
+        """(src_image, src_label, dst_image, dst_label) for every dataset image."""
+        tasks = []
+        for split in self.config.params_splits:
+            images_dir = Path(self.config.source_data, split, "images")
+            labels_dir = Path(self.config.source_data, split, "labels")
+            if not images_dir.is_dir():
+                logger.warning(f"No images folder for split '{split}' at {images_dir}, skipping")
+                continue
+            for src_image in sorted(images_dir.iterdir()):
+                if src_image.suffix.lower() not in IMAGE_EXTENSIONS:
+                    continue
+                src_label = labels_dir / f"{src_image.stem}.txt"
+                tasks.append((
+                    str(src_image),
+                    str(src_label) if src_label.exists() else None,
+                    str(Path(self.config.cache_dir, split, "images", f"{src_image.stem}.jpg")),
+                    str(Path(self.config.cache_dir, split, "labels", f"{src_image.stem}.txt")),
+                ))
+        return tasks
+
+    @staticmethod
+    def is_current(task: tuple) -> bool:
+        src_image, src_label, dst_image, dst_label = task
+        if not (os.path.exists(dst_image) and os.path.exists(dst_label)):
+            return False
+        if os.path.getmtime(dst_image) < os.path.getmtime(src_image):
+            return False
+        return src_label is None or os.path.getmtime(dst_label) >= os.path.getmtime(src_label)
+
+    def remove_stale(self, tasks: List[tuple]):
+        """Delete cached files whose source image no longer exists."""
+        expected = {path for task in tasks for path in task[2:]}
+        for split in self.config.params_splits:
+            for folder in ("images", "labels"):
+                directory = Path(self.config.cache_dir, split, folder)
+                if not directory.is_dir():
+                    continue
+                for path in directory.iterdir():
+                    if path.suffix in (".jpg", ".txt") and str(path) not in expected:
+                        path.unlink()
+
+    def run(self):
+        manifest_path = Path(self.config.cache_dir, MANIFEST_NAME)
+        previous = dict(load_json(manifest_path)) if manifest_path.exists() else {}
+        rebuild = previous.get("settings") != self.settings
+
+        tasks = self.tasks()
+        pending = tasks if rebuild else [task for task in tasks if not self.is_current(task)]
+        logger.info(
+            f"Preprocessing {len(pending)} of {len(tasks)} images to {self.config.params_imgsz}px "
+            f"with {self.config.params_max_workers} processes"
+        )
+
+        failed = []
+        if pending:
+            settings = self.settings
+            # Default start method: unlike the job workers these never load
+            # torch, so forking is safe and skips re-importing in every worker
+            with ProcessPoolExecutor(max_workers=self.config.params_max_workers) as pool:
+                results = pool.map(
+                    preprocess_image,
+                    *zip(*pending),
+                    *([value] * len(pending) for value in settings.values()),
+                    chunksize=32,
+                )
+                failed = [task[0] for task, ok in zip(pending, results) if not ok]
+        for path in failed:
+            logger.warning(f"Could not read {path}, left out of the cache")
+
+        self.remove_stale(tasks)
+        save_json(path=manifest_path, data={
+            "settings": self.settings,
+            "source": str(self.config.source_data),
+            "images": len(tasks) - len(failed),
+        })
+        logger.info(f"Preprocessed dataset cached at {self.config.cache_dir}")
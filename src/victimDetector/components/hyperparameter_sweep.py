@@ -0,0 +1,309 @@
+import os
+import json
+import math
+import time
+import random
+import hashlib
+import itertools
+import statistics
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from victimDetector import forward_logs_to, listen_to, log_context, logger
+from victimDetector.entity.config_entity import SweepConfig, TrainingConfig
+from victimDetector.utils.common import cpu_budget, save_json
+
+
+# yolo_params keys that map onto TrainingConfig fields; every other key in
+# the search space is passed to model.train() as is (lr0, mosaic, ...)
+CONFIG_PARAMS = {
+    "epochs": "params_epochs",
+    "batch_size": "params_batch_size",
+    "imgsz": "params_imgsz",
+    "model_type": "params_model_type",
+}
+
+# Environment variables read by torch / OpenMP / BLAS when they start their thread pools
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+def trial_id(params: dict) -> str:
+    """Stable id of a parameter combination, so reruns find finished trials."""
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:10]
+
+
+def _sample(values, rng: random.Random):
+    """A random value: a choice from a list, or from {low, high[, log]} ranges."""
+    if isinstance(values, dict):
+        low, high = values["low"], values["high"]
+        if values.get("log"):
+            value = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            value = rng.uniform(low, high)
+        return int(round(value)) if isinstance(low, int) and isinstance(high, int) else value
+    return rng.choice(list(values))
+
+
+def expand_trials(space: Dict[str, object], method: str, num_trials: int, seed: int) -> List[dict]:
+    """
+    Parameter combinations to train.
+
+    Args:
+        space (dict): yolo_params key -> list of values, or {low, high, log}
+            range (random search only)
+        method (str): 'grid' (every combination) or 'random'
+        num_trials (int): Samples drawn by random search
+        seed (int): Random search seed
+
+    Returns:
+        list: One params dict per trial, duplicates removed
+    """
+    if method == "grid":
+        ranges = [k for k, v in space.items() if isinstance(v, dict)]
+        if ranges:
+            raise ValueError(f"Grid search needs lists of values, got ranges for: {ranges}")
+        keys = list(space)
+        trials = [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+    elif method == "random":
+        rng = random.Random(seed)
+        trials = [{key: _sample(values, rng) for key, values in space.items()} for _ in range(num_trials)]
+    else:
+        raise ValueError(f"Unknown sweep method: {method}")
+
+    unique = {}
+    for params in trials:
+        unique.setdefault(trial_id(params), params)
+    return list(unique.values())
+
+
+def read_history(trial_dir: Path) -> List[float]:
+    path = Path(trial_dir, "history.json")
+    if not path.exists():
+        return []
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except ValueError:
+        # Being rewritten by its trial
+        return []
+
+
+class MedianPruner:
+    """
+    Early stopping across trials: after min_epochs, a trial whose metric is
+    below the median of the other trials at the same epoch is stopped.
+
+    Trials run in separate processes, so each one writes its per-epoch
+    metric to <trial_dir>/history.json and reads its peers' files. Peers are
+    the other trials of the current sweep only: trial folders left by
+    earlier sweeps (another space or metric) are not comparable.
+    """
+
+    def __init__(self, sweep_dir: Path, trial_dir: Path, metric: str, min_epochs: int, min_peers: int,
+                 enabled: bool = True, peer_ids: Iterable[str] = ()):
+        self.sweep_dir = Path(sweep_dir)
+        self.trial_dir = Path(trial_dir)
+        self.peer_ids = sorted(set(peer_ids) - {self.trial_dir.name})
+        self.metric = metric
+        self.min_epochs = min_epochs
+        self.min_peers = min_peers
+        # When disabled the history is still recorded for the leaderboard
+        self.enabled = enabled
+        self.history: List[float] = []
+        self.pruned_at: Optional[int] = None
+
+    def peers_at(self, epoch: int) -> List[float]:
+        values = []
+        for tid in self.peer_ids:
+            history = read_history(self.sweep_dir / tid)
+            if len(history) > epoch:
+                values.append(history[epoch])
+        return values
+
+    def should_stop(self, value: float) -> bool:
+        """Record the metric of the epoch just finished and decide whether to stop."""
+        self.history.append(value)
+        tmp = self.trial_dir / ".history.json.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.history, f)
+        os.replace(tmp, self.trial_dir / "history.json")
+
+        epoch = len(self.history) - 1
+        if not self.enabled or epoch + 1 < self.min_epochs:
+            return False
+        peers = self.peers_at(epoch)
+        if len(peers) < self.min_peers or value >= statistics.median(peers):
+            return False
+        self.pruned_at = epoch + 1
+        return True
+
+    def on_fit_epoch_end(self, trainer):
+        value = float(trainer.metrics.get(self.metric, 0.0))
+        if self.should_stop(value):
+            logger.info(f"Pruning trial {self.trial_dir.name} after epoch {self.pruned_at}: {self.metric}={value:.4f}")
+            # Checked by the trainer right after this callback
+            trainer.stop = True
+
+
+# -------------------- WORKER PROCESS --------------------
+
+def _init_worker(log_queue, threads: int):
+    """Limit every thread pool of the trial process before torch is imported."""
+    forward_logs_to(log_queue)
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    import cv2
+    cv2.setNumThreads(threads)
+
+
+def _run_trial(params: dict, training_config: TrainingConfig, config: SweepConfig, peer_ids: List[str]) -> dict:
+    from victimDetector.components.model_training import Training
+
+    tid = trial_id(params)
+    trial_dir = Path(config.root_dir, "trials", tid)
+    os.makedirs(trial_dir, exist_ok=True)
+    save_json(path=trial_dir / "params.json", data=params)
+
+    overrides = {CONFIG_PARAMS[key]: value for key, value in params.items() if key in CONFIG_PARAMS}
+    train_args = {key: value for key, value in params.items() if key not in CONFIG_PARAMS}
+    if "params_model_type" in overrides and overrides["params_model_type"] != training_config.params_model_type:
+        # Ultralytics fetches other pretrained weights by name
+        overrides["base_model_path"] = overrides["params_model_type"]
+    trial_config = replace(
+        training_config,
+        root_dir=trial_dir,
+        trained_model_path=trial_dir / "model.pt",
+        **overrides
+    )
+
+    pruner = MedianPruner(
+        Path(config.root_dir, "trials"), trial_dir, config.params_metric,
+        config.params_min_epochs, config.params_min_peers, enabled=config.params_early_stopping,
+        peer_ids=peer_ids,
+    )
+    start = time.perf_counter()
+    result = {"trial": tid, "params": params}
+    with log_context(trial=tid):
+        logger.info(f"Trial {tid} started: {params}")
+        try:
+            import torch
+            torch.set_num_threads(config.params_threads_per_trial)
+
+            Training(trial_config).train(
+                callbacks={"on_fit_epoch_end": pruner.on_fit_epoch_end},
+                # Dataloader workers share the trial's thread budget
+                workers=config.params_threads_per_trial,
+                patience=config.params_patience,
+                exist_ok=True,
+                **train_args
+            )
+            result["status"] = "pruned" if pruner.pruned_at else "completed"
+        except Exception as e:
+            logger.exception(f"Trial {tid} failed: {e}")
+            result["status"] = "failed"
+            result["error"] = str(e)
+
+    history = pruner.history or read_history(trial_dir)
+    result.update({
+        "epochs_run": len(history),
+        "best": max(history) if history else None,
+        "final": history[-1] if history else None,
+        "seconds": round(time.perf_counter() - start, 1),
+        "model_path": str(trial_config.trained_model_path) if result["status"] != "failed" else None,
+    })
+    save_json(path=trial_dir / "result.json", data=result)
+    logger.info(f"Trial {tid} {result['status']}: best {config.params_metric}={result['best']}")
+    return result
+
+
+class HyperparameterSweep:
+    """
+    Train one model per parameter combination of the sweep search space,
+    several at a time, and rank them in a leaderboard.
+
+    Trials run in a spawn process pool with max_workers processes, each
+    limited to threads_per_trial torch/OpenMP threads so concurrent trials
+    don't oversubscribe the CPU. Poor trials are stopped early by a median
+    rule on the per-epoch metric, and trials with a result.json from an
+    earlier (interrupted) sweep are not trained again.
+    """
+
+    def __init__(self, config: SweepConfig, training_config: TrainingConfig):
+        self.config = config
+        self.training_config = training_config
+
+    @property
+    def max_workers(self) -> int:
+        if self.config.params_max_workers:
+            return self.config.params_max_workers
+        return max(1, cpu_budget() // self.config.params_threads_per_trial)
+
+    def trials(self) -> List[dict]:
+        return expand_trials(
+            self.config.params_space,
+            self.config.params_method,
+            self.config.params_num_trials,
+            self.config.params_seed,
+        )
+
+    def finished_result(self, params: dict) -> Optional[dict]:
+        path = Path(self.config.root_dir, "trials", trial_id(params), "result.json")
+        if not path.exists():
+            return None
+        with open(path) as f:
+            result = json.load(f)
+        return result if result.get("status") != "failed" else None
+
+    def run(self) -> List[dict]:
+        trials = self.trials()
+        results = [r for r in map(self.finished_result, trials) if r is not None]
+        done = {r["trial"] for r in results}
+        pending = [params for params in trials if trial_id(params) not in done]
+        logger.info(
+            f"Sweep: {len(trials)} trials ({len(results)} already finished), "
+            f"{self.max_workers} at a time with {self.config.params_threads_per_trial} threads each"
+        )
+        os.makedirs(Path(self.config.root_dir, "trials"), exist_ok=True)
+
+        if pending:
+            # 'spawn' so every trial starts torch with its own thread limits
+            context = multiprocessing.get_context("spawn")
+            log_queue = context.Queue()
+            log_listener = listen_to(log_queue)
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=min(self.max_workers, len(pending)),
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(log_queue, self.config.params_threads_per_trial),
+                ) as pool:
+                    peer_ids = [trial_id(params) for params in trials]
+                    futures = [
+                        pool.submit(_run_trial, params, self.training_config, self.config, peer_ids)
+                        for params in pending
+                    ]
+                    for future in as_completed(futures):
+                        results.append(future.result())
+                        self.save_leaderboard(results)
+            finally:
+                log_listener.stop()
+
+        return self.save_leaderboard(results)
+
+    def save_leaderboard(self, results: List[dict]) -> List[dict]:
+        """
+        Rank trials by their best metric and write the leaderboard file.
+        """
+        ranked = sorted(
+            results,
+            key=lambda r: (r["best"] is not None, r["best"] or 0.0),
+            reverse=True,
+        )
+        save_json(path=Path(self.config.leaderboard_path), data={
+            "metric": self.config.params_metric,
+            "best": ranked[0] if ranked and ranked[0]["best"] is not None else None,
+            "trials": ranked,
+        })
+        return ranked
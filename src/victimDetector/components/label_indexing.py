@@ -0,0 +1,47 @@
+import os
+from pathlib import Path
+from victimDetector import logger
+from victimDetector.entity.config_entity import LabelIndexConfig
+from victimDetector.utils.common import save_json
+from victimDetector.utils.label_index import LabelIndex
+
+
+class LabelIndexing:
+    def __init__(self, config: LabelIndexConfig):
+        self.config = config
+
+    def build_index(self) -> LabelIndex:
+        """
+        Refresh the columnar label index, re-parsing only label files that
+        changed since the last run.
+        """
+        return LabelIndex.refresh(
+            self.config.root_dir,
+            self.config.source_data,
+            self.config.params_splits,
+            max_workers=self.config.params_max_workers,
+        )
+
+    def save_stats(self, index: LabelIndex) -> dict:
+        """
+        Write per-split statistics and the most crowded images to stats_path.
+        """
+        stats = {
+            split: index.stats(self.config.params_imgsz, self.config.params_small_object_px, split)
+            for split in [None] + list(self.config.params_splits)
+            if split is None or index.image_mask(split).any()
+        }
+        stats = {"all" if split is None else split: value for split, value in stats.items()}
+        stats["crowded_images"] = [
+            {"path": path, "boxes": boxes}
+            for path, boxes in index.crowded_images(self.config.params_crowded_min_boxes)[:50]
+        ]
+        save_json(path=Path(self.config.stats_path), data=stats)
+        logger.info(f"Dataset stats: {stats['all']}")
+        return stats
+
+    def run(self):
+        if not os.path.isdir(self.config.source_data):
+            raise FileNotFoundError(f"Dataset not found at {self.config.source_data}, run data ingestion first")
+        index = self.build_index()
+        self.save_stats(index)
@@ -1,47 +1,254 @@
 import os
-import mlflow
-import dagshub
+import json
+import time
+import hashlib
+import numpy as np
 from urllib.parse import urlparse
 from pathlib import Path
-from ultralytics import YOLO
+from typing import Dict, List
+from victimDetector import logger
 from victimDetector.utils.common import save_json
+from victimDetector.utils.detection_metrics import DetectionMetrics, match_predictions, xywh_to_xyxy
+from victimDetector.utils.label_index import LabelIndex, letterbox_size
+from victimDetector.utils.model_registry import model_registry
 from victimDetector.entity.config_entity import EvaluationConfig
 
+
+# Confidence thresholds searched for the best F1
+F1_GRID = np.linspace(0.001, 0.999, 999)
+
+
 class Evaluation:
+    """
+    Evaluate the trained model on the test split.
+
+    Raw predictions (down to params min_conf) are cached per model hash and
+    inference settings, so only a new model or new test images pay for
+    inference. Ground truth comes from the label index, and every metric
+    (mAP, precision / recall over a sweep of confidence and IoU thresholds,
+    per object size) is computed from the cache with vectorized NumPy.
+    """
+
     def __init__(self, config: EvaluationConfig):
         self.config = config
 
+    # -------------------- PREDICTION CACHE --------------------
+
+    @property
+    def inference_settings(self) -> dict:
+        return {
+            "imgsz": self.config.params_imgsz,
+            "nms_iou": self.config.params_nms_iou,
+            "min_conf": self.config.params_min_conf,
+        }
+
+    def predictions_path(self, model_hash: str) -> Path:
+        settings = hashlib.sha256(json.dumps(self.inference_settings, sort_keys=True).encode()).hexdigest()[:8]
+        return Path(self.config.predictions_dir, f"{model_hash[:16]}-{settings}.npz")
+
+    def run_inference(self, paths: List[str]) -> Dict[str, np.ndarray]:
+        """
+        (N, 6) x1, y1, x2, y2 (normalized), conf, class detections per image.
+        """
+        from victimDetector.pipeline.prediction import detections_from_result
+
+        model, _ = model_registry.get(self.config.path_of_model)
+        detections = {}
+        batch = self.config.params_batch_size
+        for i in range(0, len(paths), batch):
+            results = model.predict(
+                source=paths[i:i + batch],
+                conf=self.config.params_min_conf,
+                iou=self.config.params_nms_iou,
+                imgsz=self.config.params_imgsz,
+                batch=batch,
+                verbose=False
+            )
+            for path, result in zip(paths[i:i + batch], results):
+                det = detections_from_result(result)
+                height, width = result.orig_shape[:2]
+                det[:, :4] /= np.array([width, height, width, height], dtype=np.float32)
+                detections[path] = det
+        return detections
+
+    def cached_predictions(self, paths: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Detections of every image, inferring only the images missing from
+        the cache of the current model.
+        """
+        path = self.predictions_path(model_registry.model_hash(self.config.path_of_model))
+        # An image rewritten in place (e.g. re-extracted) gets a new key
+        keys = {p: f"{p}|{os.stat(p).st_mtime_ns}" for p in paths}
+        cached = {}
+        if path.exists():
+            with np.load(path) as data:
+                rows = np.split(data["detections"], data["offsets"][1:-1])
+                cached = dict(zip(data["paths"].tolist(), rows))
+
+        missing = [p for p in paths if keys[p] not in cached]
+        logger.info(f"Test predictions: {len(paths) - len(missing)} of {len(paths)} images cached in {path}")
+        if missing:
+            start = time.perf_counter()
+            cached.update({keys[p]: det for p, det in self.run_inference(missing).items()})
+            logger.info(f"Inference on {len(missing)} images took {time.perf_counter() - start:.1f}s")
+
+            # Entries of removed or rewritten images are dropped
+            cached = {keys[p]: cached[keys[p]] for p in paths}
+            names = sorted(cached)
+            counts = [len(cached[name]) for name in names]
+            os.makedirs(path.parent, exist_ok=True)
+            tmp = path.with_name(f".{path.stem}.tmp.npz")
+            np.savez(
+                tmp,
+                paths=np.array(names),
+                offsets=np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+                detections=np.concatenate([cached[name] for name in names]) if names else np.zeros((0, 6), np.float32),
+            )
+            os.replace(tmp, path)
+        return {p: cached[keys[p]] for p in paths}
+
+    # -------------------- METRICS --------------------
+
     def evaluation(self):
         """
         Loads the trained model and evaluates it on the TEST set.
         """
-        # 1. Load the model trained in the previous step
-        print(f"Loading model from: {self.config.path_of_model}")
-        self.model = YOLO(self.config.path_of_model)
-        
-        # 2. Run Validation on the TEST split (Unseen Data)
-        # This calculates true performance metrics
-        self.metrics = self.model.val(
-            data=self.config.training_data,
-            imgsz=self.config.params_imgsz,
-            batch=self.config.params_batch_size,
-            split='test'  # <--- Ensures we are testing on unseen data
+        index = LabelIndex.load(self.config.label_index_dir)
+        test_ids = np.flatnonzero(index.image_mask("test"))
+        paths = [index.images[i]["path"] for i in test_ids]
+        if not paths:
+            raise ValueError(f"No test images in the label index at {self.config.label_index_dir}")
+        logger.info(f"Evaluating {self.config.path_of_model} on {len(paths)} test images")
+
+        # 1. Predictions of the (possibly cached) model
+        detections = self.cached_predictions(paths)
+
+        start = time.perf_counter()
+        counts = [len(detections[p]) for p in paths]
+        pred = np.concatenate([detections[p] for p in paths]) if paths else np.zeros((0, 6), np.float32)
+        pred_image = np.repeat(np.arange(len(paths)), counts)
+
+        # 2. Ground truth of the test split, image ids renumbered like the predictions
+        position = np.full(len(index.images), -1, dtype=np.int64)
+        position[test_ids] = np.arange(len(test_ids))
+        mask = index.box_mask("test")
+        columns = {name: np.asarray(column[mask]) for name, column in index.columns.items()}
+        gt_image = position[columns["image_id"]]
+        gt_cls = columns["class"].astype(np.int64)
+        gt_boxes = xywh_to_xyxy(np.stack([columns["x"], columns["y"], columns["w"], columns["h"]], axis=1))
+
+        # 3. True positives at every IoU threshold, then metrics at any confidence
+        pred_cls = pred[:, 5].astype(np.int64)
+        correct, matched_gt = match_predictions(pred_image, pred[:, :4], pred_cls, gt_image, gt_boxes, gt_cls)
+        self.metrics = DetectionMetrics(pred[:, 4], pred_cls, correct, gt_cls)
+
+        # Size of each box in pixels of the letterboxed input; predictions
+        # take the size of their match
+        imgsz = self.config.params_imgsz
+        gt_size = index.box_sizes("test", imgsz)
+        widths, heights = index.widths[test_ids], index.heights[test_ids]
+        pred_size = letterbox_size(
+            np.clip(pred[:, 2] - pred[:, 0], 0, None), np.clip(pred[:, 3] - pred[:, 1], 0, None),
+            widths[pred_image], heights[pred_image], imgsz,
         )
-        
-        # 3. Save local JSON score for DVC tracking
+        pred_size = np.where(matched_gt >= 0, gt_size[np.maximum(matched_gt, 0)] if len(gt_size) else 0, pred_size)
+        self.size_metrics = self.metrics_by_size(pred, pred_cls, correct, pred_size, gt_cls, gt_size)
+
+        self.scores = self.operating_point()
+        self.save_threshold_sweep()
+        logger.info(f"Metrics computed in {(time.perf_counter() - start) * 1000:.0f} ms: {self.scores}")
+
+        self.dataset_stats()
+
+        # 4. Save local JSON score for DVC tracking
         self.save_score()
 
-    def save_score(self):
-        scores = {
-            "map50": self.metrics.box.map50,
-            "map": self.metrics.box.map,
-            "precision": self.metrics.box.mp,
-            "recall": self.metrics.box.mr
+    def metrics_by_size(self, pred, pred_cls, correct, pred_size, gt_cls, gt_size) -> Dict[str, DetectionMetrics]:
+        """DetectionMetrics of the small / medium / large objects (params size_buckets_px)."""
+        edges = [0.0] + list(self.config.params_size_buckets_px) + [np.inf]
+        names = ["small", "medium", "large"] if len(edges) == 4 else [
+            f"{low:g}-{high:g}px" for low, high in zip(edges[:-1], edges[1:])
+        ]
+        buckets = {}
+        for name, low, high in zip(names, edges[:-1], edges[1:]):
+            p = (pred_size >= low) & (pred_size < high)
+            g = (gt_size >= low) & (gt_size < high)
+            buckets[name] = DetectionMetrics(pred[p, 4], pred_cls[p], correct[p], gt_cls[g])
+        return buckets
+
+    def operating_point(self) -> dict:
+        """Scores at the deployment conf_threshold, plus the conf with the best F1."""
+        at_conf = self.metrics.at([self.config.params_conf_threshold])
+        best = self.metrics.at(F1_GRID)
+        i = int(np.argmax(best["f1"]))
+        return {
+            "map50": round(self.metrics.map(0.5), 4),
+            "map": round(self.metrics.map(), 4),
+            # Not Ultralytics' precision / recall (mp / mr at its best-F1
+            # confidence), hence the different names
+            "precision_at_conf": round(float(at_conf["precision"][0]), 4),
+            "recall_at_conf": round(float(at_conf["recall"][0]), 4),
+            "conf_threshold": self.config.params_conf_threshold,
+            "best_f1": round(float(best["f1"][i]), 4),
+            "best_f1_conf": round(float(best["conf"][i]), 3),
         }
-        save_json(path=Path("scores.json"), data=scores)
+
+    def threshold_sweep(self, metrics: DetectionMetrics) -> dict:
+        step = self.config.params_conf_step
+        confs = np.round(np.arange(step, 1.0, step), 4)
+        sweep = {}
+        for iou in self.config.params_iou_thresholds:
+            values = metrics.at(confs, iou=iou)
+            sweep[f"{iou:g}"] = {
+                key: [round(float(v), 4) if key in ("conf", "precision", "recall", "f1") else int(v) for v in column]
+                for key, column in values.items()
+            }
+        return sweep
+
+    def save_threshold_sweep(self) -> dict:
+        """
+        Precision / recall / F1 over the confidence grid at each reporting
+        IoU threshold, overall and per object size, for picking conf_threshold.
+        """
+        report = {
+            "model_sha256": model_registry.model_hash(self.config.path_of_model),
+            "inference": self.inference_settings,
+            "scores": self.scores,
+            "iou": self.threshold_sweep(self.metrics),
+            "sizes": {
+                name: {
+                    "gt_boxes": metrics.num_gt,
+                    "map50": round(metrics.map(0.5), 4),
+                    "map": round(metrics.map(), 4),
+                    "iou": self.threshold_sweep(metrics),
+                }
+                for name, metrics in self.size_metrics.items()
+            },
+        }
+        save_json(path=Path(self.config.sweep_path), data=report)
+        return report
+
+    def dataset_stats(self) -> dict:
+        """
+        Test split statistics from the label index, to read the scores
+        against (e.g. a high small-object fraction explains a low recall).
+        """
+        try:
+            index = LabelIndex.load(self.config.label_index_dir)
+        except FileNotFoundError:
+            return {}
+        stats = index.stats(self.config.params_imgsz, self.config.params_small_object_px, split="test")
+        logger.info(f"Test split: {stats}")
+        return stats
+
+    def save_score(self):
+        save_json(path=Path("scores.json"), data=self.scores)
         print("Scores saved to scores.json")
 
     def log_into_mlflow(self):
+        import dagshub
+        import mlflow
+
         # 1. Initialize DagsHub Connection
         # This automatically sets up the environment for MLflow
         dagshub.init(
@@ -60,14 +267,10 @@ class Evaluation:
         with mlflow.start_run():
             # A. Log Hyperparameters
             mlflow.log_params(self.config.all_params)
+            mlflow.log_params({f"test_{key}": value for key, value in self.dataset_stats().items()})
             
             # B. Log Metrics
-            mlflow.log_metrics({
-                "map50": self.metrics.box.map50,
-                "map": self.metrics.box.map,
-                "precision": self.metrics.box.mp,
-                "recall": self.metrics.box.mr
-            })
+            mlflow.log_metrics(self.scores)
             
             # C. Log the Model File
             # We log the best.pt file so you can download it from DagsHub later
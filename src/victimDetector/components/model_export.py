@@ -0,0 +1,140 @@
+import os
+import glob
+import shutil
+import numpy as np
+from pathlib import Path
+from victimDetector import logger
+from victimDetector.entity.config_entity import ModelExportConfig
+from victimDetector.utils.boxes import box_iou, match_boxes
+from victimDetector.utils.common import save_json
+
+
+class ModelExport:
+    def __init__(self, config: ModelExportConfig):
+        self.config = config
+
+    def target_path(self, fmt: str) -> Path:
+        if fmt == "onnx":
+            return self.config.onnx_model_path
+        if fmt == "openvino":
+            return self.config.openvino_model_path
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    def export(self):
+        """
+        Export the trained model.pt to every format in params export.formats.
+        """
+        from ultralytics import YOLO
+
+        for fmt in self.config.params_formats:
+            target = Path(self.target_path(fmt))
+            logger.info(f"Exporting {self.config.trained_model_path} to {fmt} (int8={self.config.params_int8})")
+
+            # Ultralytics writes the export next to the .pt; it is moved into
+            # model_export/ below so the training folder stays untouched
+            model = YOLO(self.config.trained_model_path)
+            exported = model.export(
+                format=fmt,
+                imgsz=self.config.params_imgsz,
+                dynamic=self.config.params_dynamic,
+                # OpenVINO INT8 uses NNCF post-training quantization on the dataset
+                int8=self.config.params_int8 and fmt == "openvino",
+                data=str(self.config.data_yaml) if fmt == "openvino" else None,
+            )
+
+            if os.path.isdir(target):
+                shutil.rmtree(target)
+            elif os.path.exists(target):
+                os.remove(target)
+            shutil.move(str(exported), str(target))
+
+            if fmt == "onnx" and self.config.params_int8:
+                self.quantize_onnx(target)
+
+            logger.info(f"Exported {fmt} model saved at: {target}")
+
+    def quantize_onnx(self, model_path: Path):
+        """
+        Dynamic INT8 quantization of the ONNX weights (onnxruntime is only
+        needed when export.int8 is set).
+        """
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        tmp_path = str(model_path) + ".fp32"
+        shutil.move(str(model_path), tmp_path)
+        quantize_dynamic(tmp_path, str(model_path), weight_type=QuantType.QUInt8)
+        os.remove(tmp_path)
+        logger.info(f"Quantized ONNX model to INT8: {model_path}")
+
+    def sample_images(self):
+        images = []
+        for ext in ("*.jpg", "*.jpeg", "*.png"):
+            images.extend(glob.glob(os.path.join(self.config.sample_images_dir, ext)))
+        return sorted(images)[: self.config.params_parity_samples]
+
+    def parity_check(self) -> dict:
+        """
+        Compare detections of each exported model against the PyTorch model
+        on sample test images and save the report.
+        """
+        from ultralytics import YOLO
+        # prediction pulls in cv2, which only the parity check needs
+        from victimDetector.pipeline.prediction import detections_from_result
+
+        images = self.sample_images()
+        if not images:
+            logger.warning(f"No images found in {self.config.sample_images_dir}, skipping parity check")
+            return {}
+
+        predict_args = dict(
+            imgsz=self.config.params_imgsz,
+            conf=self.config.params_conf_threshold,
+            verbose=False,
+        )
+        reference = [
+            detections_from_result(r)
+            for r in YOLO(self.config.trained_model_path).predict(source=images, **predict_args)
+        ]
+
+        report = {}
+        for fmt in self.config.params_formats:
+            exported = YOLO(str(self.target_path(fmt)), task="detect")
+            candidate = [detections_from_result(r) for r in exported.predict(source=images, **predict_args)]
+            report[fmt] = self.compare(reference, candidate)
+
+            status = "OK" if report[fmt]["match_rate"] >= self.config.params_parity_min_match else "MISMATCH"
+            logger.info(f"Parity {fmt}: {report[fmt]} [{status}]")
+            if status == "MISMATCH":
+                logger.warning(
+                    f"{fmt} model matches only {report[fmt]['match_rate']:.2%} of PyTorch detections "
+                    f"(minimum {self.config.params_parity_min_match:.2%})"
+                )
+
+        save_json(path=Path(self.config.parity_report_path), data=report)
+        return report
+
+    @staticmethod
+    def compare(reference, candidate, iou_threshold: float = 0.5) -> dict:
+        """
+        Match detections image by image and summarize agreement.
+        """
+        matched, ref_total, cand_total = 0, 0, 0
+        ious, conf_diffs = [], []
+        for ref, cand in zip(reference, candidate):
+            ref_total += len(ref)
+            cand_total += len(cand)
+            idx_r, idx_c = match_boxes(ref, cand, iou_threshold)
+            matched += len(idx_r)
+            if len(idx_r):
+                ious.extend(np.diag(box_iou(ref[idx_r], cand[idx_c])).tolist())
+                conf_diffs.extend(np.abs(ref[idx_r, 4] - cand[idx_c, 4]).tolist())
+
+        denominator = max(ref_total, cand_total)
+        return {
+            "images": len(reference),
+            "reference_boxes": ref_total,
+            "exported_boxes": cand_total,
+            "match_rate": round(matched / denominator, 4) if denominator else 1.0,
+            "mean_iou": round(float(np.mean(ious)), 4) if ious else None,
+            "mean_conf_diff": round(float(np.mean(conf_diffs)), 4) if conf_diffs else None,
+        }
@@ -1,16 +1,53 @@
 import os
 import shutil
 import yaml
-from ultralytics import YOLO, settings  # <--- IMPORT settings
+from pathlib import Path
+from victimDetector import logger
+from victimDetector.components.data_preprocessing import MANIFEST_NAME
 from victimDetector.entity.config_entity import TrainingConfig
+from victimDetector.utils.common import load_json, save_json
+from victimDetector.utils.label_index import LabelIndex
 
 class Training:
     def __init__(self, config: TrainingConfig):
         self.config = config
 
+    def dataset_path(self) -> Path:
+        """
+        The preprocessed cache if it was built for params imgsz, so YOLO
+        loads small pre-resized images, otherwise the raw dataset.
+        """
+        manifest_path = Path(self.config.preprocessed_data, MANIFEST_NAME)
+        if manifest_path.exists():
+            settings = load_json(manifest_path).settings
+            if settings.imgsz == self.config.params_imgsz:
+                logger.info(f"Training on the preprocessed dataset at {self.config.preprocessed_data}")
+                return self.config.preprocessed_data
+            logger.warning(
+                f"Preprocessed dataset is {settings.imgsz}px, not {self.config.params_imgsz}px; "
+                "rerun the preprocessing stage. Using the raw dataset"
+            )
+        else:
+            logger.warning("No preprocessed dataset found, training on the raw images")
+        return self.config.training_data
+
+    def dataset_stats(self) -> dict:
+        """
+        Train split statistics from the label index (empty if it was not
+        built), saved next to the training run.
+        """
+        try:
+            index = LabelIndex.load(self.config.label_index_dir)
+        except FileNotFoundError:
+            logger.warning("No label index found, run the label index stage for dataset stats")
+            return {}
+        stats = index.stats(self.config.params_imgsz, self.config.params_small_object_px, split="train")
+        save_json(path=Path(self.config.root_dir, "dataset_stats.json"), data=stats)
+        logger.info(f"Train split: {stats}")
+        return stats
+
     def create_data_yaml(self):
-        # ... (keep this part exactly the same) ...
-        data_path = self.config.training_data
+        data_path = self.dataset_path()
         yaml_content = {
             'path': str(data_path),
             'train': 'train/images',
@@ -23,7 +60,19 @@ class Training:
             yaml.dump(yaml_content, f)
         return yaml_save_path
 
-    def train(self):
+    def train(self, callbacks: dict = None, **train_args):
+        """
+        Train the base model on the dataset and copy best.pt to trained_model_path.
+
+        Args:
+            callbacks (dict): Ultralytics event name -> callback(trainer)
+            train_args: Extra model.train() arguments (lr0, workers, ...)
+
+        Returns:
+            Ultralytics training results
+        """
+        from ultralytics import YOLO, settings
+
         # ---------------------------------------------------------
         # 1. DISABLE AUTO MLFLOW LOGGING
         # ---------------------------------------------------------
@@ -34,9 +83,12 @@ class Training:
         # 2. START TRAINING
         # ---------------------------------------------------------
         data_yaml_path = self.create_data_yaml()
+        self.dataset_stats()
         
         # Load base model
         model = YOLO(self.config.base_model_path)
+        for event, callback in (callbacks or {}).items():
+            model.add_callback(event, callback)
         
         print(f"🚀 Starting YOLO Training (MLflow auto-log disabled)...")
         
@@ -47,7 +99,8 @@ class Training:
             batch=self.config.params_batch_size,
             name="yolo_model",
             project=str(self.config.root_dir),
-            device="cpu"
+            device="cpu",
+            **train_args
         )
         
         # ---------------------------------------------------------
@@ -64,4 +117,6 @@ class Training:
             # Optional: Now you can safely delete the raw runs folder if you want
             # shutil.rmtree(yolo_save_dir, ignore_errors=True)
         else:
-            print(f"⚠️ Error: Could not find {best_model_generated}")
\ No newline at end of file
+            print(f"⚠️ Error: Could not find {best_model_generated}")
+
+        return results
\ No newline at end of file
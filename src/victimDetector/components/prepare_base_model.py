@@ -3,7 +3,6 @@ import os
 from pathlib import Path
 from victimDetector.constants import *
 from victimDetector.entity.config_entity import PrepareBaseModelConfig
-from ultralytics import YOLO
 
 import shutil
 
@@ -13,6 +12,8 @@ class PrepareBaseModel:
 
 
     def get_base_model(self):
+        from ultralytics import YOLO
+
         # This downloads yolov8n.pt from Ultralytics servers
         print(f"Downloading base model: {self.config.params_model_type}")
         model = YOLO(self.config.params_model_type) 
@@ -1,38 +1,152 @@
-
 import os
+import copy
+import threading
+from functools import wraps
 from victimDetector.constants import *
-from victimDetector.utils.common import read_yaml, create_directories
+from victimDetector.config.schema import CONFIG_SCHEMA, PARAMS_SCHEMA, schema_errors
+from victimDetector.utils.common import read_yaml, create_directories, cpu_budget
 from pathlib import Path
+from typing import Dict, Tuple
+
+from box import ConfigBox
+
+from victimDetector.entity.config_entity import (DataIngestionConfig, DataPreprocessingConfig, LabelIndexConfig, SweepConfig, PrepareBaseModelConfig , TrainingConfig , EvaluationConfig,
+                                                 ModelExportConfig, PredictionConfig, BenchmarkConfig, LiveStreamConfig, UploadConfig, JobQueueConfig, StageRunnerConfig)
+
+
+
+# Parsed YAML files and built config entities, shared by every
+# ConfigurationManager of the process and dropped when a file changes
+_lock = threading.Lock()
+_parsed: Dict[str, Tuple[tuple, ConfigBox]] = {}
+# (getter, args, config path, params path) -> (file signatures, entity, directories)
+_built: Dict[tuple, tuple] = {}
+# Directories ensured by the entity being built on this thread
+_building = threading.local()
+
+
+def _signature(path: Path) -> tuple:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_yaml(path: Path, schema: dict) -> ConfigBox:
+    """
+    read_yaml, parsed and validated once per process and only read again
+    when the file's mtime or size changes.
+
+    Raises:
+        ValueError: If the file does not match the schema
+    """
+    path = Path(path)
+    key = str(path.resolve())
+    signature = _signature(path)
+    with _lock:
+        cached = _parsed.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    content = read_yaml(path)
+    errors = schema_errors(content, schema)
+    if errors:
+        raise ValueError(f"Invalid {path}:\n  " + "\n  ".join(errors))
+    with _lock:
+        _parsed[key] = (signature, content)
+    return content
 
-from victimDetector.entity.config_entity import (DataIngestionConfig, PrepareBaseModelConfig , TrainingConfig , EvaluationConfig)
 
+def memoized(method):
+    """
+    Build a config entity once per version of config.yaml and params.yaml.
+
+    Every call returns its own deep copy, so a caller changing a list or the
+    params box of its entity does not change anyone else's. The directories
+    the build ensured are checked again on every call, since they may have
+    been deleted since.
+    """
+    @wraps(method)
+    def wrapper(self, *args):
+        slot = (method.__name__, args, str(self.config_filepath.resolve()), str(self.params_filepath.resolve()))
+        signature = (_signature(self.config_filepath), _signature(self.params_filepath))
+        with _lock:
+            cached = _built.get(slot)
+        if cached is not None and cached[0] == signature:
+            _, value, directories = cached
+            ensure_directories(directories)
+            return copy.deepcopy(value)
+
+        outer = getattr(_building, "directories", None)
+        _building.directories = []
+        try:
+            value = method(self, *args)
+            directories = _building.directories
+        finally:
+            _building.directories = outer
+        if outer is not None:
+            outer.extend(directories)
+        with _lock:
+            # Replaces the entity built from the previous version of the files
+            _built[slot] = (signature, value, directories)
+        return copy.deepcopy(value)
+    return wrapper
+
+
+def ensure_directories(paths: list):
+    """create_directories for the paths that don't exist yet."""
+    building = getattr(_building, "directories", None)
+    if building is not None:
+        building.extend(paths)
+    missing = [path for path in paths if not os.path.isdir(path)]
+    if missing:
+        create_directories(missing)
 
 
 
 class ConfigurationManager:
+    """
+    Builds the config entities of every stage and of the serving path.
+
+    Cheap to construct: the YAML files are parsed once per process (and again
+    only after they change), and get_*_config() results are reused until then.
+    """
+
     def __init__(
         self,
         config_filepath = CONFIG_FILE_PATH,
         params_filepath = PARAMS_FILE_PATH):
 
-        self.config = read_yaml(config_filepath)
-        self.params = read_yaml(params_filepath)
+        self.config_filepath = Path(config_filepath)
+        self.params_filepath = Path(params_filepath)
 
-    
+        # Parse and validate both files up front
+        config, _ = self.config, self.params
+        ensure_directories([config.artifacts_root])
 
-        create_directories([self.config.artifacts_root])
+    @property
+    def config(self) -> ConfigBox:
+        return load_yaml(self.config_filepath, CONFIG_SCHEMA)
 
-    
+    @property
+    def params(self) -> ConfigBox:
+        return load_yaml(self.params_filepath, PARAMS_SCHEMA)
+
+    @memoized
     def get_data_ingestion_config(self) -> DataIngestionConfig:
         config = self.config.data_ingestion
+        params = self.params.data_ingestion
 
-        create_directories([config.root_dir])
+        ensure_directories([config.root_dir])
 
         data_ingestion_config = DataIngestionConfig(
             root_dir=config.root_dir,
             source_url =config.source_URL,
             local_data_file=config.local_data_file,
-            unzip_dir=config.unzip_dir 
+            unzip_dir=config.unzip_dir,
+            dataset_dir=Path(config.dataset_dir),
+            source_sha256=config.get("source_sha256") or "",
+            state_file=Path(config.state_file),
+            params_max_workers=params.max_workers,
+            params_incremental=params.incremental
         )
 
         return data_ingestion_config
@@ -40,10 +154,11 @@ class ConfigurationManager:
 
 
 
+    @memoized
     def get_prepare_base_model_config(self) -> PrepareBaseModelConfig:
         config = self.config.prepare_base_model
         
-        create_directories([config.root_dir])
+        ensure_directories([config.root_dir])
 
         prepare_base_model_config = PrepareBaseModelConfig(
             root_dir=Path(config.root_dir),
@@ -56,21 +171,65 @@ class ConfigurationManager:
 
 
 
+    @memoized
+    def get_data_preprocessing_config(self) -> DataPreprocessingConfig:
+        preprocessing = self.config.data_preprocessing
+        params = self.params.preprocessing
+
+        ensure_directories([preprocessing.root_dir])
+
+        data_preprocessing_config = DataPreprocessingConfig(
+            root_dir=Path(preprocessing.root_dir),
+            source_data=Path(self.config.data_ingestion.dataset_dir),
+            cache_dir=Path(preprocessing.cache_dir),
+            params_imgsz=self.params.yolo_params.imgsz,
+            params_letterbox=params.letterbox,
+            params_jpeg_quality=params.jpeg_quality,
+            params_max_workers=params.max_workers or cpu_budget(),
+            params_splits=list(params.splits)
+        )
+
+        return data_preprocessing_config
+
+    @memoized
+    def get_label_index_config(self) -> LabelIndexConfig:
+        label_index = self.config.label_index
+        params = self.params.label_index
+
+        ensure_directories([label_index.root_dir])
+
+        label_index_config = LabelIndexConfig(
+            root_dir=Path(label_index.root_dir),
+            source_data=Path(self.config.data_ingestion.dataset_dir),
+            stats_path=Path(label_index.stats_path),
+            params_splits=list(params.splits),
+            params_max_workers=params.max_workers or cpu_budget(),
+            params_imgsz=self.params.yolo_params.imgsz,
+            params_small_object_px=params.small_object_px,
+            params_crowded_min_boxes=params.crowded_min_boxes
+        )
+
+        return label_index_config
+
+    @memoized
     def get_training_config(self) -> TrainingConfig:
         training = self.config.training
         prepare_base_model = self.config.prepare_base_model
         params = self.params.yolo_params
         
         # Pointing to the Unzipped Data from Data Ingestion
-        training_data = os.path.join(self.config.data_ingestion.unzip_dir, "C2A_Dataset")
+        training_data = str(self.config.data_ingestion.dataset_dir)
         
-        create_directories([Path(training.root_dir)])
+        ensure_directories([Path(training.root_dir)])
 
         training_config = TrainingConfig(
             root_dir=Path(training.root_dir),
             trained_model_path=Path(training.trained_model_path),
             base_model_path=Path(prepare_base_model.base_model_path),
             training_data=Path(training_data),
+            preprocessed_data=Path(self.config.data_preprocessing.cache_dir),
+            label_index_dir=Path(self.config.label_index.root_dir),
+            params_small_object_px=self.params.label_index.small_object_px,
             params_epochs=params.epochs,
             params_batch_size=params.batch_size,
             params_imgsz=params.imgsz,
@@ -83,30 +242,254 @@ class ConfigurationManager:
 
 
 
+    @memoized
+    def get_sweep_config(self) -> SweepConfig:
+        sweep = self.config.sweep
+        params = self.params.sweep
+
+        ensure_directories([sweep.root_dir])
+
+        sweep_config = SweepConfig(
+            root_dir=Path(sweep.root_dir),
+            leaderboard_path=Path(sweep.leaderboard_path),
+            params_method=params.method,
+            params_space=params.space.to_dict(),
+            params_num_trials=params.num_trials,
+            params_seed=params.seed,
+            params_max_workers=params.max_workers,
+            params_threads_per_trial=params.threads_per_trial,
+            params_metric=params.metric,
+            params_early_stopping=params.early_stopping,
+            params_min_epochs=params.min_epochs,
+            params_min_peers=params.min_peers,
+            params_patience=params.patience
+        )
+
+        return sweep_config
+
+    @memoized
+    def get_model_export_config(self) -> ModelExportConfig:
+        model_export = self.config.model_export
+        training = self.config.training
+        params = self.params.export
+
+        ensure_directories([model_export.root_dir])
+
+        model_export_config = ModelExportConfig(
+            root_dir=Path(model_export.root_dir),
+            trained_model_path=Path(training.trained_model_path),
+            onnx_model_path=Path(model_export.onnx_model_path),
+            openvino_model_path=Path(model_export.openvino_model_path),
+            parity_report_path=Path(model_export.parity_report_path),
+            data_yaml=Path(training.root_dir, "data.yaml"),
+            sample_images_dir=Path(self.config.data_ingestion.dataset_dir, "test", "images"),
+            params_formats=list(params.formats),
+            params_int8=params.int8,
+            params_dynamic=params.dynamic,
+            params_imgsz=self.params.yolo_params.imgsz,
+            params_conf_threshold=self.params.yolo_params.predict_conf_threshold,
+            params_parity_samples=params.parity_samples,
+            params_parity_min_match=params.parity_min_match
+        )
+
+        return model_export_config
+    
+
+
+
+
+    @memoized
     def get_evaluation_config(self) -> EvaluationConfig:
-        # 1. Get configurations from config.yaml
         training = self.config.training
-        evaluation = self.config.evaluation  # <--- Now reading the evaluation section
-        
-        # 2. Get params
+        evaluation = self.config.evaluation
         params = self.params.yolo_params
+        evaluation_params = self.params.evaluation
 
-        # 3. Locate data.yaml (Priority: Artifacts -> Root)
-        data_yaml_path = os.path.join(self.config.artifacts_root, "training", "data.yaml")
-        if not os.path.exists(data_yaml_path):
-             data_yaml_path = os.path.join(os.getcwd(), "data.yaml")
+        ensure_directories([evaluation.root_dir])
 
-        # 4. Create Config Object
         eval_config = EvaluationConfig(
             path_of_model=Path(training.trained_model_path),
-            training_data=Path(data_yaml_path),
-            
-            # ✅ UPDATED: Reads dynamically from config.yaml
+            root_dir=Path(evaluation.root_dir),
+            predictions_dir=Path(evaluation.predictions_dir),
+            sweep_path=Path(evaluation.sweep_path),
+            label_index_dir=Path(self.config.label_index.root_dir),
+            params_small_object_px=self.params.label_index.small_object_px,
             mlflow_uri=evaluation.mlflow_uri,
-            
             all_params=params,
             params_imgsz=params.imgsz,
-            params_batch_size=params.batch_size
+            params_batch_size=params.batch_size,
+            params_conf_threshold=params.conf_threshold,
+            params_nms_iou=evaluation_params.nms_iou,
+            params_min_conf=evaluation_params.min_conf,
+            params_conf_step=evaluation_params.conf_step,
+            params_iou_thresholds=list(evaluation_params.iou_thresholds),
+            params_size_buckets_px=list(evaluation_params.size_buckets_px)
         )
-        
-        return eval_config
\ No newline at end of file
+
+        return eval_config
+
+
+
+
+    def get_backend_model_paths(self) -> dict:
+        return {
+            "pytorch": self.config.training.trained_model_path,
+            "onnx": self.config.model_export.onnx_model_path,
+            "openvino": self.config.model_export.openvino_model_path,
+        }
+
+    @memoized
+    def get_prediction_config(self) -> PredictionConfig:
+        prediction = self.config.prediction
+        params = self.params.yolo_params
+        output = self.params.output
+        tiling = self.params.tiling
+        frame_skip = self.params.frame_skip
+        tracking = self.params.tracking
+        result_cache = self.params.result_cache
+        images = self.params.images
+
+        ensure_directories([prediction.root_dir])
+
+        # Serve either the PyTorch weights or a model exported by stage_05
+        model_paths = self.get_backend_model_paths()
+        if params.predict_backend not in model_paths:
+            raise ValueError(f"Unknown predict_backend: {params.predict_backend}")
+
+        prediction_config = PredictionConfig(
+            root_dir=Path(prediction.root_dir),
+            model_path=Path(model_paths[params.predict_backend]),
+            params_backend=params.predict_backend,
+            params_conf_threshold=params.predict_conf_threshold,
+            params_iou_threshold=params.predict_iou_threshold,
+            params_batch_size=params.predict_batch_size,
+            params_imgsz=params.imgsz,
+            params_pipelined=params.predict_pipelined,
+            params_queue_size=params.predict_queue_size,
+            params_render_video=output.render_video,
+            params_detections_format=output.detections_format,
+            params_tile_enabled=tiling.enabled,
+            params_tile_size=tiling.tile_size,
+            params_tile_overlap=tiling.overlap,
+            params_tile_include_full_frame=tiling.include_full_frame,
+            params_tile_merge=tiling.merge,
+            params_tile_merge_iou=tiling.merge_iou,
+            params_skip_mode=frame_skip.mode,
+            params_skip_stride=frame_skip.stride,
+            params_skip_diff_threshold=frame_skip.diff_threshold,
+            params_skip_max_stride=frame_skip.max_stride,
+            params_skip_interpolate=frame_skip.interpolate,
+            params_track_enabled=tracking.enabled,
+            params_track_iou_threshold=tracking.iou_threshold,
+            params_track_max_age=tracking.max_age,
+            params_track_min_hits=tracking.min_hits,
+            params_track_skip_confident=tracking.skip_confident,
+            params_track_max_skip=tracking.max_skip,
+            cache_dir=Path(prediction.cache_dir),
+            params_cache_enabled=result_cache.enabled,
+            params_cache_max_size_mb=result_cache.max_size_mb,
+            params_images_max_count=images.max_images,
+            params_images_max_request_mb=images.max_request_mb,
+            params_images_jpeg_quality=images.jpeg_quality
+        )
+
+        return prediction_config
+
+
+
+    @memoized
+    def get_upload_config(self) -> UploadConfig:
+        uploads = self.config.uploads
+        params = self.params.uploads
+
+        ensure_directories([uploads.root_dir, self.config.prediction.root_dir])
+
+        upload_config = UploadConfig(
+            root_dir=Path(uploads.root_dir),
+            prediction_dir=Path(self.config.prediction.root_dir),
+            params_max_size_mb=params.max_size_mb,
+            params_max_duration_s=params.max_duration_s,
+            params_retention_hours=params.retention_hours,
+            params_max_storage_mb=params.max_storage_mb,
+            params_gc_interval_s=params.gc_interval_s
+        )
+
+        return upload_config
+
+
+
+    @memoized
+    def get_benchmark_config(self) -> BenchmarkConfig:
+        benchmark = self.config.benchmark
+        params = self.params.benchmark
+
+        ensure_directories([benchmark.root_dir])
+
+        benchmark_config = BenchmarkConfig(
+            root_dir=Path(benchmark.root_dir),
+            images_dir=Path(benchmark.images_dir),
+            metrics_path=Path(benchmark.metrics_path),
+            model_paths={name: Path(path) for name, path in self.get_backend_model_paths().items()},
+            params_backends=list(params.backends),
+            params_resolutions=[tuple(size) for size in params.resolutions],
+            params_batch_sizes=list(params.batch_sizes),
+            params_num_frames=params.num_frames,
+            params_render=params.render,
+            params_regression_tolerance=params.regression_tolerance,
+            params_import_repeats=params.import_repeats
+        )
+
+        return benchmark_config
+
+    @memoized
+    def get_live_stream_config(self) -> LiveStreamConfig:
+        params = self.params.live
+
+        live_stream_config = LiveStreamConfig(
+            params_sources=dict(params.sources),
+            params_max_latency_ms=params.max_latency_ms,
+            params_replay_realtime=params.replay_realtime,
+            params_loop_files=params.loop_files,
+            params_jpeg_quality=params.jpeg_quality,
+            params_idle_timeout_s=params.idle_timeout_s,
+            params_max_streams=params.max_streams
+        )
+
+        return live_stream_config
+
+    @memoized
+    def get_job_queue_config(self) -> JobQueueConfig:
+        jobs = self.config.jobs
+        params = self.params.jobs
+
+        ensure_directories([jobs.root_dir])
+
+        job_queue_config = JobQueueConfig(
+            root_dir=Path(jobs.root_dir),
+            db_path=Path(jobs.db_path),
+            params_max_workers=params.max_workers,
+            params_max_pending=params.max_pending,
+            params_progress_interval=params.progress_interval
+        )
+
+        return job_queue_config
+
+    @memoized
+    def get_stage_runner_config(self) -> StageRunnerConfig:
+        stage_runner = self.config.stage_runner
+        params = self.params.stage_runner
+
+        ensure_directories([stage_runner.root_dir])
+
+        stage_runner_config = StageRunnerConfig(
+            dvc_file=Path(stage_runner.dvc_file),
+            config_file=self.config_filepath,
+            params_file=self.params_filepath,
+            state_file=Path(stage_runner.state_file),
+            report_path=Path(stage_runner.report_path),
+            config_sections={name: list(sections) for name, sections in stage_runner.config_sections.items()},
+            params_stages=list(params.stages),
+            params_max_parallel=params.max_parallel
+        )
+
+        return stage_runner_config
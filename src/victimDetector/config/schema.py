@@ -0,0 +1,176 @@
+from collections.abc import Hashable
+from typing import List
+
+# Expected layout of config/config.yaml and params.yaml, checked once when a
+# file is parsed so a typo fails at startup instead of deep inside a stage.
+# A leaf is a type (or tuple of types) or a set of allowed values; keys not
+# listed here are allowed, sections not listed are not checked.
+
+NUMBER = (int, float)
+PATH = str
+
+CONFIG_SCHEMA = {
+    "artifacts_root": PATH,
+    "data_ingestion": {
+        "root_dir": PATH,
+        "source_URL": str,
+        "local_data_file": PATH,
+        "unzip_dir": PATH,
+        "dataset_dir": PATH,
+        "state_file": PATH,
+    },
+    "prepare_base_model": {"root_dir": PATH, "base_model_path": PATH},
+    "data_preprocessing": {"root_dir": PATH, "cache_dir": PATH},
+    "label_index": {"root_dir": PATH, "stats_path": PATH},
+    "training": {"root_dir": PATH, "trained_model_path": PATH},
+    "stage_runner": {
+        "root_dir": PATH,
+        "dvc_file": PATH,
+        "state_file": PATH,
+        "report_path": PATH,
+        "config_sections": dict,
+    },
+    "sweep": {"root_dir": PATH, "leaderboard_path": PATH},
+    "model_export": {
+        "root_dir": PATH,
+        "onnx_model_path": PATH,
+        "openvino_model_path": PATH,
+        "parity_report_path": PATH,
+    },
+    "benchmark": {"root_dir": PATH, "images_dir": PATH, "metrics_path": PATH},
+    "evaluation": {"root_dir": PATH, "predictions_dir": PATH, "sweep_path": PATH, "mlflow_uri": str},
+    "prediction": {"root_dir": PATH, "cache_dir": PATH},
+    "uploads": {"root_dir": PATH},
+    "jobs": {"root_dir": PATH, "db_path": PATH},
+}
+
+PARAMS_SCHEMA = {
+    "data_ingestion": {"max_workers": int, "incremental": bool},
+    "yolo_params": {
+        "epochs": int,
+        "batch_size": int,
+        "imgsz": int,
+        "model_type": str,
+        "conf_threshold": NUMBER,
+        "iou_threshold": NUMBER,
+        "augmentation": bool,
+        "predict_conf_threshold": NUMBER,
+        "predict_iou_threshold": NUMBER,
+        "predict_batch_size": int,
+        "predict_pipelined": bool,
+        "predict_queue_size": int,
+        "predict_backend": {"pytorch", "onnx", "openvino"},
+    },
+    "preprocessing": {"letterbox": bool, "jpeg_quality": int, "max_workers": int, "splits": list},
+    "label_index": {"splits": list, "max_workers": int, "small_object_px": NUMBER, "crowded_min_boxes": int},
+    "stage_runner": {"stages": list, "max_parallel": int},
+    "sweep": {
+        "method": {"grid", "random"},
+        "num_trials": int,
+        "seed": int,
+        "space": dict,
+        "max_workers": int,
+        "threads_per_trial": int,
+        "metric": str,
+        "early_stopping": bool,
+        "min_epochs": int,
+        "min_peers": int,
+        "patience": int,
+    },
+    "evaluation": {"nms_iou": NUMBER, "min_conf": NUMBER, "conf_step": NUMBER, "iou_thresholds": list, "size_buckets_px": list},
+    "export": {"formats": list, "int8": bool, "dynamic": bool, "parity_samples": int, "parity_min_match": NUMBER},
+    "output": {"render_video": bool, "detections_format": {"none", "npz", "parquet"}},
+    "tiling": {
+        "enabled": bool,
+        "tile_size": int,
+        "overlap": NUMBER,
+        "include_full_frame": bool,
+        "merge": {"nms", "wbf"},
+        "merge_iou": NUMBER,
+    },
+    "frame_skip": {
+        "mode": {"none", "stride", "adaptive"},
+        "stride": int,
+        "diff_threshold": NUMBER,
+        "max_stride": int,
+        "interpolate": bool,
+    },
+    "tracking": {
+        "enabled": bool,
+        "iou_threshold": NUMBER,
+        "max_age": int,
+        "min_hits": int,
+        "skip_confident": bool,
+        "max_skip": int,
+    },
+    "result_cache": {"enabled": bool, "max_size_mb": NUMBER},
+    "images": {"max_images": int, "max_request_mb": NUMBER, "jpeg_quality": int},
+    "live": {
+        "sources": dict,
+        "max_latency_ms": NUMBER,
+        "replay_realtime": bool,
+        "loop_files": bool,
+        "jpeg_quality": int,
+        "idle_timeout_s": NUMBER,
+        "max_streams": int,
+    },
+    "benchmark": {
+        "backends": list,
+        "resolutions": list,
+        "batch_sizes": list,
+        "num_frames": int,
+        "render": bool,
+        "regression_tolerance": NUMBER,
+        "import_repeats": int,
+    },
+    "uploads": {
+        "max_size_mb": NUMBER,
+        "max_duration_s": NUMBER,
+        "retention_hours": NUMBER,
+        "max_storage_mb": NUMBER,
+        "gc_interval_s": NUMBER,
+    },
+    "jobs": {"max_workers": int, "max_pending": int, "progress_interval": NUMBER},
+}
+
+
+def _type_name(expected) -> str:
+    if isinstance(expected, tuple):
+        return " or ".join(t.__name__ for t in expected)
+    return expected.__name__
+
+
+def schema_errors(content, schema: dict, prefix: str = "") -> List[str]:
+    """
+    Every mismatch between parsed YAML content and a schema.
+
+    Args:
+        content (dict): Parsed YAML mapping
+        schema (dict): Section / key -> nested schema, type or set of allowed values
+        prefix (str): Dotted path of content, used in the messages
+
+    Returns:
+        list: One message per missing key, wrong type or value not allowed
+    """
+    errors = []
+    for key, expected in schema.items():
+        name = f"{prefix}{key}"
+        if key not in content:
+            errors.append(f"{name} is missing")
+            continue
+        value = content[key]
+        if isinstance(expected, dict):
+            if not isinstance(value, dict):
+                errors.append(f"{name} must be a section, got {type(value).__name__}")
+            else:
+                errors.extend(schema_errors(value, expected, f"{name}."))
+        elif isinstance(expected, set):
+            # A list / mapping value is never allowed, and is unhashable
+            if not isinstance(value, Hashable) or value not in expected:
+                errors.append(f"{name} must be one of {sorted(expected)}, got {value!r}")
+        # bool is an int subclass, but True is never a valid count
+        elif not isinstance(value, expected) or (isinstance(value, bool) and bool not in (
+            expected if isinstance(expected, tuple) else (expected,)
+        )):
+            errors.append(f"{name} must be {_type_name(expected)}, got {value!r}")
+    return errors
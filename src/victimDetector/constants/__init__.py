@@ -1,4 +1,7 @@
 from pathlib import Path
 
 CONFIG_FILE_PATH = Path("config/config.yaml")
-PARAMS_FILE_PATH = Path("params.yaml")
\ No newline at end of file
+PARAMS_FILE_PATH = Path("params.yaml")
+
+# Set by the stage runner: CPU cores each of its concurrent stages may use
+CPU_BUDGET_ENV = "VICTIM_DETECTOR_CPUS"
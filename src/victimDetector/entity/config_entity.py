@@ -7,6 +7,11 @@ class DataIngestionConfig:
     source_url: str
     local_data_file: Path
     unzip_dir: Path
+    dataset_dir: Path
+    source_sha256: str
+    state_file: Path
+    params_max_workers: int
+    params_incremental: bool
 
 
 
@@ -21,23 +26,192 @@ class PrepareBaseModelConfig:
 
 
 # 2. DEFINE CONFIG ENTITY
+@dataclass(frozen=True)
+class DataPreprocessingConfig:
+    root_dir: Path
+    source_data: Path
+    cache_dir: Path
+    params_imgsz: int
+    params_letterbox: bool
+    params_jpeg_quality: int
+    params_max_workers: int
+    params_splits: list
+
+
+@dataclass(frozen=True)
+class LabelIndexConfig:
+    root_dir: Path
+    source_data: Path
+    stats_path: Path
+    params_splits: list
+    params_max_workers: int
+    params_imgsz: int
+    params_small_object_px: float
+    params_crowded_min_boxes: int
+
+
 @dataclass(frozen=True)
 class TrainingConfig:
     root_dir: Path
     trained_model_path: Path
     base_model_path: Path
     training_data: Path
+    preprocessed_data: Path
+    label_index_dir: Path
+    params_small_object_px: float
     params_epochs: int
     params_batch_size: int
     params_imgsz: int
     params_model_type: str
 
 
+@dataclass(frozen=True)
+class SweepConfig:
+    root_dir: Path
+    leaderboard_path: Path
+    params_method: str
+    params_space: dict
+    params_num_trials: int
+    params_seed: int
+    params_max_workers: int
+    params_threads_per_trial: int
+    params_metric: str
+    params_early_stopping: bool
+    params_min_epochs: int
+    params_min_peers: int
+    params_patience: int
+
+
+@dataclass(frozen=True)
+class ModelExportConfig:
+    root_dir: Path
+    trained_model_path: Path
+    onnx_model_path: Path
+    openvino_model_path: Path
+    parity_report_path: Path
+    data_yaml: Path
+    sample_images_dir: Path
+    params_formats: list
+    params_int8: bool
+    params_dynamic: bool
+    params_imgsz: int
+    params_conf_threshold: float
+    params_parity_samples: int
+    params_parity_min_match: float
+
+
 @dataclass(frozen=True)
 class EvaluationConfig:
     path_of_model: Path
-    training_data: Path
+    root_dir: Path
+    predictions_dir: Path
+    sweep_path: Path
+    label_index_dir: Path
+    params_small_object_px: float
     all_params: dict
     mlflow_uri: str
     params_imgsz: int
-    params_batch_size: int
\ No newline at end of file
+    params_batch_size: int
+    params_conf_threshold: float
+    params_nms_iou: float
+    params_min_conf: float
+    params_conf_step: float
+    params_iou_thresholds: list
+    params_size_buckets_px: list
+
+
+
+@dataclass(frozen=True)
+class PredictionConfig:
+    root_dir: Path
+    model_path: Path
+    params_backend: str
+    params_conf_threshold: float
+    params_iou_threshold: float
+    params_batch_size: int
+    params_imgsz: int
+    params_pipelined: bool
+    params_queue_size: int
+    params_render_video: bool
+    params_detections_format: str
+    params_tile_enabled: bool
+    params_tile_size: int
+    params_tile_overlap: float
+    params_tile_include_full_frame: bool
+    params_tile_merge: str
+    params_tile_merge_iou: float
+    params_skip_mode: str
+    params_skip_stride: int
+    params_skip_diff_threshold: float
+    params_skip_max_stride: int
+    params_skip_interpolate: bool
+    params_track_enabled: bool
+    params_track_iou_threshold: float
+    params_track_max_age: int
+    params_track_min_hits: int
+    params_track_skip_confident: bool
+    params_track_max_skip: int
+    cache_dir: Path
+    params_cache_enabled: bool
+    params_cache_max_size_mb: float
+    params_images_max_count: int
+    params_images_max_request_mb: float
+    params_images_jpeg_quality: int
+
+
+@dataclass(frozen=True)
+class BenchmarkConfig:
+    root_dir: Path
+    images_dir: Path
+    metrics_path: Path
+    model_paths: dict
+    params_backends: list
+    params_resolutions: list
+    params_batch_sizes: list
+    params_num_frames: int
+    params_render: bool
+    params_regression_tolerance: float
+    params_import_repeats: int
+
+
+@dataclass(frozen=True)
+class LiveStreamConfig:
+    params_sources: dict
+    params_max_latency_ms: float
+    params_replay_realtime: bool
+    params_loop_files: bool
+    params_jpeg_quality: int
+    params_idle_timeout_s: float
+    params_max_streams: int
+
+
+@dataclass(frozen=True)
+class UploadConfig:
+    root_dir: Path
+    prediction_dir: Path
+    params_max_size_mb: int
+    params_max_duration_s: int
+    params_retention_hours: float
+    params_max_storage_mb: int
+    params_gc_interval_s: int
+
+
+@dataclass(frozen=True)
+class JobQueueConfig:
+    root_dir: Path
+    db_path: Path
+    params_max_workers: int
+    params_max_pending: int
+    params_progress_interval: float
+
+
+@dataclass(frozen=True)
+class StageRunnerConfig:
+    dvc_file: Path
+    config_file: Path
+    params_file: Path
+    state_file: Path
+    report_path: Path
+    config_sections: dict
+    params_stages: list
+    params_max_parallel: int
@@ -0,0 +1,356 @@
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from victimDetector import forward_logs_to, listen_to, log_context, logger
+from victimDetector.entity.config_entity import JobQueueConfig
+from victimDetector.utils.metrics import JOB_QUEUE_DEPTH, JOBS, MODEL_LOAD_SECONDS, record_prediction
+
+
+class JobQueueFull(Exception):
+    """Raised when the number of queued + running jobs hits max_pending."""
+
+
+def new_owner() -> str:
+    """
+    Owner id of the jobs queued by this process: host, pid and a random boot
+    id, which tells this process apart from an earlier one that had the same pid.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill(pid, 0) would send CTRL_C_EVENT on Windows; assume alive
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Alive, but owned by another user
+        return True
+    return True
+
+
+def _owner_alive(owner: str, current: str) -> bool:
+    """Whether the process that queued a job (see new_owner) may still be running it."""
+    if not owner:
+        # Jobs queued before owners were recorded
+        return False
+    host, pid, _ = owner.rsplit(":", 2)
+    current_host, current_pid, _ = current.rsplit(":", 2)
+    if host != current_host:
+        # Processes on other hosts sharing the database can't be checked
+        return True
+    if pid == current_pid:
+        return owner == current
+    return _pid_alive(int(pid))
+
+
+class JobStore:
+    """
+    SQLite-backed job table shared by the web process and the worker processes.
+
+    Every call opens its own short-lived connection, so the store is safe to
+    use from any thread or process without an external broker.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = str(db_path)
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    input_path TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    frames_done INTEGER DEFAULT 0,
+                    frames_total INTEGER DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL,
+                    started_at REAL,
+                    finished_at REAL,
+                    owner TEXT
+                )
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "owner" not in columns:
+                # Databases created before jobs recorded their owner
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def create(self, input_path: str, owner: str = None) -> str:
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, input_path, status, created_at, owner) VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, str(input_path), time.time(), owner),
+            )
+        return job_id
+
+    def fail_unfinished(self, error: str, owner: str) -> int:
+        """
+        Mark the queued / running jobs whose owner process is gone as failed.
+        Called when the web process starts: those jobs will never finish, while
+        jobs of another live server process sharing the database are left alone.
+
+        Args:
+            error (str): Error recorded on the failed jobs
+            owner (str): Owner id of the calling process (see new_owner)
+
+        Returns:
+            int: Number of jobs marked failed
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, owner FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchall()
+            stale = [job_id for job_id, job_owner in rows if not _owner_alive(job_owner, owner)]
+            conn.executemany(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                [(error, time.time(), job_id) for job_id in stale],
+            )
+        return len(stale)
+
+    def update(self, job_id: str, **fields):
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = json.dumps(fields["result"])
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> dict:
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+
+        # Progress and ETA derived from the frame counters
+        done, total = job["frames_done"], job["frames_total"]
+        job["progress"] = round(done / total, 4) if total else 0.0
+        job["eta_seconds"] = None
+        if job["status"] == "running" and job["started_at"] and 0 < done < total:
+            elapsed = time.time() - job["started_at"]
+            job["eta_seconds"] = round(elapsed / done * (total - done), 1)
+        return job
+
+
+# -------------------- WORKER PROCESS --------------------
+
+def _init_worker(log_queue):
+    """Load and warm the model once per worker process."""
+    # Records go to the web process, which owns the log file
+    forward_logs_to(log_queue)
+
+    from victimDetector.config.configuration import ConfigurationManager
+    from victimDetector.utils.model_registry import model_registry
+
+    config = ConfigurationManager().get_prediction_config()
+    if os.path.exists(config.model_path):
+        model_registry.warm_up(config.model_path, imgsz=config.params_imgsz)
+
+
+def _ping():
+    return os.getpid()
+
+
+def _run_job(db_path: str, job_id: str, input_path: str, progress_interval: float, render: bool = None):
+    """
+    Run one job in a worker process.
+
+    Returns:
+        dict: Pipeline stats and model load time for the web process
+            metrics, or None if the job failed
+    """
+    # Every record logged while the job runs carries its id
+    with log_context(job_id=job_id):
+        return _execute_job(db_path, job_id, input_path, progress_interval, render)
+
+
+def _execute_job(db_path: str, job_id: str, input_path: str, progress_interval: float, render: bool = None):
+    from victimDetector.pipeline.prediction import PredictionPipeline
+    from victimDetector.utils.model_registry import model_registry
+
+    store = JobStore(db_path)
+    started_at = time.time()
+    store.update(job_id, status="running", started_at=started_at)
+
+    last_update = [0.0]
+
+    def on_progress(frames_done, frames_total):
+        now = time.time()
+        if now - last_update[0] >= progress_interval:
+            last_update[0] = now
+            store.update(job_id, frames_done=frames_done, frames_total=frames_total)
+
+    try:
+        pipeline = PredictionPipeline(
+            input_path, progress_callback=on_progress, render=render,
+            output_name=f"{Path(input_path).stem}-{job_id}"
+        )
+        output_filename = pipeline.predict()
+        if output_filename == "Error":
+            raise RuntimeError("Prediction failed: check worker logs")
+
+        frames = pipeline.stats.get("frames", 0)
+        store.update(
+            job_id,
+            status="done",
+            frames_done=frames,
+            frames_total=frames,
+            result={**pipeline.artifacts, "stats": pipeline.stats},
+            finished_at=time.time(),
+        )
+        logger.info(
+            f"Job {job_id} done",
+            extra={"duration_ms": round((time.time() - started_at) * 1000, 1), "frames": frames}
+        )
+        model_path = pipeline.config.model_path
+        return {
+            "stats": pipeline.stats,
+            "model": os.path.basename(model_path),
+            "model_load_seconds": model_registry.load_seconds(model_path),
+        }
+    except Exception as e:
+        logger.exception(f"Job {job_id} failed: {e}")
+        store.update(job_id, status="failed", error=str(e), finished_at=time.time())
+        return None
+
+
+# -------------------- JOB MANAGER --------------------
+
+class JobManager:
+    """
+    Runs prediction jobs on a bounded pool of worker processes.
+
+    Each worker holds its own warm model (see _init_worker); submissions beyond
+    max_pending queued + running jobs are rejected with JobQueueFull so the
+    backlog stays bounded.
+    """
+
+    def __init__(self, config: JobQueueConfig):
+        self.config = config
+        self.store = JobStore(config.db_path)
+        self.owner = new_owner()
+        stale = self.store.fail_unfinished("Server restarted before the job finished", self.owner)
+        if stale:
+            logger.warning(f"Marked {stale} jobs of a previous server process as failed")
+        self._lock = threading.Lock()
+        # job_id -> input path of queued + running jobs
+        self._pending = {}
+        # 'spawn' keeps torch/OpenCV thread pools out of forked children
+        self._context = multiprocessing.get_context("spawn")
+        # Workers send their log records here; only this process writes the log file
+        self._log_queue = self._context.Queue()
+        self._log_listener = listen_to(self._log_queue)
+        self._executor = self._create_executor()
+        JOB_QUEUE_DEPTH.set_function(lambda: self.queue_depth)
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.config.params_max_workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(self._log_queue,),
+        )
+
+    def warm_up(self):
+        """Start every worker now so the first job doesn't pay for model loading."""
+        for _ in range(self.config.params_max_workers):
+            self._executor.submit(_ping)
+
+    def submit(self, input_path: str, render: bool = None) -> str:
+        """
+        Queue a video for prediction.
+
+        Args:
+            input_path (str): Uploaded video
+            render (bool): Override output.render_video for this job
+
+        Returns:
+            str: Job id
+        """
+        with self._lock:
+            if len(self._pending) >= self.config.params_max_pending:
+                raise JobQueueFull(
+                    f"Too many pending jobs ({self.config.params_max_pending}), try again later"
+                )
+            job_id = self.store.create(input_path, owner=self.owner)
+            args = (_run_job, self.store.db_path, job_id, str(input_path), self.config.params_progress_interval, render)
+            try:
+                try:
+                    future = self._executor.submit(*args)
+                except BrokenProcessPool:
+                    # A worker died (OOM, segfault in native code) and took the
+                    # pool with it; its jobs were failed by _on_done
+                    logger.warning("Job worker pool is broken, starting a new one")
+                    self._executor.shutdown(wait=False)
+                    self._executor = self._create_executor()
+                    future = self._executor.submit(*args)
+            except Exception as e:
+                self.store.update(job_id, status="failed", error=str(e), finished_at=time.time())
+                JOBS.inc(status="failed")
+                raise
+            self._pending[job_id] = str(input_path)
+
+        future.add_done_callback(lambda f, job_id=job_id: self._on_done(job_id, f))
+        logger.info(f"Queued job {job_id} for {input_path}")
+        return job_id
+
+    def _on_done(self, job_id, future):
+        with self._lock:
+            self._pending.pop(job_id, None)
+        # A crashed worker never gets to mark its own job as failed
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Job {job_id} worker crashed: {error}")
+            self.store.update(job_id, status="failed", error=str(error), finished_at=time.time())
+            JOBS.inc(status="failed")
+            return
+
+        # Worker metrics live in the worker process; the web process records
+        # them from the returned stats
+        result = future.result()
+        if result is None:
+            JOBS.inc(status="failed")
+            return
+        JOBS.inc(status="done")
+        record_prediction(result["stats"], pipeline="video")
+        MODEL_LOAD_SECONDS.set(result["model_load_seconds"], model=result["model"])
+
+    def status(self, job_id: str) -> dict:
+        return self.store.get(job_id)
+
+    def active_inputs(self) -> list:
+        """Input paths of queued + running jobs, which must not be cleaned up."""
+        with self._lock:
+            return list(self._pending.values())
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+        self._log_listener.stop()
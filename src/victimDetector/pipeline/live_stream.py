@@ -0,0 +1,307 @@
+import os
+import json
+import time
+import threading
+import cv2
+from typing import Iterator
+
+from victimDetector import logger
+from victimDetector.entity.config_entity import LiveStreamConfig, PredictionConfig
+from victimDetector.pipeline.prediction import PredictionPipeline, detections_to_dicts
+from victimDetector.utils.common import draw_detections
+from victimDetector.utils.metrics import LIVE_FRAMES, LIVE_LATENCY_SECONDS
+from victimDetector.utils.model_registry import model_registry
+from victimDetector.utils.video_pipeline import LatestValue
+
+
+class LiveStreamLimit(Exception):
+    """Raised when max_streams live sources are already running."""
+
+
+def open_source(source) -> cv2.VideoCapture:
+    """
+    Open a camera index, stream URL (rtsp://, http://) or video file.
+    """
+    if isinstance(source, int) or str(source).isdigit():
+        source = int(source)
+    cap = cv2.VideoCapture(source)
+    # Ask the driver not to queue frames that would only be dropped later
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+class LiveStream:
+    """
+    Detection on a live source with bounded latency.
+
+    A reader thread keeps only the newest captured frame (LatestValue), so
+    frames arriving while the detector is busy overwrite each other instead
+    of queueing up; the detector thread always works on the freshest frame
+    and drops it if it is already older than max_latency_ms. Annotated JPEGs
+    and detection events are published to any number of viewers (mjpeg(),
+    events()), and the stream stops itself after idle_timeout_s without one.
+    """
+
+    def __init__(self, name: str, source, config: LiveStreamConfig, prediction_config: PredictionConfig):
+        self.name = name
+        self.source = source
+        self.config = config
+        self.prediction_config = prediction_config
+        # (frame_idx, captured_at, frame) from the reader
+        self.frames = LatestValue()
+        # (jpeg bytes, event dict) for the viewers
+        self.outputs = LatestValue()
+        self.stats = {
+            "frames_read": 0,
+            "frames_processed": 0,
+            "frames_dropped": 0,
+            "latency_ms": None,
+            "fps": None,
+        }
+        self.error = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._viewers = 0
+        self._last_viewer = time.monotonic()
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        return not self._stop.is_set()
+
+    def start(self):
+        cap = open_source(self.source)
+        if not cap.isOpened():
+            raise ValueError(f"Unable to open live source: {self.name}")
+        self._threads = [
+            threading.Thread(target=self._read_loop, args=(cap,), name=f"live-{self.name}-reader", daemon=True),
+            threading.Thread(target=self._detect_loop, name=f"live-{self.name}-detector", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Live stream {self.name} started")
+
+    def stop(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self.frames.close()
+        self.outputs.close()
+        logger.info(f"Live stream {self.name} stopped: {self.stats}")
+
+    def _read_loop(self, cap: cv2.VideoCapture):
+        # Files are replayed like a camera: paced at their FPS and optionally looped
+        is_file = isinstance(self.source, str) and os.path.isfile(self.source)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        frame_idx, replayed, replay_start = 0, 0, time.monotonic()
+        try:
+            while not self._stop.is_set():
+                ok, frame = cap.read()
+                if not ok:
+                    if is_file and self.config.params_loop_files and replayed:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        replayed, replay_start = 0, time.monotonic()
+                        continue
+                    logger.info(f"Live source {self.name} ended")
+                    break
+
+                if is_file and self.config.params_replay_realtime:
+                    delay = replay_start + replayed / fps - time.monotonic()
+                    if delay > 0:
+                        self._stop.wait(delay)
+                replayed += 1
+
+                self.stats["frames_read"] += 1
+                self.frames.put((frame_idx, time.monotonic(), frame))
+                frame_idx += 1
+        except Exception as e:
+            logger.exception(f"Live stream {self.name} reader failed: {e}")
+            self.error = str(e)
+        finally:
+            cap.release()
+            self.stop()
+
+    def _detect_loop(self):
+        try:
+            pipeline = PredictionPipeline(self.source, config=self.prediction_config)
+            model, lock = model_registry.get(str(self.prediction_config.model_path))
+            detect = pipeline.create_tiled_detector(
+                lambda frames: pipeline.detect(model, lock, frames)
+            )
+            tracking = pipeline.create_tracking_stage(detect)
+            max_latency = self.config.params_max_latency_ms / 1000
+            encode_params = [cv2.IMWRITE_JPEG_QUALITY, self.config.params_jpeg_quality]
+
+            seq, last_done = 0, None
+            while not self._stop.is_set():
+                if self._idle():
+                    logger.info(f"Live stream {self.name} has no viewers, stopping")
+                    break
+
+                item = self.frames.wait(seq, timeout=1.0)
+                if item is None:
+                    continue
+                new_seq, (frame_idx, captured_at, frame) = item
+                # Frames overwritten in the mailbox were never seen by the detector
+                dropped = new_seq - seq - 1
+                seq = new_seq
+                stale = time.monotonic() - captured_at > max_latency
+                if dropped or stale:
+                    self.stats["frames_dropped"] += dropped + stale
+                    LIVE_FRAMES.inc(dropped + stale, stream=self.name, outcome="dropped")
+                if stale:
+                    continue
+
+                if tracking is not None:
+                    (frame, detections), = tracking.process([frame])
+                else:
+                    detections = detect([frame])[0]
+                ok, jpeg = cv2.imencode(".jpg", draw_detections(frame, detections, model.names), encode_params)
+
+                now = time.monotonic()
+                latency_ms = round((now - captured_at) * 1000, 1)
+                if last_done is not None and now > last_done:
+                    # Smoothed so the reported rate doesn't jump per frame
+                    fps = 1.0 / (now - last_done)
+                    previous = self.stats["fps"]
+                    self.stats["fps"] = round(fps if previous is None else 0.9 * previous + 0.1 * fps, 2)
+                last_done = now
+                self.stats["frames_processed"] += 1
+                self.stats["latency_ms"] = latency_ms
+                LIVE_FRAMES.inc(stream=self.name, outcome="processed")
+                LIVE_LATENCY_SECONDS.observe(now - captured_at, stream=self.name)
+
+                event = {
+                    "stream": self.name,
+                    "frame_idx": frame_idx,
+                    "timestamp": time.time(),
+                    "latency_ms": latency_ms,
+                    "detections": detections_to_dicts(detections, model.names),
+                }
+                self.outputs.put((jpeg.tobytes() if ok else None, event))
+        except Exception as e:
+            logger.exception(f"Live stream {self.name} detector failed: {e}")
+            self.error = str(e)
+        finally:
+            self.stop()
+
+    def _idle(self) -> bool:
+        with self._lock:
+            return (
+                self._viewers == 0
+                and time.monotonic() - self._last_viewer > self.config.params_idle_timeout_s
+            )
+
+    def _watch(self) -> Iterator:
+        """
+        Yield every newly published output, or None once a second without
+        one, until the stream stops.
+        """
+        with self._lock:
+            self._viewers += 1
+        try:
+            seq = 0
+            while True:
+                item = self.outputs.wait(seq, timeout=1.0)
+                if item is None:
+                    if not self.running:
+                        return
+                    yield None
+                    continue
+                seq, output = item
+                yield output
+        finally:
+            with self._lock:
+                self._viewers -= 1
+                self._last_viewer = time.monotonic()
+
+    def mjpeg(self) -> Iterator[bytes]:
+        """
+        Annotated frames as a multipart/x-mixed-replace body (boundary 'frame').
+        """
+        for output in self._watch():
+            if output is None or output[0] is None:
+                continue
+            jpeg = output[0]
+            yield (
+                b"--frame\r\nContent-Type: image/jpeg\r\n"
+                + f"Content-Length: {len(jpeg)}\r\n\r\n".encode()
+                + jpeg + b"\r\n"
+            )
+
+    def events(self) -> Iterator[str]:
+        """
+        Detections as a text/event-stream body, one event per processed frame.
+        """
+        for output in self._watch():
+            if output is None:
+                # Comment line, keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            yield f"data: {json.dumps(output[1])}\n\n"
+
+
+class LiveStreamManager:
+    """
+    Starts the named sources from params live.sources on demand and keeps
+    at most max_streams of them running.
+    """
+
+    def __init__(self, config: LiveStreamConfig, prediction_config: PredictionConfig):
+        self.config = config
+        self.prediction_config = prediction_config
+        self._lock = threading.Lock()
+        self._streams = {}
+
+    def get(self, name: str) -> LiveStream:
+        """
+        Return the running stream for a configured source, starting it if needed.
+
+        Raises:
+            KeyError: If name is not in live.sources
+            LiveStreamLimit: If max_streams other sources are running
+            ValueError: If the source cannot be opened
+        """
+        if name not in self.config.params_sources:
+            raise KeyError(name)
+
+        with self._lock:
+            stream = self._streams.get(name)
+            if stream is not None and stream.running:
+                return stream
+
+            self._streams = {n: s for n, s in self._streams.items() if s.running}
+            if len(self._streams) >= self.config.params_max_streams:
+                raise LiveStreamLimit(
+                    f"Too many live streams ({self.config.params_max_streams}), try again later"
+                )
+            stream = LiveStream(name, self.config.params_sources[name], self.config, self.prediction_config)
+            stream.start()
+            self._streams[name] = stream
+            return stream
+
+    def stop(self, name: str) -> bool:
+        with self._lock:
+            stream = self._streams.pop(name, None)
+        if stream is None:
+            return False
+        stream.stop()
+        return True
+
+    def status(self) -> dict:
+        with self._lock:
+            streams = dict(self._streams)
+        return {
+            name: {
+                "running": name in streams and streams[name].running,
+                "error": streams[name].error if name in streams else None,
+                **(streams[name].stats if name in streams else {}),
+            }
+            for name in self.config.params_sources
+        }
+
+    def stop_all(self):
+        with self._lock:
+            streams, self._streams = list(self._streams.values()), {}
+        for stream in streams:
+            stream.stop()
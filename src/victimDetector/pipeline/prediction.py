@@ -1,107 +1,485 @@
 import os
-import glob
+import time
+import uuid
 import cv2
-import shutil
-from ultralytics import YOLO
+import numpy as np
+from dataclasses import asdict
+from pathlib import Path
 from victimDetector import logger
+from victimDetector.config.configuration import ConfigurationManager
+from victimDetector.entity.config_entity import PredictionConfig
+from victimDetector.utils.common import create_video_writer, draw_detections, file_sha256, iter_frame_batches, save_json
+from victimDetector.utils.detections import DetectionLog
+from victimDetector.utils.frame_skip import FrameSkipper
+from victimDetector.utils.tracking import TrackingStage, VictimTracker
+from victimDetector.utils.model_registry import model_registry
+from victimDetector.utils.result_cache import ResultCache
+from victimDetector.utils.tiling import TiledDetector
+from victimDetector.utils.video_pipeline import run_pipelined
+
+
+# Settings that change how fast a video is processed but not its outputs,
+# left out of the result cache key
+_EXECUTION_PARAMS = {
+    "params_batch_size",
+    "params_pipelined",
+    "params_queue_size",
+    "params_cache_enabled",
+    "params_cache_max_size_mb",
+    "params_images_max_count",
+    "params_images_max_request_mb",
+    "params_images_jpeg_quality",
+}
+
+
+def detections_from_result(result) -> np.ndarray:
+    """
+    Convert one Ultralytics result into an (N, 6) array of
+    x1, y1, x2, y2, conf, class.
+    """
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.zeros((0, 6), dtype=np.float32)
+    return np.concatenate(
+        [
+            boxes.xyxy.cpu().numpy(),
+            boxes.conf.cpu().numpy()[:, None],
+            boxes.cls.cpu().numpy()[:, None],
+        ],
+        axis=1,
+    ).astype(np.float32)
+
+
+def detections_to_dicts(detections: np.ndarray, class_names: dict) -> list:
+    """
+    Convert (N, 6) detections (optionally with a 7th track_id column) into
+    JSON-serializable dicts.
+    """
+    results = []
+    for det in detections:
+        result = {
+            "box": [round(float(v), 1) for v in det[:4]],
+            "conf": round(float(det[4]), 4),
+            "class": int(det[5]),
+            "label": class_names.get(int(det[5]), str(int(det[5]))),
+        }
+        if len(det) > 6:
+            result["track_id"] = int(det[6])
+        results.append(result)
+    return results
+
 
 class PredictionPipeline:
-    def __init__(self, filename):
+    def __init__(self, filename, config: PredictionConfig = None, progress_callback=None, render: bool = None,
+                 output_name: str = None):
         self.filename = filename
+        # Base name of the output files; uploads are named by content hash,
+        # so each run needs its own (e.g. <sha256>-<job_id>)
+        self.output_name = output_name
+        self.config = config or ConfigurationManager().get_prediction_config()
+        # Called as progress_callback(frames_done, frames_total) after each processed frame
+        self.progress_callback = progress_callback
+        # render=False skips drawing and video encoding entirely
+        self.render = self.config.params_render_video if render is None else render
+        self.stats = {}
+        # Seconds spent per stage: decode, preprocess, inference, postprocess, encode
+        self.timings = {}
+        self.tracks = None
+        self.detection_log = None
+        # Filenames (relative to root_dir) of everything written for this input
+        self.artifacts = {}
 
     def predict(self):
         try:
             # 1. SETUP PATHS
-            cwd = os.getcwd()
-            model_path = os.path.join(cwd, "artifacts", "training", "model.pt")
-            
+            model_path = str(self.config.model_path)
+
             # Base folder where we want the final result
-            base_output_dir = os.path.join(cwd, "static", "predictions")
-            
-            # Temp folder for YOLO to play in
-            yolo_run_dir = os.path.join(base_output_dir, "yolo_runs")
-            
-            # Clean up previous runs
-            if os.path.exists(yolo_run_dir):
-                shutil.rmtree(yolo_run_dir)
-            
+            base_output_dir = str(self.config.root_dir)
+            os.makedirs(base_output_dir, exist_ok=True)
+
             # 2. LOAD MODEL
             if not os.path.exists(model_path):
                 logger.error(f"Model not found at {model_path}")
                 return "Error"
-            
-            model = YOLO(model_path)
 
-            # 3. RUN PREDICTION
-            # Uses confidence 0.25 to catch more victims
-            results = model.predict(
-                source=self.filename, 
-                save=True, 
-                conf=0.25,
-                project=yolo_run_dir,
-                name="run",
-                exist_ok=True
-            )
+            # Cached across requests, reloaded only when model.pt changes
+            model, lock = model_registry.get(model_path)
 
-            # 4. FIND THE AVI FILE
-            search_pattern = os.path.join(yolo_run_dir, "**", "*.avi")
-            list_of_avis = glob.glob(search_pattern, recursive=True)
-            
-            if not list_of_avis:
-                logger.error(f"YOLO finished but no .avi found in {yolo_run_dir}")
-                return "Error"
+            # 3. DEFINE OUTPUT PATHS
+            input_filename = os.path.basename(self.filename)
+            name_no_ext = self.output_name or f"{os.path.splitext(input_filename)[0]}-{uuid.uuid4().hex[:12]}"
+            final_mp4_path = os.path.join(base_output_dir, name_no_ext + ".mp4") if self.render else None
 
-            avi_file_path = list_of_avis[0]
-            logger.info(f"Found AVI file at: {avi_file_path}")
+            # Without a rendered video the detections are the only output
+            detections_format = self.config.params_detections_format
+            if detections_format == "none" and not self.render:
+                detections_format = "npz"
+            if detections_format != "none":
+                self.detection_log = DetectionLog()
 
-            # 5. DEFINE FINAL MP4 PATH
-            input_filename = os.path.basename(self.filename)
-            name_no_ext = os.path.splitext(input_filename)[0]
-            final_mp4_path = os.path.join(base_output_dir, name_no_ext + ".mp4")
-
-            # 6. CONVERT AVI -> MP4
-            logger.info(f"Converting to MP4 at: {final_mp4_path}")
-            
-            # CALLING THE FUNCTION (This line was failing before)
-            self.convert_avi_to_mp4(avi_file_path, final_mp4_path)
-
-            # 7. CLEANUP
-            if os.path.exists(final_mp4_path):
-                shutil.rmtree(yolo_run_dir) # Delete temp folder
-                return name_no_ext + ".mp4"
+            # Same clip, model and settings as an earlier run: reuse its outputs
+            cache = self.create_result_cache()
+            if cache is not None:
+                cache_key = self.cache_key(model_path, detections_format)
+                cached = cache.lookup(cache_key, base_output_dir, name_no_ext)
+                if cached is not None:
+                    return self.restore_cached(cached)
+
+            # 4. RUN PREDICTION (decode -> detect -> draw -> encode, one pass)
+            if self.render:
+                logger.info(f"Streaming predictions to MP4 at: {final_mp4_path}")
             else:
-                return "Error"
+                logger.info(f"Rendering disabled, recording detections for: {self.filename}")
+            video_info = self.stream_to_video(model, lock, final_mp4_path)
+
+            # 5. SAVE STRUCTURED OUTPUTS
+            if self.tracks is not None:
+                self.artifacts["tracks"] = name_no_ext + "_tracks.json"
+                save_json(path=Path(base_output_dir) / self.artifacts["tracks"], data=self.tracks)
+
+            if self.detection_log is not None:
+                self.artifacts["detections"] = f"{name_no_ext}_detections.{detections_format}"
+                self.detection_log.save(
+                    Path(base_output_dir) / self.artifacts["detections"],
+                    fmt=detections_format,
+                    **video_info
+                )
+
+            if self.render:
+                if not os.path.exists(final_mp4_path):
+                    return "Error"
+                self.artifacts["video"] = name_no_ext + ".mp4"
+
+            if cache is not None:
+                self.stats["cache"] = "miss"
+                try:
+                    cache.store(
+                        cache_key, base_output_dir, name_no_ext, self.artifacts,
+                        stats=self.stats, tracks=self.tracks
+                    )
+                except OSError as e:
+                    # The outputs are already written; only caching them failed
+                    logger.warning(f"Could not store result in cache: {e}")
+
+            return self.artifacts["video"] if self.render else self.artifacts["detections"]
 
         except Exception as e:
             logger.exception(f"Prediction failed: {e}")
             return "Error"
 
-    # --- IMPORTANT: THIS FUNCTION MUST BE ALIGNED WITH def predict() ---
-    def convert_avi_to_mp4(self, input_path, output_path):
+    def create_result_cache(self):
+        """
+        Build the ResultCache from the config, or None when caching is off.
+        """
+        if not self.config.params_cache_enabled:
+            return None
+        return ResultCache(self.config.cache_dir, self.config.params_cache_max_size_mb)
+
+    def cache_key(self, model_path, detections_format):
+        """
+        Result cache key: input video bytes, served weights and every
+        setting that affects the outputs.
+        """
+        params = {
+            name: value
+            for name, value in asdict(self.config).items()
+            if name.startswith("params_") and name not in _EXECUTION_PARAMS
+        }
+        params["render"] = self.render
+        params["params_detections_format"] = detections_format
+        return ResultCache.make_key(
+            file_sha256(self.filename),
+            model_registry.model_hash(model_path),
+            params
+        )
+
+    def restore_cached(self, cached):
+        """
+        Take over the artifacts, stats and tracks of a cache hit.
+        """
+        self.artifacts = cached["artifacts"]
+        self.tracks = cached.get("tracks")
+        self.stats = {**cached.get("stats", {}), "cache": "hit"}
+        logger.info(f"Served {self.filename} from the result cache")
+        return self.artifacts["video"] if self.render else self.artifacts["detections"]
+
+    def detect(self, model, lock, frames):
+        """
+        Run the detector on a list of BGR frames, holding the model's
+        inference lock (both from model_registry.get()).
+
+        Returns:
+            list: One (N, 6) detections array per frame
+        """
+        with lock:
+            results = model.predict(
+                source=frames,
+                conf=self.config.params_conf_threshold,
+                iou=self.config.params_iou_threshold,
+                imgsz=self.config.params_imgsz,
+                batch=len(frames),
+                verbose=False
+            )
+        # Ultralytics reports per-image milliseconds for each of its stages
+        for r in results:
+            speed = getattr(r, "speed", None) or {}
+            for stage in ("preprocess", "inference", "postprocess"):
+                self.add_time(stage, speed.get(stage, 0.0) / 1000)
+        return [detections_from_result(r) for r in results]
+
+    def add_time(self, stage, seconds):
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def _timed_batches(self, batches):
+        """Yield from batches, counting the time spent reading as 'decode'."""
+        iterator = iter(batches)
+        while True:
+            t0 = time.perf_counter()
+            batch = next(iterator, None)
+            self.add_time("decode", time.perf_counter() - t0)
+            if batch is None:
+                return
+            yield batch
+
+    def stream_to_video(self, model, lock, output_path):
+        """
+        Read frames from the input video, draw detections and write them
+        straight into the browser-ready MP4 without an intermediate file.
+        With output_path None nothing is drawn or encoded and detections are
+        only recorded in the detection log.
+
+        Frames are grouped into batches of params_batch_size so each
+        inference call processes several frames at once. With
+        params_pipelined enabled, decoding, inference and encoding run
+        concurrently (see run_pipelined); otherwise they run serially.
+        With frame skipping enabled only keyframes reach the detector
+        (see FrameSkipper) while every source frame is still written, and
+        with tracking enabled boxes carry stable track ids (see
+        TrackingStage). With tiling enabled each frame is detected as
+        overlapping tiles (see TiledDetector).
+        """
+        cap = cv2.VideoCapture(self.filename)
+        if not cap.isOpened():
+            raise ValueError(f"Unable to open video file: {self.filename}")
+
+        writer = None
         try:
-            cap = cv2.VideoCapture(input_path)
             width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
+            fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+            frames_total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            if output_path is not None:
+                writer = create_video_writer(Path(output_path), fps, (width, height))
+
+            infer_time = [0.0]
+            detected_frames = [0]
+            frames_written = [0]
+
+            detect = self.create_tiled_detector(
+                lambda frames: self.detect(model, lock, frames)
+            )
 
-            # STRATEGY 1: Try 'avc1' (H.264) - Best for Web Browsers
-            fourcc = cv2.VideoWriter_fourcc(*'avc1') 
-            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+            def infer(frames):
+                t0 = time.perf_counter()
+                batch_detections = detect(frames)
+                infer_time[0] += time.perf_counter() - t0
+                detected_frames[0] += len(frames)
+                return batch_detections
 
-            # CRITICAL CHECK: Did the codec initialize?
-            if not out.isOpened():
-                logger.warning("⚠️ H.264 (avc1) codec failed. Falling back to 'mp4v'...")
-                # STRATEGY 2: Try 'mp4v' - Works on almost all Windows PCs
-                fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-                out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+            def write(frame, detections):
+                t0 = time.perf_counter()
+                if self.detection_log is not None:
+                    self.detection_log.append(frames_written[0], detections)
+                if writer is not None:
+                    writer.write(draw_detections(frame, detections, model.names))
+                self.add_time("encode", time.perf_counter() - t0)
+                frames_written[0] += 1
+                if self.progress_callback is not None:
+                    self.progress_callback(frames_written[0], frames_total)
 
-            while cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                out.write(frame)
+            read_size = self.config.params_batch_size
+            tracking = self.create_tracking_stage(infer)
+            skipper = self.create_frame_skipper(infer, mark_keyframes=tracking is not None)
+            if skipper is not None:
+                # Read enough frames that the keyframes fill roughly one detector batch
+                read_size *= skipper.stride
+                if tracking is not None:
+                    process = lambda batch: tracking.track(skipper.process(batch))
+                    flush = lambda: tracking.track(skipper.flush())
+                else:
+                    process, flush = skipper.process, skipper.flush
+            elif tracking is not None:
+                process, flush = tracking.process, None
+            else:
+                process, flush = (lambda batch: list(zip(batch, infer(batch)))), None
 
+            batches = self._timed_batches(iter_frame_batches(cap, read_size))
+            start = time.perf_counter()
+            if self.config.params_pipelined:
+                run_pipelined(
+                    batches, process, write,
+                    queue_size=self.config.params_queue_size, flush=flush
+                )
+            else:
+                for batch in batches:
+                    for frame, detections in process(batch):
+                        write(frame, detections)
+                for frame, detections in (flush() if flush else []):
+                    write(frame, detections)
+        finally:
             cap.release()
-            out.release()
-        except Exception as e:
-            logger.error(f"Conversion Error: {e}")
\ No newline at end of file
+            if writer is not None:
+                writer.release()
+
+        if tracking is not None:
+            self.tracks = tracking.tracker.summary()
+
+        self._record_stats(
+            frames_written[0], time.perf_counter() - start, infer_time[0], detected_frames[0]
+        )
+        return {"fps": fps, "width": width, "height": height}
+
+    def create_tiled_detector(self, detect):
+        """
+        Wrap detect in a TiledDetector when tiling is enabled.
+        """
+        if not self.config.params_tile_enabled:
+            return detect
+        return TiledDetector(
+            detect,
+            tile_size=self.config.params_tile_size,
+            overlap=self.config.params_tile_overlap,
+            include_full_frame=self.config.params_tile_include_full_frame,
+            merge=self.config.params_tile_merge,
+            merge_iou=self.config.params_tile_merge_iou
+        )
+
+    def create_frame_skipper(self, detect, mark_keyframes: bool = False):
+        """
+        Build a FrameSkipper from the config, or None when every frame
+        should go through the detector. mark_keyframes is set when its
+        output feeds a TrackingStage.
+        """
+        if self.config.params_skip_mode == "none":
+            return None
+        return FrameSkipper(
+            detect,
+            mode=self.config.params_skip_mode,
+            stride=self.config.params_skip_stride,
+            diff_threshold=self.config.params_skip_diff_threshold,
+            max_stride=self.config.params_skip_max_stride,
+            interpolate=self.config.params_skip_interpolate,
+            mark_keyframes=mark_keyframes
+        )
+
+    def create_tracking_stage(self, detect):
+        """
+        Build a TrackingStage from the config, or None when tracking is off.
+        """
+        if not self.config.params_track_enabled:
+            return None
+        # Filled-in frames age the tracks, so a track matched on one
+        # keyframe must survive until the next one
+        skip_window = {
+            "stride": self.config.params_skip_stride,
+            "adaptive": self.config.params_skip_max_stride,
+        }.get(self.config.params_skip_mode, 0)
+        tracker = VictimTracker(
+            iou_threshold=self.config.params_track_iou_threshold,
+            max_age=max(self.config.params_track_max_age, skip_window),
+            min_hits=self.config.params_track_min_hits
+        )
+        return TrackingStage(
+            tracker,
+            detect=detect,
+            skip_confident=self.config.params_track_skip_confident,
+            max_skip=self.config.params_track_max_skip
+        )
+
+    def _record_stats(self, frames, total_time, infer_time, detected_frames):
+        self.stats = {
+            "frames": frames,
+            "detected_frames": detected_frames,
+            "batch_size": self.config.params_batch_size,
+            "pipelined": self.config.params_pipelined,
+            "total_seconds": round(total_time, 3),
+            "inference_seconds": round(infer_time, 3),
+            "fps": round(frames / total_time, 2) if total_time > 0 else 0.0,
+            "inference_fps": round(frames / infer_time, 2) if infer_time > 0 else 0.0,
+            "stage_seconds": {stage: round(t, 3) for stage, t in self.timings.items()},
+        }
+        if self.tracks is not None:
+            self.stats["tracks"] = self.tracks["num_tracks"]
+        logger.info(
+            f"Processed {frames} frames in {self.stats['total_seconds']}s "
+            f"(batch_size={self.stats['batch_size']}, {self.stats['fps']} FPS end-to-end, "
+            f"{self.stats['inference_fps']} FPS inference)",
+            extra={
+                "duration_ms": round(total_time * 1000, 1),
+                "frames": frames,
+                "fps": self.stats["fps"],
+                "stage_ms": {stage: round(t * 1000, 1) for stage, t in self.timings.items()},
+            }
+        )
+
+
+class ImagePredictionPipeline(PredictionPipeline):
+    """
+    Batch inference on in-memory still images.
+
+    Shares the served model, conf threshold, imgsz and tiling settings with
+    the video pipeline; every image of a request goes through the detector in
+    one batched call.
+    """
+
+    def __init__(self, config: PredictionConfig = None):
+        super().__init__(filename=None, config=config, render=True)
+
+    def predict(self, images, annotate: bool = False):
+        """
+        Detect victims on a list of BGR images.
+
+        Args:
+            images (list): BGR images, any sizes
+            annotate (bool): Also return each image with its boxes drawn
+
+        Returns:
+            list: One dict per image with 'width', 'height', 'detections'
+                (list of box / conf / class / label dicts) and, with
+                annotate, 'annotated' (the drawn BGR image)
+        """
+        model, lock = model_registry.get(str(self.config.model_path))
+        detect = self.create_tiled_detector(
+            lambda frames: self.detect(model, lock, frames)
+        )
+
+        start = time.perf_counter()
+        batch_detections = detect(images)
+        infer_time = time.perf_counter() - start
+
+        results = []
+        for image, detections in zip(images, batch_detections):
+            height, width = image.shape[:2]
+            result = {
+                "width": width,
+                "height": height,
+                "detections": detections_to_dicts(detections, model.names),
+            }
+            if annotate:
+                t0 = time.perf_counter()
+                result["annotated"] = draw_detections(image.copy(), detections, model.names)
+                self.add_time("encode", time.perf_counter() - t0)
+            results.append(result)
+
+        self.stats = {
+            "images": len(images),
+            "total_seconds": round(time.perf_counter() - start, 3),
+            "inference_seconds": round(infer_time, 3),
+            "stage_seconds": {stage: round(t, 3) for stage, t in self.timings.items()},
+        }
+        logger.info(
+            f"Detected on {len(images)} images in {self.stats['inference_seconds']}s",
+            extra={"duration_ms": round(self.stats["total_seconds"] * 1000, 1), "images": len(images)}
+        )
+        return results
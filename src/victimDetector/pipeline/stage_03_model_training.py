@@ -16,7 +16,6 @@ class ModelTrainingPipeline:
         config = ConfigurationManager()
         training_config = config.get_training_config()
         training = Training(config=training_config)
-        training.create_data_yaml()
         training.train()
 
 
@@ -16,7 +16,6 @@ class EvaluationPipeline:
         
         # This function runs validation AND saves the score internally
         evaluation.evaluation()
-        evaluation.save_score()
         # This logs the results to DagsHub
         # evaluation.log_into_mlflow()
 
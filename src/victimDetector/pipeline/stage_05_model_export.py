@@ -0,0 +1,33 @@
+from victimDetector.config.configuration import ConfigurationManager
+from victimDetector.components.model_export import ModelExport
+from victimDetector import logger
+
+
+
+STAGE_NAME = "Model export stage"
+
+
+
+class ModelExportPipeline:
+    def __init__(self):
+        pass
+
+    def main(self):
+        config = ConfigurationManager()
+        model_export_config = config.get_model_export_config()
+        model_export = ModelExport(config=model_export_config)
+        model_export.export()
+        model_export.parity_check()
+
+
+
+if __name__ == '__main__':
+    try:
+        logger.info(f"*******************")
+        logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+        obj = ModelExportPipeline()
+        obj.main()
+        logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        logger.exception(e)
+        raise e
@@ -0,0 +1,34 @@
+from victimDetector.config.configuration import ConfigurationManager
+from victimDetector.components.benchmark import Benchmark
+from victimDetector import logger
+
+
+
+STAGE_NAME = "Inference benchmark stage"
+
+
+
+class BenchmarkPipeline:
+    def __init__(self):
+        pass
+
+    def main(self):
+        config = ConfigurationManager()
+        benchmark_config = config.get_benchmark_config()
+        prediction_config = config.get_prediction_config()
+        benchmark = Benchmark(config=benchmark_config, prediction_config=prediction_config)
+        results = benchmark.run()
+        benchmark.save_results(results)
+
+
+
+if __name__ == '__main__':
+    try:
+        logger.info(f"*******************")
+        logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+        obj = BenchmarkPipeline()
+        obj.main()
+        logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        logger.exception(e)
+        raise e
@@ -0,0 +1,32 @@
+from victimDetector.config.configuration import ConfigurationManager
+from victimDetector.components.data_preprocessing import DataPreprocessing
+from victimDetector import logger
+
+
+
+STAGE_NAME = "Data preprocessing stage"
+
+
+
+class DataPreprocessingPipeline:
+    def __init__(self):
+        pass
+
+    def main(self):
+        config = ConfigurationManager()
+        data_preprocessing_config = config.get_data_preprocessing_config()
+        data_preprocessing = DataPreprocessing(config=data_preprocessing_config)
+        data_preprocessing.run()
+
+
+
+if __name__ == '__main__':
+    try:
+        logger.info(f"*******************")
+        logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+        obj = DataPreprocessingPipeline()
+        obj.main()
+        logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        logger.exception(e)
+        raise e
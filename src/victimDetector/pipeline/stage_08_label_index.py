@@ -0,0 +1,32 @@
+from victimDetector.config.configuration import ConfigurationManager
+from victimDetector.components.label_indexing import LabelIndexing
+from victimDetector import logger
+
+
+
+STAGE_NAME = "Label index stage"
+
+
+
+class LabelIndexPipeline:
+    def __init__(self):
+        pass
+
+    def main(self):
+        config = ConfigurationManager()
+        label_index_config = config.get_label_index_config()
+        label_indexing = LabelIndexing(config=label_index_config)
+        label_indexing.run()
+
+
+
+if __name__ == '__main__':
+    try:
+        logger.info(f"*******************")
+        logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+        obj = LabelIndexPipeline()
+        obj.main()
+        logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        logger.exception(e)
+        raise e
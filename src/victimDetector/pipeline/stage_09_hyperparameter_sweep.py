@@ -0,0 +1,33 @@
+from victimDetector.config.configuration import ConfigurationManager
+from victimDetector.components.hyperparameter_sweep import HyperparameterSweep
+from victimDetector import logger
+
+
+
+STAGE_NAME = "Hyperparameter sweep stage"
+
+
+
+class HyperparameterSweepPipeline:
+    def __init__(self):
+        pass
+
+    def main(self):
+        config = ConfigurationManager()
+        sweep_config = config.get_sweep_config()
+        training_config = config.get_training_config()
+        sweep = HyperparameterSweep(config=sweep_config, training_config=training_config)
+        sweep.run()
+
+
+
+if __name__ == '__main__':
+    try:
+        logger.info(f"*******************")
+        logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+        obj = HyperparameterSweepPipeline()
+        obj.main()
+        logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        logger.exception(e)
+        raise e
@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import sys
+import shlex
+import hashlib
+import subprocess
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+
+from victimDetector import logger
+from victimDetector.constants import CPU_BUDGET_ENV
+from victimDetector.entity.config_entity import StageRunnerConfig
+from victimDetector.utils.common import cpu_budget, file_sha256, save_json
+
+
+def _paths(entries) -> List[str]:
+    """Paths of dvc.yaml deps/outs/metrics entries (plain strings or {path: options})."""
+    paths = []
+    for entry in entries or []:
+        paths.extend(entry.keys() if isinstance(entry, dict) else [entry])
+    return [str(path) for path in paths]
+
+
+def _overlaps(a: str, b: str) -> bool:
+    """Whether one path is the other or contains it."""
+    a, b = os.path.normpath(a), os.path.normpath(b)
+    return a == b or a.startswith(b + os.sep) or b.startswith(a + os.sep)
+
+
+class Stage:
+    def __init__(self, name: str, spec: dict):
+        self.name = name
+        self.cmd = spec["cmd"]
+        self.deps = _paths(spec.get("deps"))
+        self.params = [str(key) for key in spec.get("params") or []]
+        self.outs = _paths(spec.get("outs")) + _paths(spec.get("metrics"))
+        self.upstream: List[str] = []
+
+
+class FileHasher:
+    """
+    SHA-256 of files and directories, cached by (size, mtime) so unchanged
+    datasets are not read again on every run.
+    """
+
+    def __init__(self, cache: Optional[dict] = None):
+        # path -> [size, mtime_ns, sha256]
+        self.cache = cache or {}
+        self._lock = threading.Lock()
+
+    def file(self, path: str) -> str:
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        with self._lock:
+            cached = self.cache.get(path)
+        if cached is not None and cached[:2] == signature:
+            return cached[2]
+        digest = file_sha256(Path(path))
+        with self._lock:
+            self.cache[path] = signature + [digest]
+        return digest
+
+    def path(self, path: str) -> str:
+        """Hash of a file, of a directory's relative paths + file hashes, or 'missing'."""
+        if os.path.isfile(path):
+            return self.file(path)
+        if not os.path.isdir(path):
+            return "missing"
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode())
+                digest.update(self.file(file_path).encode())
+        return digest.hexdigest()
+
+
+class StageRunner:
+    """
+    Runs the dvc.yaml stages without DVC, skipping the up-to-date ones.
+
+    A stage's fingerprint covers its command, the hashes of its deps and the
+    values of its params keys; it is skipped when the fingerprint matches
+    the one recorded after its last successful run and all of its outs
+    exist. Stages run as their own processes (the stage's cmd), up to
+    max_parallel at a time once their upstream stages have finished.
+    """
+
+    def __init__(self, config: StageRunnerConfig):
+        self.config = config
+        with open(config.dvc_file) as f:
+            specs = yaml.safe_load(f)["stages"]
+        self.stages = {name: Stage(name, spec) for name, spec in specs.items()}
+        for stage in self.stages.values():
+            stage.upstream = [
+                other.name for other in self.stages.values()
+                if other is not stage and any(_overlaps(dep, out) for dep in stage.deps for out in other.outs)
+            ]
+        self.state = self.load_state()
+        self.hasher = FileHasher(self.state.get("hashes"))
+
+    def load_state(self) -> dict:
+        if os.path.exists(self.config.state_file):
+            with open(self.config.state_file) as f:
+                return json.load(f)
+        return {}
+
+    def save_state(self):
+        self.state["hashes"] = {path: entry for path, entry in self.hasher.cache.items() if os.path.exists(path)}
+        save_json(path=Path(self.config.state_file), data=self.state)
+
+    def with_upstream(self, targets: List[str]) -> List[str]:
+        """Targets plus every stage they depend on, in dvc.yaml order."""
+        unknown = [name for name in targets if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown stages: {unknown}")
+        selected, todo = set(), list(targets)
+        while todo:
+            name = todo.pop()
+            if name not in selected:
+                selected.add(name)
+                todo.extend(self.stages[name].upstream)
+        return [name for name in self.stages if name in selected]
+
+    @staticmethod
+    def _read_yaml(path: Path) -> dict:
+        with open(path) as f:
+            return yaml.safe_load(f) or {}
+
+    def dep_hash(self, stage: Stage, dep: str) -> str:
+        """
+        Hash of a dep; config.yaml only counts with the sections the stage
+        reads (config_sections), so editing another stage's paths does not
+        invalidate it.
+        """
+        sections = self.config.config_sections.get(stage.name)
+        if sections and os.path.normpath(dep) == os.path.normpath(self.config.config_file):
+            config = self._read_yaml(self.config.config_file)
+            data = {section: config.get(section) for section in sections}
+            return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+        return self.hasher.path(dep)
+
+    def fingerprint(self, stage: Stage) -> str:
+        params = self._read_yaml(self.config.params_file)
+        values = {}
+        for key in stage.params:
+            value = params
+            for part in key.split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            values[key] = value
+        data = {
+            "cmd": stage.cmd,
+            "deps": {dep: self.dep_hash(stage, dep) for dep in stage.deps},
+            "params": values,
+        }
+        return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+    def is_current(self, stage: Stage, fingerprint: str) -> bool:
+        recorded = self.state.get("stages", {}).get(stage.name)
+        return recorded == fingerprint and all(os.path.exists(out) for out in stage.outs)
+
+    @property
+    def stage_cpus(self) -> int:
+        """CPU cores of each stage when max_parallel stages run at once."""
+        return max(1, cpu_budget() // max(1, self.config.params_max_parallel))
+
+    def run_stage(self, stage: Stage) -> float:
+        logger.info(f">>>>>> stage {stage.name} started <<<<<<")
+        args = shlex.split(stage.cmd)
+        # Same interpreter (and virtualenv) as the runner, not the first python on PATH
+        if args and args[0] in ("python", "python3"):
+            args[0] = sys.executable
+        # Concurrent stages share the cores instead of each sizing its pools to all of them
+        env = dict(os.environ)
+        env[CPU_BUDGET_ENV] = str(self.stage_cpus)
+        start = time.perf_counter()
+        subprocess.run(args, check=True, env=env)
+        seconds = time.perf_counter() - start
+        logger.info(f">>>>>> stage {stage.name} completed in {seconds:.1f}s <<<<<<")
+        return seconds
+
+    def run(self, targets: Optional[List[str]] = None, force: bool = False, dry_run: bool = False) -> Dict[str, dict]:
+        """
+        Run the targets (default: params stage_runner.stages) and their
+        upstream stages, skipping those whose inputs did not change.
+
+        Args:
+            targets (list): Stage names from dvc.yaml
+            force (bool): Run the stages even if they are up to date
+            dry_run (bool): Only report which stages would run
+
+        Returns:
+            dict: stage -> {"status": ran | skipped | failed | blocked | pending, "seconds"}
+
+        Raises:
+            RuntimeError: If a stage failed
+        """
+        names = self.with_upstream(list(targets or self.config.params_stages))
+        start = time.perf_counter()
+        report = {name: {"status": "waiting", "seconds": 0.0} for name in names}
+
+        def ready(name: str) -> bool:
+            return all(report[up]["status"] in ("ran", "skipped", "pending") for up in self.stages[name].upstream if up in report)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.config.params_max_parallel)) as pool:
+            running = {}
+            while True:
+                for name in names:
+                    if report[name]["status"] != "waiting":
+                        continue
+                    stage = self.stages[name]
+                    upstream = [up for up in stage.upstream if up in report]
+                    if any(report[up]["status"] in ("failed", "blocked") for up in upstream):
+                        report[name]["status"] = "blocked"
+                        continue
+                    if not ready(name):
+                        continue
+
+                    # Upstream outs are only rewritten by a real run, so in a
+                    # dry run everything below a pending stage is pending too
+                    upstream_pending = any(report[up]["status"] == "pending" for up in upstream)
+                    fingerprint = self.fingerprint(stage)
+                    if not force and not upstream_pending and self.is_current(stage, fingerprint):
+                        report[name]["status"] = "skipped"
+                        logger.info(f"Stage {name} is up to date, skipping")
+                    elif dry_run:
+                        report[name]["status"] = "pending"
+                        logger.info(f"Stage {name} would run")
+                    else:
+                        report[name]["status"] = "running"
+                        running[pool.submit(self.run_stage, stage)] = (name, fingerprint)
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, fingerprint = running.pop(future)
+                    try:
+                        report[name]["seconds"] = round(future.result(), 1)
+                        report[name]["status"] = "ran"
+                        self.state.setdefault("stages", {})[name] = fingerprint
+                    except Exception as e:
+                        logger.error(f"Stage {name} failed: {e}")
+                        report[name]["status"] = "failed"
+                        self.state.get("stages", {}).pop(name, None)
+                    self.save_state()
+
+        seconds = round(time.perf_counter() - start, 1)
+        self.log_report(report, seconds)
+        if not dry_run:
+            save_json(path=Path(self.config.report_path), data={"stages": report, "seconds": seconds})
+        failed = [name for name, result in report.items() if result["status"] == "failed"]
+        if failed:
+            raise RuntimeError(f"Stages failed: {failed}")
+        return report
+
+    @staticmethod
+    def log_report(report: Dict[str, dict], seconds: float):
+        lines = [f"{'stage':<20} {'status':<8} {'seconds':>8}"]
+        for name, result in report.items():
+            lines.append(f"{name:<20} {result['status']:<8} {result['seconds']:>8.1f}")
+        lines.append(f"{'wall time':<20} {'':<8} {seconds:>8.1f}")
+        logger.info("Stage run summary:\n" + "\n".join(lines))
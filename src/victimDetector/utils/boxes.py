@@ -0,0 +1,158 @@
+import numpy as np
+
+
+# -------------------- BOX GEOMETRY --------------------
+
+def box_area(boxes: np.ndarray) -> np.ndarray:
+    """
+    Area of (N, 4) x1, y1, x2, y2 boxes.
+    """
+    return np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU between two sets of x1, y1, x2, y2 boxes.
+
+    Args:
+        boxes_a (np.ndarray): (N, >=4) array
+        boxes_b (np.ndarray): (M, >=4) array
+
+    Returns:
+        np.ndarray: (N, M) IoU matrix
+    """
+    a = boxes_a[:, None, :4]
+    b = boxes_b[None, :, :4]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    union = box_area(boxes_a[:, :4])[:, None] + box_area(boxes_b[:, :4])[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def match_boxes(boxes_a: np.ndarray, boxes_b: np.ndarray, iou_threshold: float):
+    """
+    Greedy one-to-one matching of two box sets by descending IoU.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Matched indices into boxes_a and boxes_b
+    """
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    iou = box_iou(boxes_a, boxes_b)
+    rows, cols = np.nonzero(iou >= iou_threshold)
+    order = np.argsort(-iou[rows, cols], kind="stable")
+
+    used_a = np.zeros(len(boxes_a), dtype=bool)
+    used_b = np.zeros(len(boxes_b), dtype=bool)
+    matched_a, matched_b = [], []
+    for r, c in zip(rows[order], cols[order]):
+        if not used_a[r] and not used_b[c]:
+            used_a[r] = used_b[c] = True
+            matched_a.append(r)
+            matched_b.append(c)
+    return np.asarray(matched_a, dtype=np.int64), np.asarray(matched_b, dtype=np.int64)
+
+
+# -------------------- DETECTION HELPERS --------------------
+
+def interpolate_detections(
+    start: np.ndarray,
+    end: np.ndarray,
+    t: float,
+    iou_threshold: float = 0.3
+) -> np.ndarray:
+    """
+    Linearly interpolate detections between two keyframes.
+
+    Boxes matched across the keyframes (by IoU) are blended; unmatched boxes
+    are held from the nearer keyframe.
+
+    Args:
+        start (np.ndarray): (N, 6) detections at the earlier keyframe
+        end (np.ndarray): (M, 6) detections at the later keyframe
+        t (float): Position between the keyframes in [0, 1]
+        iou_threshold (float): Minimum IoU for two boxes to be the same object
+
+    Returns:
+        np.ndarray: (K, 6) interpolated detections
+    """
+    idx_a, idx_b = match_boxes(start, end, iou_threshold)
+
+    blended = start[idx_a].copy()
+    blended[:, :5] = (1 - t) * start[idx_a, :5] + t * end[idx_b, :5]
+
+    if t < 0.5:
+        unmatched = np.delete(start, idx_a, axis=0)
+    else:
+        unmatched = np.delete(end, idx_b, axis=0)
+    return np.concatenate([blended, unmatched], axis=0).astype(np.float32)
+
+
+# -------------------- BOX MERGING --------------------
+
+def nms(detections: np.ndarray, iou_threshold: float = 0.5) -> np.ndarray:
+    """
+    Class-aware non-maximum suppression.
+
+    The IoU matrix is computed once for all boxes; suppression then only
+    masks rows of it, so no IoU is recomputed inside the loop.
+
+    Args:
+        detections (np.ndarray): (N, 6) x1, y1, x2, y2, conf, class
+        iou_threshold (float): Boxes overlapping a better box above this are dropped
+
+    Returns:
+        np.ndarray: Kept detections sorted by confidence
+    """
+    if len(detections) == 0:
+        return detections
+    dets = detections[np.argsort(-detections[:, 4], kind="stable")]
+    iou = box_iou(dets, dets)
+    # Boxes of different classes never suppress each other
+    iou[dets[:, 5][:, None] != dets[:, 5][None, :]] = 0.0
+
+    suppressed = np.zeros(len(dets), dtype=bool)
+    for i in range(len(dets)):
+        if suppressed[i]:
+            continue
+        suppressed[i + 1:] |= iou[i, i + 1:] > iou_threshold
+    return dets[~suppressed]
+
+
+def weighted_box_fusion(detections: np.ndarray, iou_threshold: float = 0.5) -> np.ndarray:
+    """
+    Merge overlapping same-class boxes into confidence-weighted averages.
+
+    Each cluster is seeded by its most confident box and absorbs every
+    lower-ranked box overlapping it above iou_threshold.
+
+    Args:
+        detections (np.ndarray): (N, 6) x1, y1, x2, y2, conf, class
+        iou_threshold (float): Minimum IoU for two boxes to be fused
+
+    Returns:
+        np.ndarray: (K, 6) fused detections
+    """
+    if len(detections) == 0:
+        return detections
+    dets = detections[np.argsort(-detections[:, 4], kind="stable")]
+    iou = box_iou(dets, dets)
+    iou[dets[:, 5][:, None] != dets[:, 5][None, :]] = 0.0
+
+    assigned = np.zeros(len(dets), dtype=bool)
+    fused = []
+    for i in range(len(dets)):
+        if assigned[i]:
+            continue
+        members = ~assigned & (iou[i] > iou_threshold)
+        members[i] = True
+        assigned |= members
+
+        cluster = dets[members]
+        weights = cluster[:, 4:5]
+        box = (cluster[:, :4] * weights).sum(axis=0) / weights.sum()
+        fused.append([*box, cluster[:, 4].max(), dets[i, 5]])
+    return np.asarray(fused, dtype=np.float32)
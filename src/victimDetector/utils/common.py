@@ -1,16 +1,20 @@
 import os
 import json
 import yaml
-import joblib
 import base64
+import hashlib
 
-
-import cv2
 from pathlib import Path
-from typing import Tuple
+from typing import TYPE_CHECKING, Tuple
 
 from victimDetector import logger
 
+# cv2 / numpy / joblib are imported by the helpers that use them, so
+# importing this module (and every stage that does) stays cheap
+if TYPE_CHECKING:
+    import cv2
+    import numpy as np
+
 from pathlib import Path
 from typing import Any, List
 
@@ -19,6 +23,7 @@ from box.exceptions import BoxValueError
 from ensure import ensure_annotations
 
 from victimDetector import logger
+from victimDetector.constants import CPU_BUDGET_ENV
 
 
 # -------------------- YAML UTILS --------------------
@@ -44,7 +49,7 @@ def read_yaml(path_to_yaml: Path) -> ConfigBox:
         if content is None:
             raise BoxValueError("YAML file is empty")
 
-        logger.info(f"YAML file loaded successfully: {path_to_yaml}")
+        logger.debug(f"YAML file loaded successfully: {path_to_yaml}")
         return ConfigBox(content)
 
     except BoxValueError:
@@ -68,7 +73,7 @@ def create_directories(path_to_directories: list, verbose=True):
     for path in path_to_directories:
         os.makedirs(path, exist_ok=True)
         if verbose:
-            logger.info(f"created directory at: {path}")
+            logger.debug(f"created directory at: {path}")
 
 
 # -------------------- JSON UTILS --------------------
@@ -85,7 +90,7 @@ def save_json(path: Path, data: dict):
     with open(path, "w") as f:
         json.dump(data, f, indent=4)
 
-    logger.info(f"JSON file saved at: {path}")
+    logger.debug(f"JSON file saved at: {path}")
 
 
 @ensure_annotations
@@ -102,7 +107,7 @@ def load_json(path: Path) -> ConfigBox:
     with open(path, "r") as f:
         content = json.load(f)
 
-    logger.info(f"JSON file loaded successfully: {path}")
+    logger.debug(f"JSON file loaded successfully: {path}")
     return ConfigBox(content)
 
 
@@ -117,6 +122,8 @@ def save_bin(data: Any, path: Path):
         data (Any): Object to save
         path (Path): Path to binary file
     """
+    import joblib
+
     joblib.dump(data, path)
     logger.info(f"Binary file saved at: {path}")
 
@@ -132,6 +139,8 @@ def load_bin(path: Path) -> Any:
     Returns:
         Any: Loaded object
     """
+    import joblib
+
     data = joblib.load(path)
     logger.info(f"Binary file loaded from: {path}")
     return data
@@ -154,6 +163,35 @@ def get_size(path: Path) -> str:
     return f"{size_kb} KB"
 
 
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    SHA-256 of a file, read in chunks so large videos are never held in memory.
+
+    Args:
+        path (Path): File path
+        chunk_size (int): Bytes read per iteration
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# -------------------- CPU UTILS --------------------
+
+def cpu_budget() -> int:
+    """
+    CPU cores this process should size its pools to: its share when the
+    stage runner runs several stages at once, otherwise os.cpu_count().
+    """
+    budget = os.environ.get(CPU_BUDGET_ENV)
+    return int(budget) if budget else (os.cpu_count() or 1)
+
+
 # -------------------- BASE64 IMAGE UTILS (API SUPPORT) --------------------
 
 def decode_base64_image(img_string: str, output_path: Path):
@@ -188,6 +226,62 @@ def encode_image_to_base64(image_path: Path) -> bytes:
     return encoded
 
 
+def decode_image_bytes(data: bytes) -> "np.ndarray":
+    """
+    Decode an encoded image (JPEG, PNG, ...) in memory.
+
+    Args:
+        data (bytes): Encoded image bytes
+
+    Raises:
+        ValueError: If the bytes are not a readable image
+
+    Returns:
+        np.ndarray: BGR image
+    """
+    import cv2
+    import numpy as np
+
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Not a readable image")
+    return image
+
+
+def decode_base64_to_image(img_string: str) -> "np.ndarray":
+    """
+    Decode a base64 image string (optionally a data: URL) in memory.
+
+    Args:
+        img_string (str): Base64 encoded image
+
+    Returns:
+        np.ndarray: BGR image
+    """
+    if img_string.startswith("data:"):
+        img_string = img_string.split(",", 1)[-1]
+    return decode_image_bytes(base64.b64decode(img_string))
+
+
+def encode_image_to_base64_string(image: "np.ndarray", quality: int = 90) -> str:
+    """
+    JPEG-encode an in-memory image as a base64 string.
+
+    Args:
+        image (np.ndarray): BGR image
+        quality (int): JPEG quality (0-100)
+
+    Returns:
+        str: Base64 encoded JPEG
+    """
+    import cv2
+
+    ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Could not encode image")
+    return base64.b64encode(buffer.tobytes()).decode("ascii")
+
+
 
 
 
@@ -200,6 +294,8 @@ def validate_video_file(video_path: Path):
     Args:
         video_path (Path): Path to input video
     """
+    import cv2
+
     if not video_path.exists():
         raise FileNotFoundError(f"Video file not found: {video_path}")
 
@@ -222,6 +318,8 @@ def get_video_properties(video_path: Path) -> Tuple[int, int, int]:
     Returns:
         Tuple[int, int, int]: fps, width, height
     """
+    import cv2
+
     cap = cv2.VideoCapture(str(video_path))
 
     fps = int(cap.get(cv2.CAP_PROP_FPS))
@@ -236,34 +334,104 @@ def get_video_properties(video_path: Path) -> Tuple[int, int, int]:
     return fps, width, height
 
 
+def iter_frame_batches(cap: "cv2.VideoCapture", batch_size: int):
+    """
+    Yield lists of up to batch_size decoded frames from an open capture.
+
+    Args:
+        cap (cv2.VideoCapture): Opened video capture
+        batch_size (int): Maximum number of frames per batch
+
+    Yields:
+        list: Consecutive BGR frames
+    """
+    batch = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        batch.append(frame)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
 def create_video_writer(
     output_path: Path,
-    fps: int,
-    frame_size: Tuple[int, int]
-) -> cv2.VideoWriter:
+    fps: float,
+    frame_size: Tuple[int, int],
+    codecs: Tuple[str, ...] = ("avc1", "mp4v")
+) -> "cv2.VideoWriter":
     """
     Create a VideoWriter object for saving output video.
 
+    Codecs are tried in order: H.264 ('avc1') plays in browsers but is not
+    available in every OpenCV build, so 'mp4v' is used as a fallback.
+
     Args:
         output_path (Path): Output video path
-        fps (int): Frames per second
+        fps (float): Frames per second
         frame_size (Tuple[int, int]): (width, height)
+        codecs (Tuple[str, ...]): FourCC codes to try, in order of preference
 
     Returns:
         cv2.VideoWriter
     """
-    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-    writer = cv2.VideoWriter(
-        str(output_path),
-        fourcc,
-        fps,
-        frame_size
-    )
-
-    logger.info(f"Video writer initialized at: {output_path}")
+    import cv2
+
+    writer = None
+    for codec in codecs:
+        fourcc = cv2.VideoWriter_fourcc(*codec)
+        writer = cv2.VideoWriter(
+            str(output_path),
+            fourcc,
+            fps,
+            frame_size
+        )
+        if writer.isOpened():
+            break
+        logger.warning(f"Codec '{codec}' failed to initialize, trying next")
+
+    if writer is None or not writer.isOpened():
+        raise RuntimeError(f"Unable to open video writer at: {output_path}")
+
+    logger.info(f"Video writer initialized at: {output_path} (codec: {codec})")
     return writer
 
 
+def draw_detections(frame, detections, class_names: dict = None):
+    """
+    Draw bounding boxes and confidence labels onto a frame in place.
+
+    Args:
+        frame (np.ndarray): BGR image
+        detections (np.ndarray): (N, 6) array of x1, y1, x2, y2, conf, class,
+            optionally with a 7th track_id column
+        class_names (dict): Mapping of class id to label
+
+    Returns:
+        np.ndarray: The annotated frame
+    """
+    import cv2
+
+    for det in detections:
+        x1, y1, x2, y2, conf, cls = det[:6]
+        p1, p2 = (int(x1), int(y1)), (int(x2), int(y2))
+        name = class_names.get(int(cls), str(int(cls))) if class_names else str(int(cls))
+        label = f"{name} {conf:.2f}"
+        if len(det) > 6:
+            label = f"#{int(det[6])} {label}"
+
+        cv2.rectangle(frame, p1, p2, (0, 255, 0), 2)
+        (tw, th), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+        cv2.rectangle(frame, (p1[0], p1[1] - th - 6), (p1[0] + tw + 4, p1[1]), (0, 255, 0), -1)
+        cv2.putText(frame, label, (p1[0] + 2, p1[1] - 4),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1, cv2.LINE_AA)
+    return frame
+
+
 def generate_output_video_path(
     input_video_path: Path,
     output_dir: Path
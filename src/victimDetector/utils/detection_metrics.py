@@ -0,0 +1,177 @@
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+from victimDetector.utils.boxes import box_iou
+
+
+# COCO IoU thresholds: mAP is averaged over 0.5:0.95
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+
+# Recall points precision is sampled at (COCO 101-point interpolation)
+RECALL_POINTS = np.linspace(0, 1, 101)
+
+
+def xywh_to_xyxy(boxes: np.ndarray) -> np.ndarray:
+    """
+    Convert (N, 4) center x, y, width, height boxes to x1, y1, x2, y2.
+    """
+    xy, wh = boxes[:, :2], boxes[:, 2:4] / 2
+    return np.concatenate([xy - wh, xy + wh], axis=1)
+
+
+def match_predictions(
+    pred_image: np.ndarray,
+    pred_boxes: np.ndarray,
+    pred_cls: np.ndarray,
+    gt_image: np.ndarray,
+    gt_boxes: np.ndarray,
+    gt_cls: np.ndarray,
+    iou_thresholds: np.ndarray = IOU_THRESHOLDS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mark every prediction as a true or false positive at each IoU threshold.
+
+    Same rule as Ultralytics' validator: within an image, predictions and
+    ground truth boxes of the same class are paired one-to-one by descending
+    IoU. The pairing does not depend on the confidence threshold, so
+    precision / recall at any threshold follow from cumulative sums.
+
+    Args:
+        pred_image, gt_image (np.ndarray): Image id of each box
+        pred_boxes, gt_boxes (np.ndarray): (N, 4) x1, y1, x2, y2 boxes
+        pred_cls, gt_cls (np.ndarray): Class of each box
+        iou_thresholds (np.ndarray): (T,) IoU thresholds
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (N, T) bool true-positive matrix, and
+            the ground truth index each prediction matched at the first
+            threshold (-1 if none)
+    """
+    correct = np.zeros((len(pred_boxes), len(iou_thresholds)), dtype=bool)
+    matched_gt = np.full(len(pred_boxes), -1, dtype=np.int64)
+
+    pred_order = np.argsort(pred_image, kind="stable")
+    gt_order = np.argsort(gt_image, kind="stable")
+    images = np.intersect1d(pred_image, gt_image)
+    pred_start = np.searchsorted(pred_image[pred_order], images, side="left")
+    pred_end = np.searchsorted(pred_image[pred_order], images, side="right")
+    gt_start = np.searchsorted(gt_image[gt_order], images, side="left")
+    gt_end = np.searchsorted(gt_image[gt_order], images, side="right")
+
+    for ps, pe, gs, ge in zip(pred_start, pred_end, gt_start, gt_end):
+        p, g = pred_order[ps:pe], gt_order[gs:ge]
+        iou = box_iou(gt_boxes[g], pred_boxes[p])
+        iou[gt_cls[g][:, None] != pred_cls[p][None, :]] = 0.0
+        for t, threshold in enumerate(iou_thresholds):
+            rows, cols = np.nonzero(iou >= threshold)
+            if not len(rows):
+                # Higher thresholds cannot match either
+                break
+            order = np.argsort(-iou[rows, cols], kind="stable")
+            rows, cols = rows[order], cols[order]
+            # Best pair of each prediction, then best pair of each ground truth box
+            _, first = np.unique(cols, return_index=True)
+            rows, cols = rows[first], cols[first]
+            _, first = np.unique(rows, return_index=True)
+            rows, cols = rows[first], cols[first]
+            correct[p[cols], t] = True
+            if t == 0:
+                matched_gt[p[cols]] = g[rows]
+    return correct, matched_gt
+
+
+def average_precision(recall: np.ndarray, precision: np.ndarray) -> np.ndarray:
+    """
+    COCO 101-point interpolated AP of one precision / recall curve per column.
+
+    Args:
+        recall, precision (np.ndarray): (N, T) curves over predictions sorted
+            by descending confidence
+
+    Returns:
+        np.ndarray: (T,) AP
+    """
+    if not len(recall):
+        return np.zeros(recall.shape[1])
+    # Precision envelope: best precision at any recall >= r
+    envelope = np.maximum.accumulate(precision[::-1], axis=0)[::-1]
+    ap = np.zeros(recall.shape[1])
+    for t in range(recall.shape[1]):
+        idx = np.searchsorted(recall[:, t], RECALL_POINTS, side="left")
+        valid = idx < len(recall)
+        ap[t] = envelope[idx[valid], t].sum() / len(RECALL_POINTS)
+    return ap
+
+
+class DetectionMetrics:
+    """
+    Precision / recall / AP of a set of predictions at any confidence and
+    IoU threshold.
+
+    Built from confidences and the true-positive matrix of match_predictions();
+    after one sort, metrics at many confidence thresholds are a searchsorted
+    and a few array lookups.
+    """
+
+    def __init__(
+        self,
+        conf: np.ndarray,
+        pred_cls: np.ndarray,
+        correct: np.ndarray,
+        gt_cls: np.ndarray,
+        iou_thresholds: np.ndarray = IOU_THRESHOLDS,
+    ):
+        order = np.argsort(-conf, kind="stable")
+        self.conf = conf[order]
+        self.pred_cls = pred_cls[order]
+        self.correct = correct[order]
+        self.gt_cls = gt_cls
+        self.iou_thresholds = np.asarray(iou_thresholds)
+        self.tp = np.cumsum(self.correct, axis=0)
+
+    @property
+    def num_gt(self) -> int:
+        return len(self.gt_cls)
+
+    def iou_index(self, iou: float) -> int:
+        return int(np.argmin(np.abs(self.iou_thresholds - iou)))
+
+    def ap_per_class(self) -> Dict[int, np.ndarray]:
+        """Class -> (T,) AP, for every class with ground truth boxes."""
+        aps = {}
+        for cls in np.unique(self.gt_cls):
+            mask = self.pred_cls == cls
+            tp = np.cumsum(self.correct[mask], axis=0)
+            count = np.arange(1, len(tp) + 1)[:, None]
+            aps[int(cls)] = average_precision(tp / np.sum(self.gt_cls == cls), tp / count)
+        return aps
+
+    def map(self, iou: Optional[float] = None) -> float:
+        """Mean AP over classes, at one IoU threshold or averaged over all."""
+        aps = self.ap_per_class()
+        if not aps:
+            return 0.0
+        per_class = np.stack(list(aps.values()))
+        values = per_class.mean(axis=1) if iou is None else per_class[:, self.iou_index(iou)]
+        return float(values.mean())
+
+    def at(self, conf_thresholds: Sequence[float], iou: float = 0.5) -> Dict[str, np.ndarray]:
+        """
+        Micro-averaged counts and precision / recall / F1 of the predictions
+        kept at each confidence threshold.
+
+        Returns:
+            dict: 'conf', 'tp', 'fp', 'fn', 'precision', 'recall', 'f1' arrays
+        """
+        conf_thresholds = np.asarray(conf_thresholds, dtype=np.float64)
+        kept = np.searchsorted(-self.conf, -conf_thresholds, side="right")
+        column = self.tp[:, self.iou_index(iou)] if len(self.tp) else np.zeros(0, dtype=np.int64)
+        tp = np.where(kept > 0, column[np.maximum(kept, 1) - 1] if len(column) else 0, 0)
+        fp = kept - tp
+        fn = self.num_gt - tp
+        precision = np.divide(tp, kept, out=np.zeros(len(kept)), where=kept > 0)
+        recall = tp / self.num_gt if self.num_gt else np.zeros(len(kept))
+        f1 = np.divide(2 * precision * recall, precision + recall,
+                       out=np.zeros(len(kept)), where=(precision + recall) > 0)
+        return {"conf": conf_thresholds, "tp": tp, "fp": fp, "fn": fn,
+                "precision": precision, "recall": recall, "f1": f1}
@@ -0,0 +1,101 @@
+import numpy as np
+from pathlib import Path
+from typing import Dict
+
+from victimDetector import logger
+
+
+# Column order of the detections artifact
+COLUMNS = ("frame_idx", "x1", "y1", "x2", "y2", "conf", "class", "track_id")
+
+_DTYPES = {
+    "frame_idx": np.int32,
+    "x1": np.float32,
+    "y1": np.float32,
+    "x2": np.float32,
+    "y2": np.float32,
+    "conf": np.float32,
+    "class": np.int16,
+    "track_id": np.int32,
+}
+
+
+class DetectionLog:
+    """
+    Accumulates per-frame detections into a columnar table.
+
+    Rows are kept as one (N, 8) chunk per frame and concatenated once at the
+    end, so appending stays cheap inside the frame loop.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self.frames = 0
+
+    def append(self, frame_idx: int, detections: np.ndarray):
+        """
+        Record the detections of one frame.
+
+        Args:
+            frame_idx (int): Index of the frame in the source video
+            detections (np.ndarray): (N, 6) x1, y1, x2, y2, conf, class, with
+                an optional 7th track_id column
+        """
+        self.frames = max(self.frames, frame_idx + 1)
+        if not len(detections):
+            return
+        chunk = np.full((len(detections), len(COLUMNS)), -1, dtype=np.float64)
+        chunk[:, 0] = frame_idx
+        chunk[:, 1:1 + min(detections.shape[1], 7)] = detections[:, :7]
+        self._chunks.append(chunk)
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        table = np.concatenate(self._chunks, axis=0) if self._chunks else np.zeros((0, len(COLUMNS)))
+        return {name: table[:, i].astype(_DTYPES[name]) for i, name in enumerate(COLUMNS)}
+
+    def save(self, path: Path, fmt: str = "npz", **metadata):
+        """
+        Write the table as compressed .npz or Parquet.
+
+        Args:
+            path (Path): Output file path
+            fmt (str): 'npz' or 'parquet'
+            metadata: Scalars stored alongside the columns (npz only), e.g. fps
+        """
+        columns = self.to_columns()
+        if fmt == "npz":
+            np.savez_compressed(path, num_frames=np.int32(self.frames), **metadata, **columns)
+        elif fmt == "parquet":
+            # pandas + pyarrow are only needed for this format
+            import pandas as pd
+            pd.DataFrame(columns).to_parquet(path, index=False)
+        else:
+            raise ValueError(f"Unknown detections format: {fmt}")
+        logger.info(f"Saved {len(columns['frame_idx'])} detections to: {path}")
+
+
+def load_detections(path: Path) -> Dict[str, np.ndarray]:
+    """
+    Load a detections artifact written by DetectionLog.save().
+
+    Returns:
+        Dict[str, np.ndarray]: Column name -> array (plus metadata for npz)
+    """
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pandas as pd
+        frame = pd.read_parquet(path)
+        return {name: frame[name].to_numpy() for name in frame.columns}
+
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def detections_to_json(columns: Dict[str, np.ndarray]) -> dict:
+    """
+    Convert loaded detection columns into a JSON-serializable dict.
+    """
+    return {
+        name: values.tolist() if values.ndim else values.item()
+        for name, values in columns.items()
+    }
@@ -0,0 +1,131 @@
+import cv2
+import numpy as np
+from typing import Callable, List
+
+from victimDetector.utils.boxes import interpolate_detections
+
+
+def frame_difference(prev_small: np.ndarray, cur_small: np.ndarray) -> float:
+    """
+    Mean absolute difference of two downscaled grayscale frames, in [0, 1].
+    """
+    return float(np.mean(cv2.absdiff(prev_small, cur_small))) / 255.0
+
+
+def _thumbnail(frame: np.ndarray) -> np.ndarray:
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, (64, 36), interpolation=cv2.INTER_AREA)
+
+
+class FrameSkipper:
+    """
+    Runs the detector only on keyframes and fills the frames in between.
+
+    Modes:
+        stride:   every `stride`-th frame is a keyframe
+        adaptive: a frame becomes a keyframe when its difference from the last
+                  keyframe exceeds `diff_threshold`, or after `max_stride` frames
+
+    With `interpolate` enabled, frames between two keyframes are held back
+    until the next keyframe is detected and their boxes are interpolated;
+    otherwise the last keyframe's boxes are carried forward immediately.
+    With `mark_keyframes`, (frame, detections, is_keyframe) triples are
+    returned instead of pairs, so a tracker can tell real detections from
+    filled-in ones.
+    """
+
+    def __init__(
+        self,
+        detect: Callable[[List[np.ndarray]], List[np.ndarray]],
+        mode: str = "stride",
+        stride: int = 3,
+        diff_threshold: float = 0.03,
+        max_stride: int = 10,
+        interpolate: bool = True,
+        mark_keyframes: bool = False
+    ):
+        if mode not in ("stride", "adaptive"):
+            raise ValueError(f"Unknown frame skip mode: {mode}")
+
+        self.detect = detect
+        self.mode = mode
+        self.stride = max(1, int(stride))
+        self.diff_threshold = diff_threshold
+        self.max_stride = max(1, int(max_stride))
+        self.interpolate = interpolate
+        self.mark_keyframes = mark_keyframes
+
+        self.keyframes = 0
+        self._since_key = None
+        self._key_thumb = None
+        self._last_dets = np.zeros((0, 6), dtype=np.float32)
+        self._pending = []
+
+    @property
+    def window(self) -> int:
+        """Largest possible gap between keyframes."""
+        return self.stride if self.mode == "stride" else self.max_stride
+
+    def _is_keyframe(self, frame) -> bool:
+        if self._since_key is None:
+            is_key = True
+        elif self.mode == "stride":
+            is_key = self._since_key >= self.stride
+        else:
+            is_key = (
+                self._since_key >= self.max_stride
+                or frame_difference(self._key_thumb, _thumbnail(frame)) > self.diff_threshold
+            )
+
+        if is_key:
+            self._since_key = 1
+            if self.mode == "adaptive":
+                self._key_thumb = _thumbnail(frame)
+        else:
+            self._since_key += 1
+        return is_key
+
+    def _resolve_pending(self, next_dets):
+        n = len(self._pending)
+        resolved = [
+            (frame, interpolate_detections(self._last_dets, next_dets, (i + 1) / (n + 1)), False)
+            for i, frame in enumerate(self._pending)
+        ]
+        self._pending = []
+        return resolved
+
+    def process(self, frames: List[np.ndarray]) -> list:
+        """
+        Consume frames in order and return the (frame, detections) pairs that
+        are ready. Frames awaiting the next keyframe are returned by a later
+        call or by flush().
+        """
+        flags = [self._is_keyframe(frame) for frame in frames]
+        key_frames = [frame for frame, is_key in zip(frames, flags) if is_key]
+        # All keyframes in this chunk go through the detector in one call
+        key_dets = iter(self.detect(key_frames) if key_frames else [])
+        self.keyframes += len(key_frames)
+
+        ready = []
+        for frame, is_key in zip(frames, flags):
+            if not is_key:
+                if self.interpolate:
+                    self._pending.append(frame)
+                else:
+                    ready.append((frame, self._last_dets, False))
+                continue
+
+            dets = next(key_dets)
+            ready.extend(self._resolve_pending(dets))
+            ready.append((frame, dets, True))
+            self._last_dets = dets
+        return self._output(ready)
+
+    def flush(self) -> list:
+        """Release trailing frames after the last keyframe with carried-forward boxes."""
+        ready = [(frame, self._last_dets, False) for frame in self._pending]
+        self._pending = []
+        return self._output(ready)
+
+    def _output(self, ready: list) -> list:
+        return ready if self.mark_keyframes else [(frame, dets) for frame, dets, _ in ready]
@@ -0,0 +1,320 @@
+import os
+import json
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from victimDetector import logger
+
+
+# Per-box columns, one .npy file each, memory-mapped on load
+BOX_COLUMNS = {
+    "image_id": np.int32,
+    "class": np.int16,
+    "x": np.float32,
+    "y": np.float32,
+    "w": np.float32,
+    "h": np.float32,
+}
+
+META_NAME = "index.json"
+
+
+def parse_label_file(path: Optional[str]) -> np.ndarray:
+    """
+    Parse a YOLO label file into an (N, 5) float32 array of class, x, y, w, h.
+
+    Polygon labels are reduced to their bounding box; missing files and
+    malformed lines yield no rows.
+    """
+    rows = []
+    if path is not None and os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                values = line.split()
+                if len(values) < 5:
+                    continue
+                try:
+                    numbers = [float(v) for v in values]
+                except ValueError:
+                    continue
+                if len(numbers) == 5:
+                    rows.append(numbers)
+                else:
+                    xs, ys = numbers[1::2], numbers[2::2]
+                    rows.append([
+                        numbers[0], (min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2,
+                        max(xs) - min(xs), max(ys) - min(ys),
+                    ])
+    return np.asarray(rows, dtype=np.float32).reshape(-1, 5)
+
+
+def _parse_many(paths: List[Optional[str]]) -> List[np.ndarray]:
+    return [parse_label_file(path) for path in paths]
+
+
+def image_size(path: str) -> Tuple[int, int]:
+    """(width, height) of an image from its header, (0, 0) if unreadable."""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as image:
+            return image.size
+    except (OSError, ValueError):
+        return 0, 0
+
+
+def _image_sizes(paths: List[str]) -> List[Tuple[int, int]]:
+    return [image_size(path) for path in paths]
+
+
+def letterbox_size(w: np.ndarray, h: np.ndarray, width: np.ndarray, height: np.ndarray, imgsz: int) -> np.ndarray:
+    """
+    sqrt(w * h) in pixels of normalized boxes once their images are
+    letterboxed to imgsz: the long side becomes imgsz and the short side
+    imgsz * short / long. Images of unknown size (0) are taken as square.
+    """
+    width = np.asarray(width, dtype=np.float64)
+    height = np.asarray(height, dtype=np.float64)
+    long_side = np.maximum(width, height)
+    known = long_side > 0
+    aspect = np.divide(width * height, long_side ** 2, out=np.ones_like(long_side), where=known)
+    return np.sqrt(np.asarray(w, dtype=np.float64) * h * aspect) * imgsz
+
+
+class LabelIndex:
+    """
+    Columnar index of every YOLO label in the dataset.
+
+    Boxes are stored as one .npy file per column (image_id, class and the
+    normalized x, y, w, h), sorted by image, plus an index.json with the
+    per-image path, split, width, height, label mtime and row offsets. Loading memory-maps
+    the columns, so statistics over the whole dataset are a few vectorized
+    NumPy calls instead of re-reading thousands of .txt files.
+    """
+
+    def __init__(self, root: Path, images: List[dict], columns: Dict[str, np.ndarray]):
+        self.root = Path(root)
+        self.images = images
+        self.columns = columns
+        self._splits = np.array([image["split"] for image in images])
+        self.widths = np.array([image.get("width", 0) for image in images], dtype=np.int64)
+        self.heights = np.array([image.get("height", 0) for image in images], dtype=np.int64)
+
+    # -------------------- BUILD / LOAD --------------------
+
+    @staticmethod
+    def scan(source_data: Path, splits: Sequence[str]) -> List[dict]:
+        """One entry per image of each split, with its mtime and its label file's."""
+        images = []
+        for split in splits:
+            images_dir = Path(source_data, split, "images")
+            labels_dir = Path(source_data, split, "labels")
+            if not images_dir.is_dir():
+                continue
+            for image in sorted(images_dir.iterdir()):
+                if image.name.startswith(".") or not image.is_file():
+                    continue
+                label = labels_dir / f"{image.stem}.txt"
+                stat = label.stat() if label.exists() else None
+                images.append({
+                    "path": str(image),
+                    "split": split,
+                    "image_mtime_ns": image.stat().st_mtime_ns,
+                    "label": str(label) if stat else None,
+                    "mtime_ns": stat.st_mtime_ns if stat else 0,
+                    "size": stat.st_size if stat else 0,
+                })
+        return images
+
+    @classmethod
+    def load(cls, root: Path) -> "LabelIndex":
+        """
+        Open an index written by refresh(), memory-mapping its columns.
+
+        Raises:
+            FileNotFoundError: If no index exists at root
+        """
+        root = Path(root)
+        meta_path = root / META_NAME
+        if not meta_path.exists():
+            raise FileNotFoundError(f"No label index at {root}")
+        with open(meta_path) as f:
+            meta = json.load(f)
+        columns = {name: np.load(root / f"{name}.npy", mmap_mode="r") for name in BOX_COLUMNS}
+        return cls(root, meta["images"], columns)
+
+    @classmethod
+    def refresh(cls, root: Path, source_data: Path, splits: Sequence[str], max_workers: int = 1) -> "LabelIndex":
+        """
+        Build the index, re-parsing only label files whose mtime or size
+        changed since the index at root was written (and reading the size
+        of only new or rewritten images).
+
+        Args:
+            root (Path): Index directory
+            source_data (Path): Dataset root with <split>/images and <split>/labels
+            splits (Sequence[str]): Splits to index
+            max_workers (int): Processes parsing the changed label files
+
+        Returns:
+            LabelIndex: The refreshed index
+        """
+        root = Path(root)
+        try:
+            previous = cls.load(root)
+            previous_images = {image["path"]: image for image in previous.images}
+            # Copied out of the memory-mapped files, which are replaced below
+            previous_table = np.stack(
+                [np.asarray(previous.columns[name], dtype=np.float32) for name in ("class", "x", "y", "w", "h")],
+                axis=1,
+            )
+            del previous
+        except FileNotFoundError:
+            previous_images, previous_table = {}, None
+
+        images = cls.scan(source_data, splits)
+        boxes: List[Optional[np.ndarray]] = []
+        stale, unsized = [], []
+        for i, image in enumerate(images):
+            old = previous_images.get(image["path"])
+            if old is not None and all(old[key] == image[key] for key in ("label", "mtime_ns", "size")):
+                boxes.append(previous_table[old["offset"]:old["offset"] + old["count"]])
+            else:
+                boxes.append(None)
+                stale.append(i)
+            if old is not None and "width" in old and old.get("image_mtime_ns") == image["image_mtime_ns"]:
+                image["width"], image["height"] = old["width"], old["height"]
+            else:
+                unsized.append(i)
+
+        logger.info(f"Indexing labels of {len(stale)} of {len(images)} images")
+        if stale:
+            paths = [images[i]["label"] for i in stale]
+            # Small files parse in microseconds, so workers get them in chunks
+            chunk = min(1000, max(1, len(paths) // (max_workers * 4)))
+            chunks = [paths[i:i + chunk] for i in range(0, len(paths), chunk)]
+            if max_workers > 1 and len(chunks) > 1:
+                with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                    parsed = [rows for result in pool.map(_parse_many, chunks) for rows in result]
+            else:
+                parsed = [rows for paths_chunk in chunks for rows in _parse_many(paths_chunk)]
+            for i, rows in zip(stale, parsed):
+                boxes[i] = rows
+
+        if unsized:
+            paths = [images[i]["path"] for i in unsized]
+            # Only the image headers are read
+            chunk = min(1000, max(1, len(paths) // (max_workers * 4)))
+            chunks = [paths[i:i + chunk] for i in range(0, len(paths), chunk)]
+            if max_workers > 1 and len(chunks) > 1:
+                with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                    sizes = [size for result in pool.map(_image_sizes, chunks) for size in result]
+            else:
+                sizes = [size for paths_chunk in chunks for size in _image_sizes(paths_chunk)]
+            for i, (width, height) in zip(unsized, sizes):
+                images[i]["width"], images[i]["height"] = int(width), int(height)
+
+        counts = np.array([len(rows) for rows in boxes], dtype=np.int64)
+        table = np.concatenate(boxes, axis=0) if boxes else np.zeros((0, 5), dtype=np.float32)
+        columns = {
+            "image_id": np.repeat(np.arange(len(images), dtype=np.int32), counts),
+            "class": table[:, 0].astype(np.int16),
+            "x": table[:, 1],
+            "y": table[:, 2],
+            "w": table[:, 3],
+            "h": table[:, 4],
+        }
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        for i, image in enumerate(images):
+            image["offset"], image["count"] = int(offsets[i]), int(counts[i])
+
+        cls._write(root, images, columns)
+        return cls.load(root)
+
+    @staticmethod
+    def _write(root: Path, images: List[dict], columns: Dict[str, np.ndarray]):
+        os.makedirs(root, exist_ok=True)
+        # Each file is swapped in atomically, index.json last; readers that
+        # memory-mapped the old columns keep their (unlinked) copies
+        for name, dtype in BOX_COLUMNS.items():
+            tmp = root / f".{name}.tmp.npy"
+            np.save(tmp, np.ascontiguousarray(columns[name], dtype=dtype))
+            os.replace(tmp, root / f"{name}.npy")
+        tmp = root / f".{META_NAME}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"images": images}, f)
+        os.replace(tmp, root / META_NAME)
+
+    # -------------------- QUERIES --------------------
+
+    def __len__(self) -> int:
+        return len(self.columns["image_id"])
+
+    def rows(self, image_id: int) -> Dict[str, np.ndarray]:
+        """Columns of the boxes of one image."""
+        image = self.images[image_id]
+        start, end = image["offset"], image["offset"] + image["count"]
+        return {name: column[start:end] for name, column in self.columns.items()}
+
+    def image_mask(self, split: Optional[str] = None) -> np.ndarray:
+        """Boolean mask over images, True for those in split (all if None)."""
+        if split is None:
+            return np.ones(len(self.images), dtype=bool)
+        return self._splits == split
+
+    def box_mask(self, split: Optional[str] = None) -> np.ndarray:
+        """Boolean mask over boxes, True for those in split (all if None)."""
+        return self.image_mask(split)[self.columns["image_id"]]
+
+    def boxes_per_image(self, split: Optional[str] = None) -> np.ndarray:
+        """Number of boxes of every image in split, including images without any."""
+        counts = np.bincount(self.columns["image_id"], minlength=len(self.images))
+        return counts[self.image_mask(split)]
+
+    def box_sizes(self, split: Optional[str] = None, imgsz: Optional[int] = None) -> np.ndarray:
+        """
+        sqrt(w * h) of every box, normalized, or in pixels of the image
+        letterboxed to imgsz (see letterbox_size).
+        """
+        mask = self.box_mask(split)
+        w, h = self.columns["w"][mask], self.columns["h"][mask]
+        if not imgsz:
+            return np.sqrt(w * h)
+        image_ids = self.columns["image_id"][mask]
+        return letterbox_size(w, h, self.widths[image_ids], self.heights[image_ids], imgsz)
+
+    def small_object_fraction(self, max_px: float, imgsz: int, split: Optional[str] = None) -> float:
+        """Fraction of boxes smaller than max_px pixels at the training imgsz."""
+        sizes = self.box_sizes(split, imgsz)
+        return float(np.mean(sizes < max_px)) if len(sizes) else 0.0
+
+    def crowded_images(self, min_boxes: int, split: Optional[str] = None) -> List[Tuple[str, int]]:
+        """(image path, boxes) of images with at least min_boxes boxes, most crowded first."""
+        ids = np.flatnonzero(self.image_mask(split))
+        counts = np.bincount(self.columns["image_id"], minlength=len(self.images))[ids]
+        order = np.argsort(-counts, kind="stable")
+        return [(self.images[ids[i]]["path"], int(counts[i])) for i in order if counts[i] >= min_boxes]
+
+    def stats(self, imgsz: int, small_object_px: float, split: Optional[str] = None) -> dict:
+        """
+        Summary statistics of one split (or the whole dataset).
+
+        Returns:
+            dict: images, boxes, empty images, boxes per image (mean,
+                median, p95, max), median box size in px and the small-object fraction
+        """
+        counts = self.boxes_per_image(split)
+        sizes = self.box_sizes(split, imgsz)
+        return {
+            "images": int(len(counts)),
+            "boxes": int(counts.sum()),
+            "empty_images": int(np.sum(counts == 0)),
+            "boxes_per_image_mean": round(float(counts.mean()), 3) if len(counts) else 0.0,
+            "boxes_per_image_median": float(np.median(counts)) if len(counts) else 0.0,
+            "boxes_per_image_p95": float(np.percentile(counts, 95)) if len(counts) else 0.0,
+            "boxes_per_image_max": int(counts.max()) if len(counts) else 0,
+            "box_size_px_median": round(float(np.median(sizes)), 2) if len(sizes) else 0.0,
+            "small_object_fraction": round(self.small_object_fraction(small_object_px, imgsz, split), 4),
+        }
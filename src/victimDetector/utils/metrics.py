@@ -0,0 +1,215 @@
+import math
+import threading
+from typing import Callable, Dict, Sequence, Tuple
+
+
+# Latency buckets in seconds (web requests, single frames)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Buckets for whole-video work, up to the 30 minute upload limit
+LONG_BUCKETS = (0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+NAMESPACE = "victim_detector"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Metric:
+    """
+    Base class of an in-process metric with optional labels.
+
+    Values are kept per label combination; every update takes the metric's
+    lock, so metrics can be shared by the request, pipeline and worker
+    threads.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = f"{NAMESPACE}_{name}"
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, object] = {}
+
+    def _key(self, labels: dict) -> Tuple:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self):
+        """Yield (suffix, label_string, value) lines for the exposition format."""
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield "", _format_labels(self.label_names, key), value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._function = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the (unlabelled) value from function at scrape time."""
+        self._function = function
+
+    def samples(self):
+        if self._function is not None:
+            yield "", "", float(self._function())
+            return
+        yield from super().samples()
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(counts), total)) for key, (counts, total) in self._values.items()]
+        for key, (counts, total) in items:
+            for bound, count in zip(self.buckets, counts):
+                le = f'le="{_format_value(bound)}"'
+                yield "_bucket", _format_labels(self.label_names, key, le), count
+            yield "_sum", _format_labels(self.label_names, key), total
+            yield "_count", _format_labels(self.label_names, key), counts[-1]
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together in the Prometheus text
+    exposition format (served by the app at /metrics).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Shared registry of this process
+registry = MetricsRegistry()
+
+REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Time to produce a response", ["method", "endpoint", "status"]
+)
+PREDICTION_SECONDS = registry.histogram(
+    "prediction_duration_seconds", "End-to-end time of one prediction", ["pipeline"], buckets=LONG_BUCKETS
+)
+PREDICTION_STAGE_SECONDS = registry.histogram(
+    "prediction_stage_seconds", "Time spent per prediction stage", ["pipeline", "stage"], buckets=LONG_BUCKETS
+)
+FRAMES_PROCESSED = registry.counter(
+    "frames_processed_total", "Frames or images run through a prediction pipeline", ["pipeline"]
+)
+RESULT_CACHE_REQUESTS = registry.counter(
+    "result_cache_requests_total", "Result cache lookups by outcome", ["result"]
+)
+JOBS = registry.counter("jobs_total", "Finished video jobs by final status", ["status"])
+JOB_QUEUE_DEPTH = registry.gauge("job_queue_depth", "Queued + running video jobs")
+MODEL_LOAD_SECONDS = registry.gauge(
+    "model_load_seconds", "Time the last load of a model took", ["model"]
+)
+LIVE_FRAMES = registry.counter(
+    "live_frames_total", "Live stream frames by outcome", ["stream", "outcome"]
+)
+LIVE_LATENCY_SECONDS = registry.histogram(
+    "live_latency_seconds", "Capture to publish latency of live frames", ["stream"]
+)
+
+
+def record_prediction(stats: dict, pipeline: str):
+    """
+    Record the stats of one PredictionPipeline / ImagePredictionPipeline run.
+
+    Args:
+        stats (dict): pipeline.stats
+        pipeline (str): 'video' or 'images'
+    """
+    cache = stats.get("cache")
+    if cache is not None:
+        RESULT_CACHE_REQUESTS.inc(result=cache)
+    if cache == "hit":
+        # Timings of a hit belong to the run that filled the cache
+        return
+
+    FRAMES_PROCESSED.inc(stats.get("frames", stats.get("images", 0)), pipeline=pipeline)
+    if "total_seconds" in stats:
+        PREDICTION_SECONDS.observe(stats["total_seconds"], pipeline=pipeline)
+    for stage, seconds in stats.get("stage_seconds", {}).items():
+        PREDICTION_STAGE_SECONDS.observe(seconds, pipeline=pipeline, stage=stage)
@@ -0,0 +1,141 @@
+import os
+import hashlib
+import time
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from victimDetector import logger
+from victimDetector.utils.common import file_sha256
+from victimDetector.utils.metrics import MODEL_LOAD_SECONDS
+
+if TYPE_CHECKING:
+    from ultralytics import YOLO
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded YOLO models.
+
+    Models are keyed by their absolute path. Every lookup stats the file and
+    reloads the weights when its mtime/size changed, so a new training run
+    overwriting artifacts/training/model.pt is picked up without a restart.
+
+    Exported models (.onnx files, OpenVINO directories) are served the same
+    way, since YOLO() picks the runtime from the path.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+
+    @staticmethod
+    def _files(model_path: str) -> List[str]:
+        if os.path.isdir(model_path):
+            return sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(model_path)
+                for name in names
+            )
+        return [model_path]
+
+    def _fingerprint(self, model_path: str) -> Tuple[int, int]:
+        stats = [os.stat(path) for path in self._files(model_path)]
+        return max(s.st_mtime_ns for s in stats), sum(s.st_size for s in stats)
+
+    def _entry(self, model_path) -> dict:
+        key = os.path.abspath(str(model_path))
+        if not os.path.exists(key):
+            raise FileNotFoundError(f"Model not found at {key}")
+
+        fingerprint = self._fingerprint(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["fingerprint"] != fingerprint:
+                if entry is not None:
+                    logger.info(f"Model file changed on disk, reloading: {key}")
+                logger.info(f"Loading model into registry: {key}")
+                # Imported on first load: ultralytics pulls in torch, which
+                # processes that never run inference should not pay for
+                from ultralytics import YOLO
+
+                t0 = time.perf_counter()
+                model = YOLO(key, task="detect")
+                load_seconds = time.perf_counter() - t0
+                MODEL_LOAD_SECONDS.set(load_seconds, model=os.path.basename(key))
+                entry = {
+                    "model": model,
+                    "load_seconds": load_seconds,
+                    "fingerprint": fingerprint,
+                    "sha256": None,
+                    # Ultralytics predictors are not thread-safe, so callers
+                    # sharing a model must serialize inference on this lock.
+                    "lock": threading.RLock(),
+                }
+                self._entries[key] = entry
+            return entry
+
+    def get(self, model_path) -> Tuple["YOLO", threading.RLock]:
+        """
+        Return the cached model for model_path, loading or reloading it if needed.
+
+        The model comes with its inference lock from the same lookup; callers
+        keep the pair for a whole run, so a reload in between can neither
+        swap the model mid-video nor hand out a lock that does not guard it.
+
+        Args:
+            model_path (Path): Path to the .pt weights
+
+        Returns:
+            Tuple[YOLO, threading.RLock]: Loaded model and its inference lock
+        """
+        entry = self._entry(model_path)
+        return entry["model"], entry["lock"]
+
+    def load_seconds(self, model_path) -> float:
+        """
+        Return how long loading the cached version of the model took.
+        """
+        return self._entry(model_path)["load_seconds"]
+
+    def model_hash(self, model_path) -> str:
+        """
+        Return the SHA-256 of the weights file(s), computed once per loaded version.
+        """
+        entry = self._entry(model_path)
+        if entry["sha256"] is None:
+            files = self._files(os.path.abspath(str(model_path)))
+            if len(files) == 1:
+                entry["sha256"] = file_sha256(files[0])
+            else:
+                # Exported model directories: hash of the per-file hashes
+                digest = hashlib.sha256()
+                for path in files:
+                    digest.update(file_sha256(path).encode())
+                entry["sha256"] = digest.hexdigest()
+        return entry["sha256"]
+
+    def warm_up(self, model_path, imgsz: int = 320):
+        """
+        Load the model and run one dummy inference so the first real request
+        does not pay for graph setup.
+
+        Args:
+            model_path (Path): Path to the .pt weights
+            imgsz (int): Inference size used for the dummy frame
+        """
+        import numpy as np
+
+        model, lock = self.get(model_path)
+        dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+        with lock:
+            model.predict(source=dummy, imgsz=imgsz, verbose=False)
+        logger.info(f"Model warmed up: {Path(model_path)}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared instance used by the prediction and evaluation paths
+model_registry = ModelRegistry()
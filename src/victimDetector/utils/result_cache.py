@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Dict, Optional
+
+from victimDetector import logger
+
+
+class ResultCache:
+    """
+    Size-bounded on-disk cache of finished predictions.
+
+    Entries are keyed by make_key() (video hash, model hash and every
+    parameter that changes the output) and stored as one directory per key
+    holding the artifacts plus a manifest.json. A SQLite index tracks entry
+    sizes, last access times and hit/miss/eviction counters, so the cache and
+    its counters are shared by every worker process.
+    """
+
+    COUNTERS = ("hits", "misses", "stores", "evictions")
+
+    def __init__(self, root_dir: Path, max_size_mb: float):
+        self.root_dir = Path(root_dir)
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.db_path = str(self.root_dir / "index.db")
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    created_at REAL,
+                    last_access REAL
+                )
+                """
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.executemany(
+                "INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)",
+                [(name,) for name in self.COUNTERS],
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _count(self, conn, name: str, amount: int = 1):
+        conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (amount, name))
+
+    @staticmethod
+    def make_key(video_hash: str, model_hash: str, params: dict) -> str:
+        """
+        Cache key of one prediction.
+
+        Args:
+            video_hash (str): SHA-256 of the input video
+            model_hash (str): SHA-256 of the served weights
+            params (dict): Every setting that affects the outputs
+
+        Returns:
+            str: Hex digest
+        """
+        payload = json.dumps(
+            {"video": video_hash, "model": model_hash, "params": params},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def lookup(self, key: str, output_dir: Path, name: str) -> Optional[dict]:
+        """
+        Restore a cached prediction into output_dir.
+
+        Artifacts are copied (never linked: a later run writing the same
+        name in place would corrupt the entry) as name + suffix, e.g.
+        name.mp4 and name_detections.npz.
+
+        Args:
+            key (str): Key from make_key()
+            output_dir (Path): Folder the artifacts are served from
+            name (str): Base name of the restored files
+
+        Returns:
+            Optional[dict]: Manifest with 'artifacts' (role -> filename in
+                output_dir), 'stats' and 'tracks', or None on a miss
+        """
+        entry_dir = self.root_dir / key
+        manifest_path = entry_dir / "manifest.json"
+        with self._connect() as conn:
+            row = conn.execute("SELECT key FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or not manifest_path.exists():
+                self._count(conn, "misses")
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._count(conn, "hits")
+
+        artifacts = {}
+        tmp = None
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            for role, suffix in manifest["artifacts"].items():
+                target = Path(output_dir) / (name + suffix)
+                tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+                shutil.copyfile(entry_dir / role, tmp)
+                os.replace(tmp, target)
+                tmp = None
+                # Served now: the retention sweep ages outputs by mtime
+                os.utime(target)
+                artifacts[role] = target.name
+        except OSError as e:
+            # A concurrent evict() removed the entry after the index lookup
+            partial = [Path(output_dir) / filename for filename in artifacts.values()]
+            for path in partial + ([tmp] if tmp is not None else []):
+                if path.exists():
+                    path.unlink()
+            with self._connect() as conn:
+                self._count(conn, "hits", -1)
+                self._count(conn, "misses")
+            logger.warning(f"Result cache entry {key[:12]} disappeared while restoring: {e}")
+            return None
+
+        logger.info(f"Result cache hit {key[:12]}: restored {sorted(artifacts)}")
+        return {**manifest, "artifacts": artifacts}
+
+    def store(self, key: str, output_dir: Path, name: str, artifacts: Dict[str, str], **manifest):
+        """
+        Copy a finished prediction into the cache and evict old entries.
+
+        Args:
+            key (str): Key from make_key()
+            output_dir (Path): Folder the artifacts were written to
+            name (str): Base name the artifact filenames start with
+            artifacts (Dict[str, str]): Role -> filename in output_dir
+            manifest: JSON-serializable extras returned on a hit (stats, tracks)
+        """
+        # Built in a temp dir and renamed, so a concurrent lookup never sees
+        # a half-written entry
+        tmp_dir = self.root_dir / f".tmp-{uuid.uuid4().hex}"
+        os.makedirs(tmp_dir)
+        suffixes = {}
+        for role, filename in artifacts.items():
+            shutil.copyfile(Path(output_dir) / filename, tmp_dir / role)
+            suffixes[role] = filename[len(name):] if filename.startswith(name) else filename
+        with open(tmp_dir / "manifest.json", "w") as f:
+            json.dump({**manifest, "artifacts": suffixes}, f)
+
+        size = sum(entry.stat().st_size for entry in os.scandir(tmp_dir))
+        entry_dir = self.root_dir / key
+        try:
+            os.rename(tmp_dir, entry_dir)
+            stored = True
+        except OSError:
+            # Another worker cached the same result first (entries are only
+            # ever renamed into place complete, so the existing one is valid)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            stored = False
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO entries (key, size, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, size, now, now),
+            )
+            if not stored:
+                return
+            self._count(conn, "stores")
+        logger.info(f"Result cache stored {key[:12]} ({size / (1024 * 1024):.1f} MB)")
+        self.evict(keep=key)
+
+    def evict(self, keep: str = None) -> int:
+        """
+        Delete least recently used entries until the cache fits max_size_mb.
+
+        Returns:
+            int: Number of evicted entries
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall()
+            total = sum(size for _, size in rows)
+            evicted = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                evicted.append(key)
+                total -= size
+            if evicted:
+                self._count(conn, "evictions", len(evicted))
+
+        for key in evicted:
+            shutil.rmtree(self.root_dir / key, ignore_errors=True)
+        if evicted:
+            logger.info(f"Result cache evicted {len(evicted)} entries")
+        return len(evicted)
+
+    def stats(self) -> dict:
+        """
+        Counters and current size, for monitoring.
+        """
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "size_mb": round(size / (1024 * 1024), 2),
+            "max_size_mb": round(self.max_bytes / (1024 * 1024), 2),
+        }
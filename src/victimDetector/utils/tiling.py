@@ -0,0 +1,106 @@
+import numpy as np
+from typing import Callable, List
+
+from victimDetector.utils.boxes import nms, weighted_box_fusion
+
+
+def tile_grid(width: int, height: int, tile_size: int, overlap: float) -> np.ndarray:
+    """
+    Overlapping tiles covering a frame; the last row/column is aligned to the
+    frame edge instead of running past it.
+
+    Args:
+        width (int): Frame width
+        height (int): Frame height
+        tile_size (int): Tile side in pixels
+        overlap (float): Fraction of tile_size shared by neighbouring tiles
+
+    Returns:
+        np.ndarray: (T, 4) x1, y1, x2, y2 tile coordinates
+    """
+    step = max(1, int(tile_size * (1 - overlap)))
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        points = list(range(0, length - tile_size, step))
+        return points + [length - tile_size]
+
+    return np.array(
+        [
+            [x, y, min(x + tile_size, width), min(y + tile_size, height)]
+            for y in starts(height)
+            for x in starts(width)
+        ],
+        dtype=np.int32,
+    )
+
+
+class TiledDetector:
+    """
+    SAHI-style sliced inference for small objects in high-resolution frames.
+
+    Every frame is cut into overlapping tiles and the tiles of all frames in a
+    call go through the detector together. Tile boxes are shifted back into
+    frame coordinates and merged per frame with NMS or weighted box fusion.
+    With include_full_frame, the whole (downscaled) frame is detected as well
+    so large victims spanning several tiles are not fragmented.
+    """
+
+    def __init__(
+        self,
+        detect: Callable[[List[np.ndarray]], List[np.ndarray]],
+        tile_size: int = 640,
+        overlap: float = 0.2,
+        include_full_frame: bool = True,
+        merge: str = "nms",
+        merge_iou: float = 0.5
+    ):
+        if merge not in ("nms", "wbf"):
+            raise ValueError(f"Unknown tile merge method: {merge}")
+
+        self.detect = detect
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.include_full_frame = include_full_frame
+        self.merge = nms if merge == "nms" else weighted_box_fusion
+        self.merge_iou = merge_iou
+        self._grids = {}
+
+    def _grid(self, width, height):
+        key = (width, height)
+        if key not in self._grids:
+            self._grids[key] = tile_grid(width, height, self.tile_size, self.overlap)
+        return self._grids[key]
+
+    def __call__(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        crops, offsets, owners = [], [], []
+        for i, frame in enumerate(frames):
+            height, width = frame.shape[:2]
+            grid = self._grid(width, height)
+            for x1, y1, x2, y2 in grid:
+                crops.append(frame[y1:y2, x1:x2])
+                offsets.append((x1, y1))
+                owners.append(i)
+            # A single tile already is the full frame
+            if self.include_full_frame and len(grid) > 1:
+                crops.append(frame)
+                offsets.append((0, 0))
+                owners.append(i)
+
+        # One detector call for every tile of every frame
+        tile_dets = self.detect(crops)
+
+        per_frame = [[] for _ in frames]
+        for dets, (dx, dy), owner in zip(tile_dets, offsets, owners):
+            if len(dets):
+                shifted = dets.copy()
+                shifted[:, [0, 2]] += dx
+                shifted[:, [1, 3]] += dy
+                per_frame[owner].append(shifted)
+
+        return [
+            self.merge(np.concatenate(chunks, axis=0), self.merge_iou)
+            if chunks else np.zeros((0, 6), dtype=np.float32)
+            for chunks in per_frame
+        ]
@@ -0,0 +1,264 @@
+import numpy as np
+from typing import Callable, List
+
+from victimDetector.utils.boxes import match_boxes
+
+
+# -------------------- KALMAN MODEL --------------------
+# State: [cx, cy, area, aspect, vx, vy, v_area] with constant velocity;
+# measurement: [cx, cy, area, aspect] (same model as SORT).
+
+_F = np.eye(7)
+_F[0, 4] = _F[1, 5] = _F[2, 6] = 1.0
+_H = np.eye(4, 7)
+_Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+_R = np.diag([1.0, 1.0, 10.0, 10.0])
+_P0 = np.diag([10.0, 10.0, 10.0, 10.0, 10000.0, 10000.0, 10000.0])
+
+
+def _xyxy_to_z(boxes: np.ndarray) -> np.ndarray:
+    w = boxes[:, 2] - boxes[:, 0]
+    h = boxes[:, 3] - boxes[:, 1]
+    return np.stack(
+        [boxes[:, 0] + w / 2, boxes[:, 1] + h / 2, w * h, w / np.maximum(h, 1e-6)], axis=1
+    )
+
+
+def _x_to_xyxy(states: np.ndarray) -> np.ndarray:
+    area = np.clip(states[:, 2], 1e-6, None)
+    w = np.sqrt(area * np.clip(states[:, 3], 1e-6, None))
+    h = area / np.maximum(w, 1e-6)
+    return np.stack(
+        [states[:, 0] - w / 2, states[:, 1] - h / 2, states[:, 0] + w / 2, states[:, 1] + h / 2],
+        axis=1,
+    )
+
+
+class VictimTracker:
+    """
+    IoU + Kalman multi-object tracker (SORT-style) in pure NumPy.
+
+    All live tracks are predicted and updated together as stacked arrays, and
+    detections are associated to predicted boxes from a single IoU matrix.
+    A track is reported once it has been matched `min_hits` times and is
+    dropped after `max_age` frames without a match. Frames without real
+    detections (propagated or filled in by frame skipping) age the tracks
+    like any other frame, but never count as a match.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_age: int = 15, min_hits: int = 3):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+
+        self.frame_idx = -1
+        # Frames since the detector last ran
+        self._since_observed = 0
+        self._next_id = 1
+        self._x = np.zeros((0, 7))
+        self._p = np.zeros((0, 7, 7))
+        self._tracks = []
+        self._finished = []
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def _predict(self):
+        if not len(self._tracks):
+            return
+        # Keep the predicted area positive
+        shrinking = self._x[:, 2] + self._x[:, 6] <= 0
+        self._x[shrinking, 6] = 0.0
+        self._x = self._x @ _F.T
+        self._p = _F @ self._p @ _F.T + _Q
+        for track in self._tracks:
+            track["age_since_update"] += 1
+
+    def _correct(self, track_idx: np.ndarray, detections: np.ndarray):
+        """Kalman update of the matched tracks' states."""
+        z = _xyxy_to_z(detections[:, :4])
+        p = self._p[track_idx]
+        s = _H @ p @ _H.T + _R
+        k = p @ _H.T @ np.linalg.inv(s)
+        innovation = z - self._x[track_idx] @ _H.T
+        self._x[track_idx] += np.einsum("nij,nj->ni", k, innovation)
+        self._p[track_idx] = (np.eye(7) - k @ _H) @ p
+
+    def _update(self, track_idx: np.ndarray, detections: np.ndarray):
+        if not len(track_idx):
+            return
+        self._correct(track_idx, detections)
+        for i, det in zip(track_idx, detections):
+            track = self._tracks[i]
+            track["hits"] += 1
+            track["age_since_update"] = 0
+            track["last_frame"] = self.frame_idx
+            track["conf"] = float(det[4])
+            track["cls"] = int(det[5])
+            track["best_conf"] = max(track["best_conf"], float(det[4]))
+            cx, cy = (det[0] + det[2]) / 2, (det[1] + det[3]) / 2
+            track["trajectory"].append([self.frame_idx, round(float(cx), 1), round(float(cy), 1)])
+
+    def _spawn(self, detections: np.ndarray):
+        if not len(detections):
+            return
+        z = _xyxy_to_z(detections[:, :4])
+        states = np.concatenate([z, np.zeros((len(z), 3))], axis=1)
+        self._x = np.concatenate([self._x, states], axis=0)
+        self._p = np.concatenate([self._p, np.repeat(_P0[None], len(z), axis=0)], axis=0)
+        for det in detections:
+            cx, cy = (det[0] + det[2]) / 2, (det[1] + det[3]) / 2
+            self._tracks.append({
+                "track_id": self._next_id,
+                "first_frame": self.frame_idx,
+                "last_frame": self.frame_idx,
+                "hits": 1,
+                "age_since_update": 0,
+                "conf": float(det[4]),
+                "best_conf": float(det[4]),
+                "cls": int(det[5]),
+                "trajectory": [[self.frame_idx, round(float(cx), 1), round(float(cy), 1)]],
+            })
+            self._next_id += 1
+
+    def _prune(self):
+        keep = np.array([t["age_since_update"] <= self.max_age for t in self._tracks], dtype=bool)
+        if keep.all():
+            return
+        for track, alive in zip(self._tracks, keep):
+            if not alive:
+                self._finished.append(track)
+        self._tracks = [t for t, alive in zip(self._tracks, keep) if alive]
+        self._x, self._p = self._x[keep], self._p[keep]
+
+    def _output(self) -> np.ndarray:
+        # Confirmed tracks matched on (or missed once before) the last detected frame
+        rows = [
+            i for i, t in enumerate(self._tracks)
+            if t["hits"] >= self.min_hits and t["age_since_update"] <= self._since_observed + 1
+        ]
+        if not rows:
+            return np.zeros((0, 7), dtype=np.float32)
+        boxes = _x_to_xyxy(self._x[rows])
+        meta = np.array(
+            [[self._tracks[i]["conf"], self._tracks[i]["cls"], self._tracks[i]["track_id"]] for i in rows]
+        )
+        return np.concatenate([boxes, meta], axis=1).astype(np.float32)
+
+    def step(self, detections: np.ndarray = None, observed: bool = True) -> np.ndarray:
+        """
+        Advance one frame.
+
+        Args:
+            detections (np.ndarray): (N, 6) detections for this frame, or None
+                to propagate the tracks without running the detector
+            observed (bool): False when detections were not produced by the
+                detector for this frame (interpolated or carried forward):
+                they steer the matched tracks' boxes, but add no hits, do
+                not reset the tracks' age and start no new tracks
+
+        Returns:
+            np.ndarray: (K, 7) x1, y1, x2, y2, conf, class, track_id of
+                confirmed tracks
+        """
+        self.frame_idx += 1
+        self._predict()
+        observed = observed and detections is not None
+        self._since_observed = 0 if observed else self._since_observed + 1
+
+        if detections is not None:
+            predicted = _x_to_xyxy(self._x) if len(self._tracks) else np.zeros((0, 4))
+            det_idx, track_idx = match_boxes(detections, predicted, self.iou_threshold)
+            if observed:
+                self._update(track_idx, detections[det_idx])
+                unmatched = np.setdiff1d(np.arange(len(detections)), det_idx)
+                self._spawn(detections[unmatched])
+            elif len(track_idx):
+                self._correct(track_idx, detections[det_idx])
+
+        self._prune()
+        return self._output()
+
+    def is_confident(self) -> bool:
+        """
+        True when every live track is confirmed and matched on the latest
+        detected frame, i.e. propagating them is a safe substitute for detection.
+        """
+        return bool(self._tracks) and all(
+            t["hits"] >= self.min_hits and t["age_since_update"] == self._since_observed for t in self._tracks
+        )
+
+    def summary(self) -> dict:
+        """
+        Per-track summary of every confirmed track seen so far.
+
+        Returns:
+            dict: num_tracks and a list of tracks with first/last frame,
+                best confidence and (frame, cx, cy) trajectory
+        """
+        tracks = [
+            {
+                "track_id": t["track_id"],
+                "class": t["cls"],
+                "first_frame": t["first_frame"],
+                "last_frame": t["last_frame"],
+                "hits": t["hits"],
+                "best_conf": round(t["best_conf"], 4),
+                "trajectory": t["trajectory"],
+            }
+            for t in self._finished + self._tracks
+            if t["hits"] >= self.min_hits
+        ]
+        tracks.sort(key=lambda t: t["track_id"])
+        return {"num_tracks": len(tracks), "tracks": tracks}
+
+
+class TrackingStage:
+    """
+    Adds track ids to a stream of frames.
+
+    Either wraps (frame, detections) pairs produced upstream (e.g. by
+    FrameSkipper), or drives the detector itself. In the latter mode, with
+    `skip_confident` enabled, frames are propagated by the tracker instead of
+    detected while all tracks are confidently matched, for at most `max_skip`
+    consecutive frames. Those decisions depend on the previous frame, so
+    detection then runs frame by frame instead of in batches.
+    """
+
+    def __init__(
+        self,
+        tracker: VictimTracker,
+        detect: Callable[[List[np.ndarray]], List[np.ndarray]] = None,
+        skip_confident: bool = False,
+        max_skip: int = 5
+    ):
+        self.tracker = tracker
+        self.detect = detect
+        self.skip_confident = skip_confident
+        self.max_skip = max_skip
+        self._skipped = 0
+
+    def track(self, pairs: list) -> list:
+        """
+        Attach track ids to upstream (frame, detections) pairs, or
+        (frame, detections, is_keyframe) triples from a FrameSkipper with
+        mark_keyframes: only keyframe detections count as matches.
+        """
+        return [
+            (frame, self.tracker.step(dets, observed=flag[0] if flag else True))
+            for frame, dets, *flag in pairs
+        ]
+
+    def process(self, frames: List[np.ndarray]) -> list:
+        if not self.skip_confident:
+            return self.track(zip(frames, self.detect(frames)))
+
+        ready = []
+        for frame in frames:
+            if self.tracker.is_confident() and self._skipped < self.max_skip:
+                self._skipped += 1
+                ready.append((frame, self.tracker.step(None)))
+            else:
+                self._skipped = 0
+                ready.append((frame, self.tracker.step(self.detect([frame])[0])))
+        return ready
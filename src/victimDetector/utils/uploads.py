@@ -0,0 +1,176 @@
+import os
+import time
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Iterable, List
+
+from victimDetector import logger
+from victimDetector.entity.config_entity import UploadConfig
+
+
+class UploadRejected(Exception):
+    """Raised when an upload breaks the size or duration limits."""
+
+
+class HashingUploadFile:
+    """
+    Temp file that hashes and size-checks upload bytes as they are written.
+
+    Used as the multipart parser's file stream, so the upload goes straight
+    from the socket to its final directory in one write, and is aborted as
+    soon as it exceeds max_bytes.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self._file = tempfile.NamedTemporaryFile(dir=directory, prefix=".upload-", delete=False)
+        self._hash = hashlib.sha256()
+        self.path = self._file.name
+        self.max_bytes = max_bytes
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.discard()
+            raise UploadRejected(f"Upload exceeds the {self.max_bytes // (1024 * 1024)} MB limit")
+        self._hash.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    def discard(self):
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __getattr__(self, name):
+        # seek / read / tell / flush / close go to the underlying file
+        return getattr(self._file, name)
+
+
+class UploadStore:
+    """
+    Content-addressed upload directory with a retention policy.
+
+    Finalized uploads are named by the SHA-256 of their bytes, so concurrent
+    uploads with the same client filename never collide and re-uploads of the
+    same clip are stored once. collect_garbage() keeps uploads and prediction
+    outputs within an age and total size budget.
+    """
+
+    def __init__(self, config: UploadConfig):
+        self.config = config
+        self.max_bytes = int(config.params_max_size_mb * 1024 * 1024)
+        self._last_gc = 0.0
+        os.makedirs(config.root_dir, exist_ok=True)
+
+    def open_stream(self) -> HashingUploadFile:
+        return HashingUploadFile(self.config.root_dir, self.max_bytes)
+
+    def finalize(self, stream: HashingUploadFile, filename: str) -> Path:
+        """
+        Move a fully received upload to its content-addressed path and check
+        its duration from the container header.
+
+        Args:
+            stream (HashingUploadFile): Stream the upload was written to
+            filename (str): Client filename, only used for its extension
+
+        Returns:
+            Path: Final upload path
+        """
+        stream.flush()
+        stream.close()
+
+        ext = os.path.splitext(filename)[1].lower()
+        final_path = Path(self.config.root_dir) / f"{stream.sha256}{ext}"
+        if final_path.exists():
+            # Same content uploaded before: keep one copy, refresh its LRU age.
+            # It was checked when first stored, and a queued job may be
+            # reading it, so it is never removed here
+            os.remove(stream.path)
+            os.utime(final_path)
+        else:
+            os.replace(stream.path, final_path)
+            try:
+                self.check_duration(final_path)
+            except UploadRejected:
+                os.remove(final_path)
+                raise
+
+        logger.info(f"Upload stored at {final_path} ({stream.size / (1024 * 1024):.1f} MB)")
+        return final_path
+
+    def check_duration(self, video_path: Path):
+        """Reject unreadable videos or ones longer than max_duration_s."""
+        import cv2
+
+        cap = cv2.VideoCapture(str(video_path))
+        try:
+            if not cap.isOpened():
+                raise UploadRejected("Uploaded file is not a readable video")
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        finally:
+            cap.release()
+
+        if fps > 0 and frames > 0 and frames / fps > self.config.params_max_duration_s:
+            raise UploadRejected(
+                f"Video is {frames / fps:.0f}s long, the limit is {self.config.params_max_duration_s}s"
+            )
+
+    def maybe_collect_garbage(self, protect: Iterable[str] = ()):
+        """Run collect_garbage() at most once every gc_interval_s seconds."""
+        now = time.time()
+        if now - self._last_gc < self.config.params_gc_interval_s:
+            return
+        self._last_gc = now
+        self.collect_garbage(protect)
+
+    def collect_garbage(self, protect: Iterable[str] = ()) -> List[str]:
+        """
+        Delete uploads and predictions older than retention_hours, then the
+        least recently used ones until the total fits max_storage_mb.
+
+        Files modified within the last minute (uploads in flight, outputs
+        being written) and paths in `protect` are never removed.
+
+        Returns:
+            List[str]: Deleted paths
+        """
+        now = time.time()
+        protected = {os.path.abspath(p) for p in protect}
+        entries = []
+        for directory in (self.config.root_dir, self.config.prediction_dir):
+            if not os.path.isdir(directory):
+                continue
+            for entry in os.scandir(directory):
+                if not entry.is_file() or os.path.abspath(entry.path) in protected:
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime < 60:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()
+        deleted = []
+        max_age = self.config.params_retention_hours * 3600
+        budget = self.config.params_max_storage_mb * 1024 * 1024
+        total = sum(size for _, size, _ in entries)
+
+        for mtime, size, path in entries:
+            if now - mtime <= max_age and total <= budget:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            deleted.append(path)
+
+        if deleted:
+            logger.info(f"Retention policy removed {len(deleted)} files")
+        return deleted
@@ -0,0 +1,182 @@
+import time
+import queue
+import threading
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from victimDetector import logger
+
+
+# Marks the end of the stream on a queue
+_END = object()
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the pipeline is shutting down."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    """Blocking get that returns _END once the pipeline is shutting down."""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _END
+
+
+def run_pipelined(
+    batches: Iterable[List[Any]],
+    process: Callable[[List[Any]], List[Tuple[Any, Any]]],
+    sink: Callable[[Any, Any], None],
+    queue_size: int = 4,
+    flush: Optional[Callable[[], List[Tuple[Any, Any]]]] = None
+) -> int:
+    """
+    Run decode -> process -> encode as three overlapping stages.
+
+    A reader thread pulls batches from `batches` (e.g. cv2.VideoCapture.read),
+    the calling thread runs `process` on each batch (model inference) and a
+    writer thread hands every (item, output) pair it returns to `sink` (e.g.
+    VideoWriter.write). `process` may hold items back and return them from a
+    later call; whatever is still held at the end is drained via `flush`.
+
+    Stages are connected by bounded queues, so a slow stage applies
+    backpressure instead of letting decoded frames pile up in memory. OpenCV
+    and torch release the GIL, so the stages genuinely overlap.
+
+    If any stage raises, all stages stop and the first error is re-raised
+    in the calling thread.
+
+    Args:
+        batches (Iterable[List[Any]]): Source of input batches
+        process (Callable): Maps a batch to a list of ready (item, output) pairs
+        sink (Callable): Consumes one (item, output) pair
+        queue_size (int): Maximum number of batches buffered between stages
+        flush (Callable): Returns the pairs still held by `process` at the end
+
+    Returns:
+        int: Number of items written by the sink
+    """
+    stop = threading.Event()
+    errors = []
+    in_q = queue.Queue(maxsize=queue_size)
+    out_q = queue.Queue(maxsize=queue_size)
+    written = [0]
+
+    def fail(stage, e):
+        logger.error(f"Pipeline {stage} stage failed: {e}")
+        errors.append(e)
+        stop.set()
+
+    def reader():
+        try:
+            for batch in batches:
+                if not _put(in_q, batch, stop):
+                    return
+        except Exception as e:
+            fail("reader", e)
+        finally:
+            _put(in_q, _END, stop)
+
+    def writer():
+        try:
+            while True:
+                item = _get(out_q, stop)
+                if item is _END:
+                    return
+                for element, output in item:
+                    sink(element, output)
+                    written[0] += 1
+        except Exception as e:
+            fail("writer", e)
+
+    reader_thread = threading.Thread(target=reader, name="pipeline-reader", daemon=True)
+    writer_thread = threading.Thread(target=writer, name="pipeline-writer", daemon=True)
+    reader_thread.start()
+    writer_thread.start()
+
+    try:
+        while True:
+            batch = _get(in_q, stop)
+            if batch is _END:
+                break
+            if not _put(out_q, process(batch), stop):
+                break
+        if flush is not None and not stop.is_set():
+            _put(out_q, flush(), stop)
+    except Exception as e:
+        fail("process", e)
+    finally:
+        _put(out_q, _END, stop)
+        writer_thread.join()
+        # Unblock the reader if it is waiting on a full queue
+        stop.set()
+        reader_thread.join()
+
+    if errors:
+        raise errors[0]
+    return written[0]
+
+
+class LatestValue:
+    """
+    Single-slot mailbox that always holds the newest value.
+
+    put() overwrites whatever has not been consumed yet, so a slow consumer
+    skips stale values instead of falling behind; each value carries a
+    sequence number that consumers use to wait for the next one.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._value = None
+        self._seq = 0
+        self._closed = False
+
+    def put(self, value) -> int:
+        """Publish a value and return its sequence number."""
+        with self._cond:
+            self._value = value
+            self._seq += 1
+            self._cond.notify_all()
+            return self._seq
+
+    def close(self):
+        """Wake every waiter; wait() returns None from now on."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def seq(self) -> int:
+        with self._cond:
+            return self._seq
+
+    def wait(self, after: int, timeout: float = None) -> Optional[Tuple[int, Any]]:
+        """
+        Block until a value newer than sequence number `after` is published.
+
+        Args:
+            after (int): Last sequence number the caller has seen
+            timeout (float): Seconds to wait, None waits forever
+
+        Returns:
+            Optional[Tuple[int, Any]]: (seq, value), or None on timeout or close
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._seq <= after and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if self._closed:
+                return None
+            return self._seq, self._value